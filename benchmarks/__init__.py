@@ -0,0 +1,15 @@
+'''
+Benchmarks of the project parsing and kv editing engines.
+
+They run without the designer UI, on synthetic projects and kv files
+generated with a fixed layout, so results of different runs and versions
+can be compared. Run from the repository root:
+
+    python -m benchmarks.run
+    python -m benchmarks.run --widgets 10,100 --lines 1000 --repeat 3
+    python -m benchmarks.run --output new.json --compare old.json
+
+By default kivy uses an offscreen SDL window and the mock GL backend, so no
+display is needed. Use --no-headless to keep the environment untouched,
+e.g. to run under xvfb-run with a real window.
+'''
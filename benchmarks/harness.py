@@ -0,0 +1,155 @@
+'''
+Runs the designer engines without the designer UI. :func:`setup_headless`
+must be called before kivy is imported.
+'''
+
+__all__ = [
+    'setup_headless', 'BenchDesigner', 'BenchPlayground', 'install_designer',
+    'measure', 'summarize']
+
+import statistics
+import time
+import sys
+import os
+import gc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_headless(headless=True):
+    '''Configures kivy to run the benchmarks and makes the designer
+    modules importable
+    :param headless: use an offscreen SDL window and the mock GL backend
+    '''
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+
+    os.environ.setdefault('KIVY_NO_ARGS', '1')
+    os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+    os.environ.setdefault('KIVY_NO_FILELOG', '1')
+    if headless:
+        # widgets need a window, the offscreen driver doesn't need a display
+        os.environ.setdefault('KIVY_WINDOW', 'sdl2')
+        os.environ.setdefault('SDL_VIDEODRIVER', 'offscreen')
+        os.environ.setdefault('KIVY_GL_BACKEND', 'mock')
+        os.environ.setdefault('KIVY_CLIPBOARD', 'dummy')
+        # without a window the metrics must be fixed
+        os.environ.setdefault('KIVY_DPI', '96')
+        os.environ.setdefault('KIVY_METRICS_DENSITY', '1')
+        os.environ.setdefault('KIVY_METRICS_FONTSCALE', '1')
+
+
+class _Console(object):
+    text = ''
+
+
+class _StatusBar(object):
+
+    def show_message(self, *args, **kwargs):
+        pass
+
+
+class _Watcher(object):
+
+    def pause_watching(self):
+        pass
+
+    def resume_watching(self, delay=1):
+        pass
+
+
+class _UICreator(object):
+
+    def __init__(self, kv_code_input, playground):
+        self.error_console = _Console()
+        self.kv_code_input = kv_code_input
+        self.playground = playground
+
+
+class BenchDesigner(object):
+    '''Provides the attributes of the Designer used by the engines.
+       The KVLangArea and a minimal playground are real widgets.
+    '''
+
+    def __init__(self):
+        from components.kv_lang_area import KVLangArea
+        from core.project_manager import ProjectManager
+        from uix.sandbox import DesignerSandbox
+        from kivy.lang import Builder
+
+        # global kv imports done by designer.kv
+        Builder.load_string(
+            '#: import KivyLexer kivy.extras.highlight.KivyLexer\n')
+        import utils.colors  # noqa, loads the designer sizes and colors
+
+        self.project_manager = ProjectManager()
+        self.project_watcher = _Watcher()
+        self.statusbar = _StatusBar()
+        self.code_inputs = []
+
+        self.playground = BenchPlayground(sandbox=DesignerSandbox())
+        self.kv_code_input = KVLangArea(playground=self.playground)
+        self.ui_creator = _UICreator(self.kv_code_input, self.playground)
+
+
+class BenchPlayground(object):
+    '''Holds the root widget edited by the benchmarks, like the Playground
+    '''
+
+    def __init__(self, sandbox):
+        self.sandbox = sandbox
+        self.root = None
+        self.root_name = ''
+        self._last_root = None
+
+    def set_root(self, root):
+        if self.root is not None:
+            self.sandbox.remove_widget(self.root)
+        self.root = root
+        self.root_name = type(root).__name__
+        self.sandbox.add_widget(root)
+
+
+class _BenchApp(object):
+
+    def __init__(self, root):
+        self.root = root
+
+
+def install_designer(designer):
+    '''Makes `get_designer()` return the designer
+    '''
+    from kivy.app import App
+    App._running_app = _BenchApp(designer)
+
+
+def measure(func, setup=None, repeat=5):
+    '''Runs func `repeat` times and returns its timings in milliseconds.
+    The garbage collector is disabled while timing, as in timeit.
+    :param setup: function called before each run, not timed
+    :return: dict with min, median, mean and the raw runs
+    '''
+    runs = []
+    for i in range(repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func()
+            runs.append((time.perf_counter() - start) * 1000)
+        finally:
+            gc.enable()
+    return summarize(runs)
+
+
+def summarize(runs):
+    '''Returns the statistics of a list of timings
+    '''
+    return {
+        'min_ms': round(min(runs), 3),
+        'median_ms': round(statistics.median(runs), 3),
+        'mean_ms': round(statistics.mean(runs), 3),
+        'runs': [round(r, 3) for r in runs],
+    }
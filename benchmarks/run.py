@@ -0,0 +1,220 @@
+'''
+Command line entry point of the benchmarks. See :mod:`benchmarks`.
+'''
+
+__all__ = ['main', 'run_benchmarks', 'compare']
+
+from benchmarks.harness import measure, setup_headless
+from benchmarks.synthetic import generate_kv, generate_project
+
+from argparse import ArgumentParser
+import platform
+import tempfile
+import shutil
+import json
+import sys
+import os
+
+DEFAULT_WIDGETS = '10,100,1000'
+DEFAULT_LINES = '1000,10000'
+
+
+def _bench_project(results, widgets, lines, repeat):
+    '''Cold and warm open, and reparse of a synthetic project
+    '''
+    from core.project_manager import Project
+    from core.import_manager import import_manager
+    from core.kv_cache import kv_cache
+
+    path = tempfile.mkdtemp(prefix='kd_bench_')
+    try:
+        generate_project(path, widgets, lines)
+        key = f'{widgets}w_{lines}l'
+        opened = []
+
+        def open_project():
+            project = Project(path=path)
+            project.open()
+            opened.append(project)
+
+        def reset():
+            # the imports and the parsed kv are shared by the projects, so
+            # unload them to measure an open from scratch
+            while opened:
+                opened.pop().unload()
+            import_manager.retire_all()
+            kv_cache.clear()
+
+        results[f'project_open/{key}'] = measure(
+            open_project, setup=reset, repeat=repeat)
+        # reopening the same files hits the import and kv caches
+        results[f'project_open_warm/{key}'] = measure(
+            open_project, repeat=repeat)
+        reset()
+
+        open_project()
+        project = opened[-1]
+        results[f'project_reparse/{key}'] = measure(
+            lambda: project.parse(reload_files=True), repeat=repeat)
+        reset()
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _bench_kv(results, designer, widgets, lines, repeat):
+    '''Loading a kv file and editing it through the KVLangArea
+    '''
+    from components.widgets_tree import WidgetsTree
+    from kivy.uix.button import Button
+    from kivy.lang.builder import Builder
+
+    kv_area = designer.kv_code_input
+    playground = designer.playground
+    kv = generate_kv(widgets, lines)
+    key = f'{widgets}w_{lines}l'
+
+    def open_kv():
+        root = Builder.load_string(kv)
+        playground.set_root(root)
+        kv_area.text = kv
+    results[f'kv_open/{key}'] = measure(open_kv, repeat=repeat)
+
+    def reset():
+        if kv_area.text != kv:
+            kv_area.text = kv
+
+    # the last button is the deepest and the furthest from the root line
+    root = playground.root
+    buttons = [w for w in root.walk(restrict=True) if isinstance(w, Button)]
+    button = buttons[-1]
+
+    results[f'widget_path/{key}'] = measure(
+        lambda: kv_area.get_widget_path(button), repeat=repeat)
+
+    def find_place():
+        path = kv_area.get_widget_path(button)
+        path.reverse()
+        lines_ = kv_area.text.splitlines()
+        kv_area._find_widget_place(path, lines_, len(lines_), 1)
+    results[f'find_widget_place/{key}'] = measure(find_place, repeat=repeat)
+
+    results[f'property_edit/{key}'] = measure(
+        lambda: kv_area.set_property_value(
+            button, 'text', 'edited', 'StringProperty'),
+        setup=reset, repeat=repeat)
+
+    target = button.parent
+
+    def add_remove():
+        widget = Button()
+        target.add_widget(widget)
+        kv_area.add_widget_to_parent(widget, target)
+        kv_area.remove_widget_from_parent(widget)
+        target.remove_widget(widget)
+    results[f'widget_add_remove/{key}'] = measure(
+        add_remove, setup=reset, repeat=repeat)
+
+    tree = WidgetsTree(playground=playground)
+    results[f'tree_refresh/{key}'] = measure(tree._refresh, repeat=repeat)
+
+
+def environment():
+    '''Returns the versions used by the run, stored with the results
+    '''
+    import kivy
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'kivy': kivy.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'gl_backend': os.environ.get('KIVY_GL_BACKEND', ''),
+    }
+
+
+def run_benchmarks(widgets, lines, repeat=5, log=print):
+    '''Runs all benchmarks for each combination of widgets and lines
+    :return: dict with the environment and the results by benchmark name
+    '''
+    from benchmarks.harness import BenchDesigner, install_designer
+    from core.project_manager import Project
+
+    designer = BenchDesigner()
+    install_designer(designer)
+
+    results = {}
+    for w in widgets:
+        for l in lines:
+            log(f'Running {w} widgets, {l} lines')
+            _bench_project(results, w, l, repeat)
+            # an empty project, so the kv rules are not custom widgets
+            designer.project_manager.current_project = Project()
+            _bench_kv(results, designer, w, l, repeat)
+
+    return {
+        'environment': environment(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def compare(baseline, current):
+    '''Returns the lines of a comparison between two runs, using the median
+    '''
+    out = [f'{"benchmark":<40} {"baseline":>12} {"current":>12} {"change":>8}']
+    base_results = baseline.get('results', {})
+    for name, result in sorted(current['results'].items()):
+        new = result['median_ms']
+        if name not in base_results:
+            out.append(f'{name:<40} {"-":>12} {new:>10.3f}ms {"new":>8}')
+            continue
+        old = base_results[name]['median_ms']
+        change = (new - old) / old * 100 if old else 0.0
+        out.append(
+            f'{name:<40} {old:>10.3f}ms {new:>10.3f}ms {change:>+7.1f}%')
+    if baseline.get('environment') != current.get('environment'):
+        out.append('Warning: the runs used different environments')
+    return out
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(',') if v.strip()]
+
+
+def main(argv=None):
+    parser = ArgumentParser(
+        prog='python -m benchmarks.run',
+        description='Benchmarks of the Kivy Designer engines')
+    parser.add_argument('--widgets', default=DEFAULT_WIDGETS,
+                        help='comma separated number of widgets')
+    parser.add_argument('--lines', default=DEFAULT_LINES,
+                        help='comma separated number of kv lines')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='runs of each benchmark')
+    parser.add_argument('--output', help='writes the results to a json file')
+    parser.add_argument('--compare', help='json file of a previous run')
+    parser.add_argument('--no-headless', action='store_true',
+                        help='keep the kivy window and GL settings')
+    args = parser.parse_args(argv)
+
+    setup_headless(headless=not args.no_headless)
+    data = run_benchmarks(_int_list(args.widgets), _int_list(args.lines),
+                          args.repeat)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print('\n'.join(compare(baseline, data)))
+    else:
+        for name, result in sorted(data['results'].items()):
+            print(f'{name:<40} {result["median_ms"]:>10.3f}ms '
+                  f'(min {result["min_ms"]:.3f}ms)')
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+'''
+Generators of synthetic kv files and projects. The output only depends on
+the arguments, so the same sizes always produce the same files.
+'''
+
+__all__ = ['generate_kv_body', 'generate_kv', 'generate_project']
+
+import os
+
+FANOUT = 10
+'''Maximum number of children of each generated layout
+'''
+BUTTON_PROPERTIES = (
+    "font_size: '{n}sp'",
+    'bold: {bool}',
+    'italic: {bool}',
+    "halign: 'center'",
+    "valign: 'middle'",
+    'size_hint_y: None',
+    "height: '{n}dp'",
+    'opacity: 1',
+)
+
+
+def _emit_widgets(lines, widgets, indent, counter, props):
+    '''Appends `widgets` buttons to lines, grouped in BoxLayouts with at most
+    FANOUT children
+    '''
+    if widgets <= FANOUT:
+        for i in range(widgets):
+            n = counter[0]
+            counter[0] += 1
+            lines.append(f'{indent}Button:')
+            lines.append(f"{indent}    text: 'button_{n}'")
+            for k in range(props):
+                if k < len(BUTTON_PROPERTIES):
+                    prop = BUTTON_PROPERTIES[k].format(
+                        n=10 + n % 20, bool=bool(n % 2))
+                    lines.append(f'{indent}    {prop}')
+                else:
+                    # comments fill the file up to the requested size
+                    lines.append(f'{indent}    # note {n}.{k}')
+        return None
+
+    group_size = -(-widgets // FANOUT)  # ceil
+    while widgets > 0:
+        size = min(group_size, widgets)
+        widgets -= size
+        lines.append(f'{indent}BoxLayout:')
+        lines.append(f"{indent}    orientation: 'vertical'")
+        _emit_widgets(lines, size, indent + '    ', counter, props)
+
+
+def generate_kv_body(widgets, lines=0, indent='    '):
+    '''Returns the lines of a widget tree with `widgets` buttons.
+    :param lines: approximated number of lines. Extra properties and comments
+        are added to each button to reach it
+    '''
+    # each button uses 2 lines and each layout ~2 lines per FANOUT buttons
+    base = widgets * 2 + (widgets // FANOUT + 1) * 2
+    props = max(0, (lines - base) // max(widgets, 1))
+    out = []
+    _emit_widgets(out, widgets, indent, [0], props)
+    return out
+
+
+def generate_kv(widgets, lines=0, root='BoxLayout'):
+    '''Returns a kv string with a root widget and `widgets` buttons
+    '''
+    out = [f'{root}:', "    orientation: 'vertical'"]
+    out += generate_kv_body(widgets, lines)
+    return '\n'.join(out) + '\n'
+
+
+PY_MAIN = '''from kivy.app import App
+from kivy.uix.boxlayout import BoxLayout
+
+
+class BenchRoot(BoxLayout):
+    pass
+
+
+class BenchApp(App):
+    def build(self):
+        return BenchRoot()
+
+
+if __name__ == '__main__':
+    BenchApp().run()
+'''
+
+PY_MODULE = '''from kivy.uix.boxlayout import BoxLayout
+
+
+class {name}(BoxLayout):
+
+    def on_touch_down(self, touch):
+        return super({name}, self).on_touch_down(touch)
+'''
+
+
+def generate_project(path, widgets, lines=0, files=10):
+    '''Creates a project with a main.py/bench.kv pair and `files` python
+    modules, each one with a widget class and its kv rule.
+    The widgets and lines are split between the kv files.
+    :return: list of created files
+    '''
+    if not os.path.exists(path):
+        os.makedirs(path)
+
+    created = []
+    names = [f'BenchWidget{i}' for i in range(files)]
+    per_file = max(1, widgets // (files + 1))
+    lines_per_file = lines // (files + 1)
+
+    for i, name in enumerate(names):
+        module = os.path.join(path, 'widgets', f'widget{i}.py')
+        if not os.path.exists(os.path.dirname(module)):
+            os.makedirs(os.path.dirname(module))
+        with open(module, 'w', encoding='utf-8') as f:
+            f.write(PY_MODULE.format(name=name))
+
+        kv = os.path.join(path, 'widgets', f'widget{i}.kv')
+        body = generate_kv_body(per_file, lines_per_file)
+        with open(kv, 'w', encoding='utf-8') as f:
+            f.write(f'<{name}>:\n' + '\n'.join(body) + '\n')
+        created += [module, kv]
+
+    main = os.path.join(path, 'main.py')
+    with open(main, 'w', encoding='utf-8') as f:
+        f.write(PY_MAIN)
+
+    kv = os.path.join(path, 'bench.kv')
+    body = generate_kv_body(per_file, lines_per_file)
+    with open(kv, 'w', encoding='utf-8') as f:
+        f.write('<BenchRoot>:\n' + '\n'.join(body) + '\n')
+    created += [main, kv]
+    return created
@@ -4,7 +4,7 @@ __all__ = [
     'SpecCodeInput', 'BuildozerSpecEditor']
 
 from utils.utils import get_kd_data_dir, ignore_proj_watcher
-from uix.settings import SettingDict, SettingList
+from uix.settings import LazySettings, SettingDict, SettingList
 
 from kivy.properties import ConfigParser, ObjectProperty, StringProperty
 from kivy.uix.boxlayout import BoxLayout
@@ -12,10 +12,10 @@ from kivy.lang.builder import Builder
 
 from kivy.uix.settings import (
     ContentPanel, InterfaceWithSidebar,
-    MenuSidebar, Settings, SettingsPanel)
+    MenuSidebar, SettingsPanel)
 
 from pygments.lexers.configs import IniLexer
-import os, io, json
+import os, io
 import webbrowser
 import tempfile
 
@@ -225,9 +225,9 @@ class SpecCodeInput(BoxLayout):
         '''
         pass
 
-class BuildozerSpecEditor(Settings):
-    '''Subclass of :class:`kivy.uix.settings.Settings` responsible for
-       the UI editor of buildozer spec
+class BuildozerSpecEditor(LazySettings):
+    '''Subclass of :class:`~designer.uix.settings.LazySettings` responsible
+       for the UI editor of buildozer spec
     '''
     config_parser = ObjectProperty(None)
     '''Config Parser for this class. Instance
@@ -239,21 +239,27 @@ class BuildozerSpecEditor(Settings):
         self.register_type('list', SettingList)
         self.SPEC_PATH = ''
         self.proj_dir = ''
+        self.raw_spec = None
 
         self.config_parser = ConfigParser.get_configparser("buildozer_spec")
         if self.config_parser is None:
             self.config_parser = ConfigParser(name="buildozer_spec")
 
     def load_settings(self, proj_dir):
-        '''This function loads project settings
+        '''This function loads project settings. The panels are only created
+        once, next calls just update their values.
         :param proj_dir: project directory with buildozer.spec
         '''
-        self.interface.menu.buttons_layout.clear_widgets()
         self.proj_dir = proj_dir
         self.SPEC_PATH = os.path.join(proj_dir, 'buildozer.spec')
 
         self.config_parser.read(self.SPEC_PATH)
 
+        if self.raw_spec is not None:
+            self.raw_spec.spec_path = self.SPEC_PATH
+            self.update_values()
+            return None
+
         dir_settings = lambda name: os.path.join(get_kd_data_dir(), 'settings', name+'.json')
         
         self.add_json_panel('Application', self.config_parser, dir_settings('buildozer_spec_app'))
@@ -261,58 +267,23 @@ class BuildozerSpecEditor(Settings):
         self.add_json_panel('iOS', self.config_parser, dir_settings('buildozer_spec_ios'))
         self.add_json_panel('Buildozer', self.config_parser, dir_settings('buildozer_spec_buildozer'))
 
-        raw_spec = SpecCodeInput(spec_path=self.SPEC_PATH)
-        raw_spec.bind(on_change=self.on_spec_changed)
-        self.interface.add_panel(raw_spec, "buildozer.spec", raw_spec.uid)
+        self.raw_spec = SpecCodeInput(spec_path=self.SPEC_PATH)
+        self.raw_spec.bind(on_change=self.on_spec_changed)
+        self.interface.add_panel(self.raw_spec, "buildozer.spec", self.raw_spec.uid)
 
         menu = self.interface.menu
         menu.selected_uid = menu.buttons_layout.children[-1].uid
 
     def on_spec_changed(self, *args):
-        self.load_settings(self.proj_dir)
-
-        # force to show the last panel
-        menu = self.interface.menu
-        menu.selected_uid = menu.buttons_layout.children[0].uid
+        '''The raw spec was saved, update the values of the panels
+        '''
+        self.config_parser.read(self.SPEC_PATH)
+        self.update_values()
 
-    def create_json_panel(self, title, config, filename=None, data=None):
+    def create_panel(self, title, config):
         '''Override the original method to use the custom SpecSettingsPanel
         '''
-        if filename is None and data is None:
-            raise Exception('You must specify either the filename or data')
-
-        if filename is not None:
-            with io.open(filename, 'r', encoding='utf-8') as fd:
-                data = json.loads(fd.read())
-        else:
-            data = json.loads(data)
-
-        if type(data) != list:
-            raise ValueError('The first element must be a list')
-        
-        panel = SpecSettingsPanel(title=title, settings=self, config=config)
-
-        for setting in data:
-            # determine the type and the class to use
-            if not 'type' in setting:
-                raise ValueError('One setting are missing the "type" element')
-            ttype = setting['type']
-            cls = self._types.get(ttype)
-            if cls is None:
-                msg = f"No class registered to handle the <{setting['type']}> type"
-                raise ValueError(msg)
-
-            # create a instance of the class, without the type attribute
-            del setting['type']
-            str_settings = {}
-            for key, item in setting.items():
-                str_settings[str(key)] = item
-
-            instance = cls(panel=panel, **str_settings)
-            # instance created, add to the panel
-            panel.add_widget(instance)
-
-        return panel
+        return SpecSettingsPanel(title=title, settings=self, config=config)
 
     @ignore_proj_watcher
     def on_config_change(self, *args):
@@ -2,13 +2,13 @@ __all__ = [
     'DesignerContent', 'DesignerTabbedPanel',
     'DesignerTabbedPanelItem', 'DesignerCloseableTab']
 
-from components.buildozer_spec_editor import BuildozerSpecEditor
 from uix.confirmation_dialog import ConfirmationDialog
 from utils.utils import get_designer, show_message
 from uix.py_code_input import PyScrollView
 
 from kivy.app import App
 from kivy.clock import Clock
+from kivy.metrics import dp
 from kivy.uix.popup import Popup
 from kivy.lang.builder import Builder
 from kivy.uix.treeview import TreeViewLabel
@@ -23,6 +23,12 @@ from kivy.properties import ObjectProperty, OptionProperty, StringProperty
 import os
 
 SUPPORTED_EXT = ('.py', '.py2', '.kv', '.py3', '.txt', '.diff', )
+GIT_STATUS_COLORS = {
+    'modified': (0.95, 0.75, 0.3, 1),
+    'untracked': (0.5, 0.85, 0.5, 1),
+    'staged': (0.45, 0.7, 1, 1),
+}
+DEFAULT_NODE_COLOR = (1, 1, 1, 1)
 
 Builder.load_string("""
 
@@ -35,7 +41,6 @@ Builder.load_string("""
     toolbox: toolbox
     splitter_tree: splitter_tree
     tree_toolbox_tab_panel: tree_toolbox_tab_panel
-    find_tool: find_tool
 
     DesignerTabbedPanel:
         id: tab_panel
@@ -78,13 +83,6 @@ Builder.load_string("""
                 Toolbox:
                     id: toolbox
 
-    CodeInputFind:
-        id: find_tool
-        y: root.y if root.in_find else dp(-100)
-        x: splitter_tree.width
-        size_hint_x: None
-        width: root.width - splitter_tree.width
-
 <DesignerCloseableTab>:
     color: [0, 0, 0, 0]
     disabled_color: self.color
@@ -161,7 +159,8 @@ class DesignerContent(FloatLayout):
         and defaults to None
     '''
     find_tool = ObjectProperty(None)
-    '''Instance of  :class:`~designer.uix.code_find.CodeInputFind`.
+    '''Instance of  :class:`~designer.uix.code_find.CodeInputFind`, created
+        the first time the find menu is shown.
         :data:`find_tool` is a :class:`~kivy.properties.ObjectProperty`
         and defaults to None
     '''
@@ -175,24 +174,31 @@ class DesignerContent(FloatLayout):
 
     def __init__(self, **kwargs):
         super(DesignerContent, self).__init__(**kwargs)
-        self.find_tool.bind(on_close=lambda *a: self.show_findmenu(False))
-        self.find_tool.bind(on_next=self.find_tool_next)
-        self.find_tool.bind(on_prev=self.find_tool_prev)
         self.focus_code_input = Clock.create_trigger(self._focus_input)
+        self._dir_entries = {}  # relative dir path -> (dir names, file names)
+        self._dir_nodes = {}  # relative dir path -> tree node
+        self._file_nodes = {}  # relative file path -> tree node
+        self._populated = set()  # relative dir paths with children nodes
+        self._git_status = {}
 
-    def update_tree_view(self, project):
+    def update_tree_view(self, project, reload_files=True):
         '''This function is used to insert all the py files detected.
-           as a node in the Project Tree.
+           as a node in the Project Tree. Only the root folder is populated,
+           the other folders are populated when expanded.
            :param project: instance of the current project
+           :param reload_files: if False, uses the project file_list instead
+           of listing the files again
         '''
         self.project = project
 
         # Fill nodes with file and directories
-        self._root_node = self.tree_view.root
+        self.tree_view.unbind(on_node_expand=self._on_node_expand)
+        self.tree_view.bind(on_node_expand=self._on_node_expand)
         self.clear_tree_view()
 
-        for _file in sorted(project.get_files()):
-            self.add_file_to_tree_view(_file)
+        for _file in project.get_files(force_reload=reload_files):
+            self._index_file(os.path.relpath(_file, project.path))
+        self._populate_dir('')
 
         self.tree_view.root_options = dict(
             text=os.path.basename(self.project.path))
@@ -201,76 +207,182 @@ class DesignerContent(FloatLayout):
         '''
         Clear the TreeView
         '''
-        temp = list(self.tree_view.iterate_all_nodes())
-        for node in temp:
+        # removing a node also removes its children
+        for node in self.tree_view.root.nodes[:]:
             self.tree_view.remove_node(node)
 
+        self._dir_entries = {'': (set(), set())}
+        self._dir_nodes = {'': self.tree_view.root}
+        self._file_nodes = {}
+        self._populated = set()
+
+    def _index_file(self, rel_path):
+        '''Register a file on the directories index, creating the entries
+        of its parent directories if necessary.
+        '''
+        dirname, name = os.path.split(rel_path)
+        is_new = dirname not in self._dir_entries
+        self._dir_entries.setdefault(dirname, (set(), set()))[1].add(name)
+
+        # register the new parent directories until reaching a known one
+        while is_new and dirname:
+            parent, name = os.path.split(dirname)
+            is_new = parent not in self._dir_entries
+            self._dir_entries.setdefault(parent, (set(), set()))[0].add(name)
+            dirname = parent
+
+    def _create_dir_node(self, rel_dir):
+        '''Creates the node of a directory that is a child of a populated
+        directory. Its content is only added when expanded.
+        '''
+        node = TreeViewLabel(text=os.path.basename(rel_dir))
+        node.rel_path = rel_dir
+        self.tree_view.add_node(node, self._dir_nodes[os.path.dirname(rel_dir)])
+        dirs, files = self._dir_entries.get(rel_dir, ((), ()))
+        node.is_leaf = not (dirs or files)
+        self._dir_nodes[rel_dir] = node
+        return node
+
+    def _create_file_node(self, rel_path):
+        '''Creates the node of a file that is a child of a populated
+        directory.
+        '''
+        file_node = TreeViewLabel(text=os.path.basename(rel_path))
+        file_node.rel_path = rel_path
+        file_node.bind(on_touch_down=self._file_node_clicked)
+        self.tree_view.add_node(file_node, self._dir_nodes[os.path.dirname(rel_path)])
+
+        self._file_nodes[rel_path] = file_node
+        status = self._git_status.get(rel_path)
+        file_node.color = GIT_STATUS_COLORS.get(status, DEFAULT_NODE_COLOR)
+        return file_node
+
+    def _populate_dir(self, rel_dir):
+        '''Creates the nodes of a directory content
+        '''
+        if rel_dir in self._populated:
+            return None
+        self._populated.add(rel_dir)
+
+        dirs, files = self._dir_entries.get(rel_dir, ((), ()))
+        for name in sorted(dirs):
+            self._create_dir_node(os.path.join(rel_dir, name))
+        for name in sorted(files):
+            self._create_file_node(os.path.join(rel_dir, name))
+
+    def _on_node_expand(self, tree_view, node, *args):
+        '''Populate a folder when it's expanded for the first time
+        '''
+        rel_dir = getattr(node, 'rel_path', None)
+        if rel_dir in self._dir_nodes:
+            self._populate_dir(rel_dir)
+
     def add_file_to_tree_view(self, _file):
         '''This function is used to insert project files given by it's path
         argument _file. It will also insert any directory node if not present.
+        Nodes are only created inside populated folders, the others will
+        display the file when expanded.
         :param _file: path of the file to be inserted
         '''
-        self.tree_view.root_options = dict(text='')
-        dirname = os.path.dirname(_file)
-        dirname = dirname.replace(self.project.path, '')
-
-        # The way os.path.dirname works, there will never be '/' at the end
-        # of a directory. So, there will always be '/' at the starting
-        # of 'dirname' variable after removing proj_dir
-
-        # This algorithm first breaks path into its components
-        # and creates a list of these components.
-        _dirname = dirname
-        _basename = 'a'
-        list_path_components = []
-        while _basename != '':
-            _split = os.path.split(_dirname)
-            _dirname = _split[0]
-            _basename = _split[1]
-            list_path_components.insert(0, _split[1])
-
-        if list_path_components[0] == '':
-            del list_path_components[0]
-
-        # Then it traverses from root_node to its children searching from
-        # each component in the path. If it doesn't find any component
-        # related with node then it creates it.
-        node = self._root_node
-        while list_path_components != []:
-            found = False
-            for _node in node.nodes:
-                if _node.text == list_path_components[0]:
-                    node = _node
-                    found = True
-                    break
-
-            if not found:
-                for component in list_path_components:
-                    _node = TreeViewLabel(text=component)
-                    self.tree_view.add_node(_node, node)
-                    node = _node
-                list_path_components = []
-                continue
-            del list_path_components[0]
+        rel_path = os.path.relpath(_file, self.project.path)
+        if rel_path in self._file_nodes:
+            return None
+        self._index_file(rel_path)
+
+        dirname = os.path.dirname(rel_path)
+        rel_dir = ''
+        for component in dirname.split(os.sep) if dirname else []:
+            if rel_dir not in self._populated:
+                break
+            child = os.path.join(rel_dir, component)
+            if child not in self._dir_nodes:
+                self._create_dir_node(child)
+            rel_dir = child
+
+        if rel_dir == dirname and rel_dir in self._populated:
+            self._create_file_node(rel_path)
+        else:
+            # collapsed folder, just make sure it can be expanded
+            self._dir_nodes[rel_dir].is_leaf = False
 
-        # Finally add file_node with node as parent.
-        file_node = TreeViewLabel(text=os.path.basename(_file))
-        file_node.bind(on_touch_down=self._file_node_clicked)
-        self.tree_view.add_node(file_node, node)
+    def remove_file_from_tree_view(self, _file):
+        '''Removes a file or a directory from the Project Tree.
+        :param _file: path of the file to be removed
+        '''
+        rel_path = os.path.relpath(_file, self.project.path)
+        dirname, name = os.path.split(rel_path)
+        entries = self._dir_entries.get(dirname)
+        if entries:
+            entries[0].discard(name)
+            entries[1].discard(name)
+
+        node = self._file_nodes.pop(rel_path, None)
+        if rel_path in self._dir_entries:
+            node = self._dir_nodes.get(rel_path)
+            prefix = rel_path + os.sep
+            for index in (self._dir_entries, self._dir_nodes, self._file_nodes):
+                for key in [k for k in index if k == rel_path or k.startswith(prefix)]:
+                    del index[key]
+            self._populated = set(
+                p for p in self._populated
+                if p != rel_path and not p.startswith(prefix))
+
+        if node is not None:
+            self.tree_view.remove_node(node)
+
+    def on_project_modified(self, instance, event, *args):
+        '''Event handler to the ProjectWatcher. Runs on the watcher thread,
+        so the tree is updated on the next frame.
+        '''
+        Clock.schedule_once(lambda *a: self._apply_fs_event(event))
+
+    def _apply_fs_event(self, event):
+        '''Updates the nodes of the paths changed by a file system event
+        '''
+        if self.project is None or not self.project.path:
+            return None
+        if event.event_type in ('deleted', 'moved'):
+            self.remove_file_from_tree_view(event.src_path)
+
+        if event.event_type == 'created':
+            path = event.src_path
+        elif event.event_type == 'moved':
+            path = event.dest_path
+        else:
+            return None
+        if not path.startswith(self.project.path) or not os.path.exists(path):
+            return None
+
+        if not os.path.isdir(path):
+            self.add_file_to_tree_view(path)
+            return None
+        for dirpath, dirnames, filenames in os.walk(path):
+            for filename in filenames:
+                self.add_file_to_tree_view(os.path.join(dirpath, filename))
+
+    def update_git_status(self, status_index):
+        '''Colors the Project Tree file nodes with their git status.
+        Only the nodes with a different status are updated
+        :param status_index: dict of {relative path: status}
+        '''
+        old_status = self._git_status
+        self._git_status = dict(status_index)
+
+        changed = set(old_status) | set(status_index)
+        for rel_path in changed:
+            status = status_index.get(rel_path)
+            if old_status.get(rel_path) == status:
+                continue
+            node = self._file_nodes.get(rel_path)
+            if node is not None:
+                node.color = GIT_STATUS_COLORS.get(status, DEFAULT_NODE_COLOR)
 
     def _file_node_clicked(self, instance, touch):
         '''This is emmited whenever any file node of Project Tree is
            clicked. This will open up a tab in DesignerTabbedPanel, for
            editing that py file.
         '''
-        # Travel upwards and find the path of instance clicked
-        path = instance.text
-        parent = instance.parent_node
-        while parent != self._root_node:
-            _path = parent.text
-            path = os.path.join(_path, path)
-            parent = parent.parent_node
-
+        path = instance.rel_path
         full_path = os.path.join(self.project.path, path)
         if os.path.basename(full_path) == 'buildozer.spec':
             self.tab_pannel.show_buildozer_spec_editor(self.project)
@@ -291,8 +403,31 @@ class DesignerContent(FloatLayout):
         '''
         self.in_find = visible
         if visible:
+            if self.find_tool is None:
+                self._create_find_tool()
             Clock.schedule_once(self._focus_find)
 
+    def _create_find_tool(self):
+        '''Creates the find tool, below the tabs, on first use
+        '''
+        from uix.code_find import CodeInputFind
+        self.find_tool = CodeInputFind(size_hint_x=None)
+        self.find_tool.bind(on_close=lambda *a: self.show_findmenu(False))
+        self.find_tool.bind(on_next=self.find_tool_next)
+        self.find_tool.bind(on_prev=self.find_tool_prev)
+        self.bind(y=self._place_find_tool, width=self._place_find_tool,
+                  in_find=self._place_find_tool)
+        self.splitter_tree.bind(width=self._place_find_tool)
+        self._place_find_tool()
+        self.add_widget(self.find_tool)
+
+    def _place_find_tool(self, *args):
+        '''Shows the find tool at the bottom, or hides it below the window
+        '''
+        self.find_tool.x = self.splitter_tree.width
+        self.find_tool.width = self.width - self.splitter_tree.width
+        self.find_tool.y = self.y if self.in_find else dp(-100)
+
     def _focus_find(self, *args):
         '''Focus on the find tool
         '''
@@ -368,6 +503,7 @@ class DesignerTabbedPanel(TabbedPanel):
         d = get_designer()
         if _py_code_input not in d.code_inputs:
             d.code_inputs.append(_py_code_input)
+        _py_code_input.diagnostics = d.lint_service.get_diagnostics(path)
 
         panel_item.content = scroll
         panel_item.rel_path = rel_path
@@ -380,12 +516,12 @@ class DesignerTabbedPanel(TabbedPanel):
         Buildozer Spec Editor
         :param project: instance of the current project
         '''
+        spec_editor = get_designer().spec_editor
         for i, child in enumerate(self.tab_list):
-            if isinstance(child.content, BuildozerSpecEditor):
+            if child.content is spec_editor:
                 self.switch_to(child)
                 return child
 
-        spec_editor = get_designer().spec_editor
         buildozer_spec_path = os.path.join(project.path, 'buildozer.spec')
         
         if spec_editor.SPEC_PATH != buildozer_spec_path:
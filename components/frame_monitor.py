@@ -0,0 +1,369 @@
+__all__ = ['FrameSampler', 'FrameGraph', 'FrameMonitor']
+
+from kivy.clock import Clock
+from kivy.lang.builder import Builder
+from kivy.uix.widget import Widget
+from kivy.uix.boxlayout import BoxLayout
+from kivy.graphics import Color, Line, Rectangle
+from kivy.properties import (
+    ListProperty, NumericProperty,
+    ObjectProperty, StringProperty,
+)
+
+from collections import deque
+import functools
+import traceback
+import threading
+import time
+import sys
+import os
+
+Builder.load_string("""
+
+<FrameMonitor>:
+    orientation: 'vertical'
+    graph: graph
+    BoxLayout:
+        size_hint_y: None
+        height: '30sp'
+        spacing: '4dp'
+        DesignerButton:
+            size_hint_x: None
+            width: '90dp'
+            text: 'Stop' if root.running else 'Start'
+            on_release: root.toggle()
+        DesignerButton:
+            size_hint_x: None
+            width: '90dp'
+            text: 'Reset'
+            on_release: root.reset()
+        Label:
+            size_hint_x: None
+            width: '60dp'
+            text: 'Budget'
+        Spinner:
+            size_hint_x: None
+            width: '90dp'
+            text: '%d ms' % root.budget_ms
+            values: ['16 ms', '33 ms', '50 ms', '100 ms']
+            on_text: root.budget_ms = int(args[1].split()[0])
+        Label:
+            text: root.summary
+            text_size: self.size
+            halign: 'left'
+            valign: 'middle'
+            shorten: True
+    FrameGraph:
+        id: graph
+        size_hint_y: 0.35
+        budget: root.budget_ms / 1000.
+    BoxLayout:
+        spacing: '4dp'
+        ScrollView:
+            size_hint_x: 0.4
+            Label:
+                text: root.clock_events
+                font_name: 'RobotoMono-Regular'
+                font_size: '9pt'
+                size_hint: None, None
+                size: self.texture_size
+        TextInput:
+            text: root.slow_frames
+            readonly: True
+            font_name: 'RobotoMono-Regular'
+            font_size: '9pt'
+
+""")
+
+STACK_LIMIT = 12
+'''Number of frames kept by each sampled stack
+'''
+
+
+def event_source(callback):
+    '''Returns a name identifying where a Clock callback comes from
+    '''
+    func = getattr(callback, '__func__', callback)
+    while isinstance(func, functools.partial):
+        func = func.func
+    func = getattr(func, '__func__', func)
+
+    name = getattr(func, '__qualname__', None) or type(func).__name__
+    code = getattr(func, '__code__', None)
+    if code is not None and '<' in name:
+        # lambdas and nested functions are identified by their position
+        name = f'{name} ({os.path.basename(code.co_filename)}:' \
+               f'{code.co_firstlineno})'
+    module = getattr(func, '__module__', None)
+    return f'{module}.{name}' if module else name
+
+
+class FrameSampler(object):
+    '''Measures the main loop frame times and counts the Clock events
+       scheduled by each source, except the Clock.create_trigger events.
+
+       A watchdog thread checks if the current frame is over budget and, while
+       it is, samples the stack of the main thread. The stacks sampled during
+       a slow frame are recorded with it, the most frequent one first.
+    '''
+
+    def __init__(self, budget=1 / 30., history=300, sample_interval=0.01):
+        self.budget = budget
+        self.sample_interval = sample_interval
+        self.frame_times = deque(maxlen=history)
+        self.slow_frames = deque(maxlen=50)
+        self.clock_events = {}  # source -> number of scheduled events
+        self.running = False
+        self._last_frame = 0.0
+        self._stacks = {}  # stack -> samples, of the current frame
+        self._lock = threading.Lock()
+        self._frame_event = None
+        self._stopped = None  # threading.Event of the running watchdog
+        self._main_id = threading.main_thread().ident
+
+    def start(self):
+        if self.running:
+            return None
+        self.running = True
+        self._last_frame = time.perf_counter()
+        self._frame_event = Clock.schedule_interval(self._on_frame, 0)
+        self._wrap_clock()
+        # each run has its own event, so a watchdog of a previous run can't
+        # keep sampling after a quick stop and start
+        self._stopped = threading.Event()
+        threading.Thread(target=self._watch, args=(self._stopped, ),
+                         daemon=True).start()
+
+    def stop(self):
+        if not self.running:
+            return None
+        self.running = False
+        self._stopped.set()
+        self._frame_event.cancel()
+        self._unwrap_clock()
+
+    def reset(self):
+        with self._lock:
+            self.frame_times.clear()
+            self.slow_frames.clear()
+            self.clock_events = {}
+            self._stacks = {}
+
+    def _on_frame(self, *args):
+        now = time.perf_counter()
+        duration = now - self._last_frame
+        with self._lock:
+            self._last_frame = now
+            stacks = self._stacks
+            self._stacks = {}
+        self.frame_times.append(duration)
+        if duration <= self.budget:
+            return None
+
+        self.slow_frames.append({
+            'time': time.time(),
+            'duration': duration,
+            'stacks': sorted(((count, stack) for stack, count in stacks.items()),
+                             reverse=True),
+        })
+
+    def _watch(self, stopped):
+        '''Watchdog thread sampling the main thread stack during slow frames
+        '''
+        main_id = self._main_id
+        while not stopped.wait(self.sample_interval):
+            last = self._last_frame
+            if time.perf_counter() - last <= self.budget:
+                continue
+
+            frame = sys._current_frames().get(main_id)
+            if frame is None:
+                continue
+            stack = ''.join(traceback.format_stack(frame, limit=STACK_LIMIT))
+            del frame
+            with self._lock:
+                if last != self._last_frame:
+                    # the frame finished while sampling
+                    continue
+                self._stacks[stack] = self._stacks.get(stack, 0) + 1
+
+    def _count(self, callback):
+        source = event_source(callback)
+        with self._lock:
+            self.clock_events[source] = self.clock_events.get(source, 0) + 1
+
+    def _wrap_clock(self):
+        '''Counts the events scheduled by Clock.schedule_once and
+        Clock.schedule_interval. Other threads, like the console readers,
+        schedule events too.
+        The events of Clock.create_trigger are not counted: calling a trigger
+        schedules its ClockEvent directly, without these methods, and most
+        triggers are created before the sampling starts
+        '''
+        schedule_once = Clock.schedule_once
+        schedule_interval = Clock.schedule_interval
+        count = self._count
+
+        def counted_schedule_once(callback, timeout=0):
+            count(callback)
+            return schedule_once(callback, timeout)
+
+        def counted_schedule_interval(callback, timeout):
+            count(callback)
+            return schedule_interval(callback, timeout)
+
+        Clock.schedule_once = counted_schedule_once
+        Clock.schedule_interval = counted_schedule_interval
+
+    def _unwrap_clock(self):
+        for name in ('schedule_once', 'schedule_interval'):
+            try:
+                delattr(Clock, name)
+            except AttributeError:
+                pass
+
+
+class FrameGraph(Widget):
+    '''Plots the frame times. Frames over :data:`budget` are highlighted
+    '''
+
+    frame_times = ListProperty([])
+    '''Frame durations in seconds, the oldest first
+       :data:`frame_times` is a :class:`~kivy.properties.ListProperty`
+    '''
+    budget = NumericProperty(1 / 30.)
+    '''Frame time budget in seconds
+       :data:`budget` is a :class:`~kivy.properties.NumericProperty`
+    '''
+    history = NumericProperty(300)
+    '''Number of frames in the graph width
+       :data:`history` is a :class:`~kivy.properties.NumericProperty`
+    '''
+
+    def __init__(self, **kwargs):
+        super(FrameGraph, self).__init__(**kwargs)
+        self._redraw = Clock.create_trigger(self.redraw)
+        self.bind(pos=self._redraw, size=self._redraw,
+                  frame_times=self._redraw, budget=self._redraw)
+
+    def redraw(self, *args):
+        self.canvas.clear()
+        # the scale shows up to 3 budgets, longer frames are clipped
+        scale = self.height / (self.budget * 3)
+        step = self.width / max(self.history - 1, 1)
+        x0, y0 = self.pos
+        with self.canvas:
+            Color(0.06, 0.07, 0.08)
+            Rectangle(pos=self.pos, size=self.size)
+
+            Color(0.9, 0.1, 0.1, 0.5)
+            for i, t in enumerate(self.frame_times):
+                if t > self.budget:
+                    Rectangle(pos=(x0 + i * step - step / 2., y0),
+                              size=(max(step, 1), self.height))
+
+            Color(0.54, 0.59, 0.60)
+            budget_y = y0 + self.budget * scale
+            Line(points=[x0, budget_y, self.right, budget_y], dash_length=4,
+                 dash_offset=4)
+
+            Color(0.2, 0.8, 0.3)
+            points = []
+            for i, t in enumerate(self.frame_times):
+                points += [x0 + i * step, y0 + min(t * scale, self.height)]
+            if len(points) >= 4:
+                Line(points=points)
+
+
+class FrameMonitor(BoxLayout):
+    '''Diagnostics panel showing the frame times, the Clock events scheduled
+       by each source and the stacks sampled during slow frames.
+       Nothing is measured until the monitor is started.
+    '''
+
+    graph = ObjectProperty(None)
+    '''Instance of :class:`FrameGraph`
+       :data:`graph` is a :class:`~kivy.properties.ObjectProperty`
+    '''
+    running = ObjectProperty(False)
+    '''Indicates if the frames are being measured
+       :data:`running` is a :class:`~kivy.properties.ObjectProperty`
+    '''
+    budget_ms = NumericProperty(33)
+    '''Frame time budget in milliseconds
+       :data:`budget_ms` is a :class:`~kivy.properties.NumericProperty`
+    '''
+    summary = StringProperty('Stopped')
+    '''Frame rate and number of slow frames
+       :data:`summary` is a :class:`~kivy.properties.StringProperty`
+    '''
+    clock_events = StringProperty('')
+    '''Number of Clock events by source
+       :data:`clock_events` is a :class:`~kivy.properties.StringProperty`
+    '''
+    slow_frames = StringProperty('')
+    '''Slow frames with their sampled stacks, the latest first
+       :data:`slow_frames` is a :class:`~kivy.properties.StringProperty`
+    '''
+
+    def __init__(self, **kwargs):
+        super(FrameMonitor, self).__init__(**kwargs)
+        self.sampler = FrameSampler(budget=self.budget_ms / 1000.)
+
+    def on_budget_ms(self, *args):
+        self.sampler.budget = self.budget_ms / 1000.
+
+    def toggle(self, *args):
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+
+    def start(self):
+        self.sampler.start()
+        self.running = True
+        Clock.schedule_interval(self.update, 0.5)
+
+    def stop(self):
+        Clock.unschedule(self.update)
+        self.sampler.stop()
+        self.running = False
+        self.update()
+
+    def reset(self, *args):
+        self.sampler.reset()
+        self.update()
+
+    def update(self, *args):
+        '''Displays the last measurements
+        '''
+        sampler = self.sampler
+        times = list(sampler.frame_times)
+        self.graph.history = sampler.frame_times.maxlen
+        self.graph.frame_times = times
+
+        if times:
+            mean = sum(times) / len(times)
+            self.summary = '%.0f fps, mean %.1f ms, max %.1f ms, ' \
+                           '%d slow frames' % (
+                1 / mean if mean else 0, mean * 1000, max(times) * 1000,
+                len(sampler.slow_frames))
+        else:
+            self.summary = 'Running' if self.running else 'Stopped'
+
+        events = sorted(sampler.clock_events.items(),
+                        key=lambda item: item[1], reverse=True)
+        lines = ['Clock events by source (without triggers)']
+        lines += [f'{count:>7}  {source}' for source, count in events[:50]]
+        self.clock_events = '\n'.join(lines)
+
+        lines = []
+        for frame in reversed(sampler.slow_frames):
+            lines.append('%s  %.1f ms' % (
+                time.strftime('%H:%M:%S', time.localtime(frame['time'])),
+                frame['duration'] * 1000))
+            for count, stack in frame['stacks'][:3]:
+                lines.append(f'  sampled {count}x:')
+                lines.append(stack.rstrip())
+            lines.append('')
+        self.slow_frames = '\n'.join(lines)
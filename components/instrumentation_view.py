@@ -0,0 +1,107 @@
+__all__ = ['InstrumentationBubble', ]
+
+from utils.instrumentation import instrumentation
+from utils.utils import get_config_dir, show_message
+
+from kivy.properties import StringProperty
+from kivy.core.window import Window
+from kivy.lang.builder import Builder
+from kivy.uix.bubble import Bubble
+from kivy.clock import Clock
+
+import time
+import os
+
+Builder.load_string("""
+
+<InstrumentationBubble>:
+    size_hint: None, None
+    width: '520dp'
+    height: '320dp'
+    arrow_pos: 'bottom_right'
+    BoxLayout:
+        orientation: 'vertical'
+        padding: '5dp'
+        spacing: '4dp'
+        ScrollView:
+            Label:
+                text: root.report
+                font_name: 'RobotoMono-Regular'
+                font_size: '9pt'
+                size_hint: None, None
+                size: self.texture_size
+                halign: 'left'
+                valign: 'top'
+        BoxLayout:
+            size_hint_y: None
+            height: '30sp'
+            spacing: '4dp'
+            Button:
+                text: 'Reset'
+                on_release: root.reset()
+            Button:
+                text: 'Dump to file'
+                on_release: root.dump()
+            Button:
+                text: 'Close'
+                on_release: root.hide()
+
+""")
+
+
+class InstrumentationBubble(Bubble):
+    '''Popover displaying the timers and counters recorded by
+       :data:`~designer.utils.instrumentation.instrumentation`.
+       The report is updated every second while visible.
+    '''
+
+    report = StringProperty('')
+    '''Text of the instrumentation report
+       :data:`report` is a :class:`~kivy.properties.StringProperty`
+    '''
+
+    def show(self, widget):
+        '''Displays the bubble above the widget
+        '''
+        self.update()
+        if self.parent:
+            return None
+        x, y = widget.to_window(widget.right, widget.top)
+        self.pos = (max(0, x - self.width), y)
+        Window.add_widget(self)
+        Clock.schedule_interval(self.update, 1)
+
+    def hide(self, *args):
+        Clock.unschedule(self.update)
+        if self.parent:
+            Window.remove_widget(self)
+
+    def toggle(self, widget):
+        if self.parent:
+            self.hide()
+        else:
+            self.show(widget)
+
+    def update(self, *args):
+        if not instrumentation.enabled:
+            self.report = 'Instrumentation is disabled. ' \
+                          'Enable it in the Kivy Designer settings'
+            return None
+        self.report = instrumentation.report()
+
+    def reset(self, *args):
+        instrumentation.reset()
+        self.update()
+
+    def dump(self, *args):
+        '''Writes the results to the designer config dir
+        '''
+        name = time.strftime('instrumentation_%Y%m%d_%H%M%S.json')
+        path = instrumentation.dump(os.path.join(get_config_dir(), name))
+        show_message(f'Instrumentation results saved to {path}', 5, 'info')
+
+    def on_touch_down(self, touch):
+        if not self.collide_point(*touch.pos):
+            self.hide()
+            return False
+        return super(InstrumentationBubble, self).on_touch_down(touch)
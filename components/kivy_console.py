@@ -83,6 +83,7 @@ __all__ = ['KivyConsole', 'std_in_out']
 
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.textinput import TextInput
+from utils.instrumentation import instrumentation
 from utils.utils import get_fs_encoding
 from kivy.core.window import Window
 from kivy.uix.button import Button
@@ -341,6 +342,7 @@ class KivyConsole(GridLayout):
         
         return p
 
+    @instrumentation.timed('KivyConsole.update_output')
     def _change_txtcache(self, *args):
         '''Update the Kivy Console output area
         '''
@@ -834,6 +836,7 @@ class std_in_out(object):
     def update_cache(self, text_line, *l):
         '''Update the output text area
         '''
+        instrumentation.count('KivyConsole lines')
         self.obj.textcache.append(text_line)
 
     def read_from_in_pipe(self, *l):
@@ -3,6 +3,8 @@ __all__ = ['PlaygroundDragElement', 'Playground']
 from core.undo_manager import WidgetDragOperation, WidgetOperation
 from uix.confirmation_dialog import ConfirmationDialogSave
 from uix.settings import SettingListContent
+from utils.instrumentation import instrumentation
+from core.thumbnails import thumbnail_cache
 from utils.toolbox_widgets import toolbox_widgets as widgets_common
 
 from utils.utils import (
@@ -20,6 +22,7 @@ from kivy.lang.builder import Builder
 from kivy.graphics import Color, Line
 
 from kivy.uix.popup import Popup
+from kivy.uix.image import Image
 from kivy.uix.layout import Layout
 from kivy.uix.carousel import Carousel
 from kivy.uix.boxlayout import BoxLayout
@@ -38,9 +41,17 @@ from kivy.properties import (
     ObjectProperty, OptionProperty,
 )
 
+from collections import OrderedDict
 import re
 import os
 
+DRAG_ELEMENTS_POOL = 2
+'''Number of released drag elements kept by the Playground
+'''
+DRAG_PREVIEWS_CACHE = 8
+'''Number of drag previews kept by the Playground, by widget name
+'''
+
 Builder.load_string("""
 
 #: import hex utils.colors.hex
@@ -108,45 +119,75 @@ class PlaygroundDragElement(BoxLayout):
        drag-n-drop, from one position to another.
        :data:`drag_type` is a :class:`~kivy.properties.OptionProperty`
     '''
-    drag_parent = ObjectProperty(None)
+    drag_parent = ObjectProperty(None, allownone=True)
     '''Parent of currently dragged widget.
        Will be none if 'drag_type' is 'new widget'
        :data:`drag_parent` is a :class:`~kivy.properties.ObjectProperty`
     '''
-    widgettree = ObjectProperty(None)
+    widgettree = ObjectProperty(None, allownone=True)
     '''Reference to class:`~designer.nodetree.WidgetsTree`,
         the widget_tree of Designer.
        :data:`widgettree` is a :class:`~kivy.properties.ObjectProperty`
     '''
-    child = ObjectProperty(None)
+    child = ObjectProperty(None, allownone=True)
     '''The widget which is currently being dragged.
        :data:`child` is a :class:`~kivy.properties.ObjectProperty`
     '''
-    widget = ObjectProperty(None)
+    widget = ObjectProperty(None, allownone=True)
     '''The widget which is currently being dragged and will be added to the UI.
         This is similar to child, however does not contains custom style used
         to present the dragging widget
        :data:`widget` is a :class:`~kivy.properties.ObjectProperty`
     '''
     def __init__(self, **kwargs):
+        self._bound_widget = None
         super(PlaygroundDragElement, self).__init__(**kwargs)
+        self._default_size = self.size[:]
         if self.child:
             self.add_widget(self.child)
 
+    def setup(self, child, widget):
+        '''Prepares a released element for a new drag
+        :param child: widget displayed while dragging
+        :param widget: widget that will be added
+        '''
+        self.child = child
+        self.widget = widget
+        if child:
+            self.add_widget(child)
+
+    def reset(self):
+        '''Clears the state of the last drag, so the element can be reused
+        '''
+        self.remove_lines_on_child()
+        if self.child and self.child.parent is self:
+            self.remove_widget(self.child)
+        self.child = None
+        self.widget = None
+        self.widgettree = None
+        self.drag_parent = None
+        self.drag_type = 'new widget'
+        self.can_place = False
+        self.size = self._default_size
+
     def show_lines_on_child(self, *args):
         '''To schedule Clock's callback for _show_lines_on_child.
         '''
         Clock.schedule_once(self._show_lines_on_child)
 
     def on_widget(self, *args):
-        def update_parent(*largs):
-            p = self.widget.parent
-            if p:
-                self.widget.KD__last_parent = p
-        
-        self.widget.unbind(parent=update_parent)
-        self.widget.bind(parent=update_parent)
-        update_parent()
+        if self._bound_widget is not None:
+            self._bound_widget.unbind(parent=self._update_parent)
+        self._bound_widget = self.widget
+        if self.widget is None:
+            return None
+        self.widget.bind(parent=self._update_parent)
+        self._update_parent()
+
+    def _update_parent(self, *args):
+        p = self.widget.parent
+        if p:
+            self.widget.KD__last_parent = p
 
     def _show_lines_on_child(self, *args):
         '''To show boundaries around the child.
@@ -386,6 +427,7 @@ class PlaygroundDragElement(BoxLayout):
         
         self.playground.drag_operation = []
         self.playground.from_drag = False
+        self.playground.release_drag_element(self)
         return True
 
     def fit_child(self, *args):
@@ -465,6 +507,8 @@ class Playground(ScatterPlane):
         self.widget_to_paste = None
         self._popup = None
         self._last_root = None
+        self._drag_elements = []  # released PlaygroundDragElement
+        self._drag_previews = OrderedDict()  # widget name -> preview widget
 
     def on_root(self, *args):
         if self.root:
@@ -548,6 +592,7 @@ class Playground(ScatterPlane):
         show_message('No widget found!', 5, 'error')
         self.sandbox.clear_widgets()
 
+    @instrumentation.timed('Playground.load_widget')
     def load_widget(self, widget_name, update_kv_lang=True):
         '''Load and display and widget given its name.
         If widget is not found, shows information on status bar and clear
@@ -638,6 +683,7 @@ class Playground(ScatterPlane):
         except (KeyError, AttributeError):
             show_message(f'Failed to load {widget_name} widget', 5, 'error')
 
+    @instrumentation.timed('Playground.on_reload_kv')
     def on_reload_kv(self, kv_lang_area, text, force):
         '''Reloads widgets from kv lang input and update the
         visible widget.
@@ -660,6 +706,10 @@ class Playground(ScatterPlane):
                 kv_path = self.kv_code_input.path
             
             proj.parse_kv(text, kv_path)
+            if force:
+                # the classes were imported again, so the thumbnails of
+                # the changed widgets are rendered again
+                get_designer().designer_content.toolbox.update_thumbnails()
             # if was displaying one widget, but it was removed
             if self.root_name and self.root_name not in proj.app_widgets:
                 self.load_widget_from_file(self.root_app_widget.kv_path)
@@ -875,9 +925,6 @@ class Playground(ScatterPlane):
         # create default widget that will be added and the custom to display
         widget = self.get_widget(widget_name, **default_args)
         widget._KD_KV_STR = self.generate_kv_from_args(widget_name, default_args)
-        values = default_args.copy()
-        values.update(extra_args)
-        child = self.get_widget(widget_name, **values)
         custom = False
 
         for op in widgets_common:
@@ -885,9 +932,21 @@ class Playground(ScatterPlane):
                 if op[1] == 'custom':
                     custom = True
                 break
-        container = PlaygroundDragElement(playground=self, child=child, widget=widget)
+
+        thumbnail = thumbnail_cache.get(widget_name) if custom else None
+        values = default_args.copy()
+        values.update(extra_args)
+        if thumbnail:
+            # displays the image instead of creating the widget again
+            child = Image(source=thumbnail, size_hint=(None, None),
+                          size=(dp(160), dp(120)), fit_mode='contain')
+        elif custom:
+            child = self.get_widget(widget_name, **values)
+        else:
+            child = self.get_drag_preview(widget_name, **values)
+        container = self.acquire_drag_element(child, widget)
         
-        if not custom:
+        if not custom or thumbnail:
             container.fit_child()
         
         touch.grab(container)
@@ -899,6 +958,39 @@ class Playground(ScatterPlane):
         container.y = touch_pos[1] + dp(20)
         return container
 
+    def acquire_drag_element(self, child, widget):
+        '''Returns a :class:`PlaygroundDragElement` released by a previous
+        drag, or a new one
+        :param child: widget displayed while dragging
+        :param widget: widget that will be added
+        '''
+        if self._drag_elements:
+            container = self._drag_elements.pop()
+            container.setup(child, widget)
+            return container
+        return PlaygroundDragElement(playground=self, child=child, widget=widget)
+
+    def release_drag_element(self, container):
+        '''Keeps a dropped :class:`PlaygroundDragElement` to be reused
+        '''
+        container.reset()
+        if len(self._drag_elements) < DRAG_ELEMENTS_POOL:
+            self._drag_elements.append(container)
+
+    def get_drag_preview(self, widget_name, **values):
+        '''Returns the widget displayed while dragging a new widget_name.
+        The previews are only displayed, so the last ones are reused
+        '''
+        preview = self._drag_previews.pop(widget_name, None)
+        if preview is None or preview.parent is not None:
+            preview = self.get_widget(widget_name, **values)
+            if preview is None:
+                return None
+        self._drag_previews[widget_name] = preview
+        while len(self._drag_previews) > DRAG_PREVIEWS_CACHE:
+            self._drag_previews.popitem(last=False)
+        return preview
+
     def cleanup(self):
         '''This function is used to clean the state of Playground, cleaning
            the changes done by currently opened project.
@@ -954,6 +1046,7 @@ class Playground(ScatterPlane):
             d.undo_manager.push_operation(
                 WidgetOperation('remove', widget, parent, self, removed_str))
 
+    @instrumentation.timed('Playground.find_target')
     def find_target(self, x, y, target, widget=None):
         '''This widget is used to find the widget which collides with x,y
         :param widget: widget to be added in target
@@ -961,6 +1054,10 @@ class Playground(ScatterPlane):
         :param x: position to search
         :param y: position to search
         '''
+        return self._find_target(x, y, target, widget)
+
+    def _find_target(self, x, y, target, widget=None):
+        instrumentation.count('Playground.find_target visits')
         if target is None or not target.collide_point(x, y):
             return None
 
@@ -991,7 +1088,7 @@ class Playground(ScatterPlane):
                 elif widget:
                     if isinstance(child, TabbedPanel):
                         if child.current_tab:
-                            _item = self.find_target(
+                            _item = self._find_target(
                                 x, y, child.current_tab.content, widget)
                             return _item
 
@@ -999,7 +1096,7 @@ class Playground(ScatterPlane):
                         return target
 
             elif isinstance(child.parent, Carousel):
-                t = self.find_target(x, y, child, widget)
+                t = self._find_target(x, y, child, widget)
                 return t
 
             else:
@@ -1010,7 +1107,7 @@ class Playground(ScatterPlane):
                         child.children:
                     continue
 
-                return self.find_target(x, y, child, widget)
+                return self._find_target(x, y, child, widget)
         return target
 
     def _custom_widget_collides(self, widget, x, y):
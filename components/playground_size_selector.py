@@ -57,15 +57,13 @@ class PlaygroundSizeSelector(Button):
        :data:`playground` is an :class:`~kivy.properties.ObjectProperty`
     '''
     def on_playground(self, *_):
-        '''Create a
+        '''Show the size of the current playground. The
         :class:
             `~designer.components.playground_size_selector.PlaygroundSizeView`
-           for the current playground.
+           is created when the button is pressed.
         '''
-        self.view = PlaygroundSizeView(selected_size=self.playground.size)
-        self.view.bind(selected_size=self._update_playground)
-        self.view.bind(selected_size_name=self.setter('text'))
-        self.text = self.view.selected_size_name
+        self.view = None
+        self.text = size_text(self.playground.size)
 
     def _update_playground(self, _, size):
         '''Callback to update the playground size on :data:`selected_size`
@@ -83,6 +81,10 @@ class PlaygroundSizeSelector(Button):
         :class:
             `~designer.components.playground_size_selector.PlaygroundSizeView`
         '''
+        if self.view is None:
+            self.view = PlaygroundSizeView(selected_size=self.playground.size)
+            self.view.bind(selected_size=self._update_playground)
+            self.view.bind(selected_size_name=self.setter('text'))
         self.view.size_hint = None, None
         self.view.width = self.get_root_window().width / 2.0
         self.view.height = self.get_root_window().height / 2.0
@@ -201,20 +203,12 @@ class PlaygroundSizeView(ModalView):
     def find_size(self):
         '''Find the size name and orientation for the current size.
         '''
-        orientation = self.check_orientation(self.selected_size)
-        check_size = tuple(sorted(self.selected_size, reverse=True)).__eq__
-
-        for _, values in self.default_sizes:
-            for name, size in values:
-                if check_size(size):
-                    return name, size, orientation
-
-        return ('Custom', self.selected_size, orientation)
+        return find_size(self.selected_size)
 
     def check_orientation(self, size):
         '''Determine if the provided size is portrait or landscape.
         '''
-        return 'portrait' if size[1] > size[0] else 'landscape'
+        return check_orientation(size)
 
     def update_buttons(self, size_name=None):
         '''Update the toggle state of the size buttons and open the
@@ -233,10 +227,7 @@ class PlaygroundSizeView(ModalView):
         '''Callback to update properties on changes to :data:`selected_size`.
         '''
         size_info = self.find_size()
-        self.selected_size_name = ('%s\n[color=777777](%s, %dx%d)[/color]' %
-                                   (size_info[0], size_info[2],
-                                    size_info[1][0], size_info[1][1]))
-        
+        self.selected_size_name = size_text(self.selected_size)
         self.selected_orientation = size_info[2]
         self.update_buttons(size_info[0])
 
@@ -256,3 +247,34 @@ class PlaygroundSizeView(ModalView):
         '''Callback to update size on changes to :data:`selected_orientation`.
         '''
         self.update_size(self.selected_size)
+
+
+def check_orientation(size):
+    '''Determine if the provided size is portrait or landscape.
+    '''
+    return 'portrait' if size[1] > size[0] else 'landscape'
+
+
+def find_size(size):
+    '''Find the name and orientation of a size, from
+       :data:`PlaygroundSizeView.default_sizes`.
+       :return: (name, size, orientation), the name is 'Custom' if the size
+       isn't a default one
+    '''
+    orientation = check_orientation(size)
+    check_size = tuple(sorted(size, reverse=True)).__eq__
+
+    for _, values in PlaygroundSizeView.default_sizes:
+        for name, default_size in values:
+            if check_size(default_size):
+                return name, default_size, orientation
+
+    return ('Custom', size, orientation)
+
+
+def size_text(size):
+    '''Text of the :class:`PlaygroundSizeSelector` for a size
+    '''
+    name, size, orientation = find_size(size)
+    return ('%s\n[color=777777](%s, %dx%d)[/color]' %
+            (name, orientation, size[0], size[1]))
@@ -4,6 +4,7 @@ __all__ = [
 
 from core.undo_manager import PropOperation
 from uix.settings import SettingListContent
+from utils.instrumentation import instrumentation
 from utils.utils import FakeSettingList, get_designer
 
 from kivy.uix.scrollview import ScrollView
@@ -319,6 +320,7 @@ class PropertyViewer(ScrollView):
         '''
         self.prop_list.clear_widgets()
 
+    @instrumentation.timed('PropertyViewer.discover')
     def discover(self, value):
         '''To discover all properties and add their
            :class:`~designer.components.property_viewer.PropertyLabel` and
@@ -69,6 +69,12 @@ Builder.load_string("""
             shorten: True
             shorten_from: 'left'
 
+    ProgressBar:
+        id: progress_bar
+        size_hint_x: None
+        width: '120dp' if root.show_progress_bar else 0
+        opacity: 1 if root.show_progress_bar else 0
+
     StatusInfo:
         id: status_info
         size_hint_x: 0.1
@@ -83,6 +89,16 @@ Builder.load_string("""
             shorten: True
             shorten_from: 'left'
 
+    Button:
+        id: instrumentation_btn
+        text: 'Timers'
+        font_size: '10pt'
+        size_hint_x: None
+        width: (self.texture_size[0] + dp(20)) if root.show_instrumentation else 0
+        opacity: 1 if root.show_instrumentation else 0
+        disabled: not root.show_instrumentation
+        on_release: root.dispatch('on_instrumentation_press', self)
+
 <StatusNavBarButton>:
     text: getattr(self.node, '__class__').__name__
     font_size: '10pt'
@@ -102,7 +118,7 @@ class StatusNavBarButton(Button):
     '''StatusNavBarButton is a :class:`~kivy.uix.button` representing
        the Widgets in the Widget hierarchy of currently selected widget.
     '''
-    node = ObjectProperty(None)
+    node = ObjectProperty(None, allownone=True)
 
 class StatusNavBarSeparator(Label):
     '''StatusNavBarSeparator :class:`~kivy.uix.label.Label`
@@ -208,24 +224,34 @@ class StatusBar(BoxLayout):
        :data:`playground` is an
        :class:`~kivy.properties.ObjectProperty`
     '''
-    __events__ = ('on_message_press', 'on_info_press', )
+    show_instrumentation = ObjectProperty(False)
+    '''Displays the button of the instrumentation results
+       :data:`show_instrumentation` is an
+       :class:`~kivy.properties.ObjectProperty` and defaults to False
+    '''
+    show_progress_bar = ObjectProperty(False)
+    '''Displays the progress bar of a long task, see :meth:`show_progress`
+       :data:`show_progress_bar` is an
+       :class:`~kivy.properties.ObjectProperty` and defaults to False
+    '''
+    __events__ = ('on_message_press', 'on_info_press',
+                  'on_instrumentation_press', )
 
     def __init__(self, **kwargs):
         super(StatusBar, self).__init__(**kwargs)
         self.update_navbar = Clock.create_trigger(self._update_navbar)
         self.update_nav_size = Clock.create_trigger(self._update_content_width)
-
-    def _update_navbar(self, *args):
-        '''To update navbar with the parents of currently selected Widget.
+        self._nav_buttons = []  # StatusNavBarButton displayed, from the root
+        self._nav_separators = []  # separator after each button but the last
+        self._free_buttons = []
+        self._free_separators = []
+
+    def _get_nav_path(self, wid):
+        '''Returns the widgets displayed by the navbar for the selected
+        widget, from the root
         '''
-        self.navbar.clear_widgets()
-        wid = self.app.widget_focused
-        if not wid:
-            self.update_nav_size()
-            return None
-
         # get parent list, until app.root.playground.root
-        children = []
+        nodes = []
         while wid:
             if wid in {self.playground.sandbox, self.playground.sandbox.children[0]}:
                 break
@@ -233,26 +259,69 @@ class StatusBar(BoxLayout):
             if isinstance(wid, TabbedPanelContent):
                 _wid = wid
                 wid = wid.parent.current_tab
-                children.append(StatusNavBarButton(node=wid))
+                nodes.append(wid)
                 wid = _wid.parent
 
             elif isinstance(wid, TabbedPanelHeader):
-                children.append(StatusNavBarButton(node=wid))
+                nodes.append(wid)
                 _wid = wid
                 while _wid and not isinstance(_wid, TabbedPanel):
                     _wid = _wid.parent
                 wid = _wid
 
-            children.append(StatusNavBarButton(node=wid))
+            nodes.append(wid)
             wid = wid.parent
 
-        count = len(children)
-        for index, child in enumerate(reversed(children)):
-            self.navbar.add_widget(child)
-            if index < count - 1:
-                self.navbar.add_widget(StatusNavBarSeparator())
+        nodes.reverse()
+        return nodes
+
+    def _update_navbar(self, *args):
+        '''To update navbar with the parents of currently selected Widget.
+        The buttons of the ancestors shared with the previous selection are
+        kept, and the removed buttons are reused.
+        '''
+        wid = self.app.widget_focused
+        nodes = self._get_nav_path(wid) if wid else []
+
+        buttons = self._nav_buttons
+        common = 0
+        for button, node in zip(buttons, nodes):
+            if button.node is not node:
+                break
+            common += 1
+
+        # remove the buttons after the shared ancestors
+        while len(buttons) > common:
+            button = buttons.pop()
+            self.navbar.remove_widget(button)
+            button.node = None
+            button.state = 'normal'
+            self._free_buttons.append(button)
+            if len(self._nav_separators) > max(len(buttons) - 1, 0):
+                separator = self._nav_separators.pop()
+                self.navbar.remove_widget(separator)
+                self._free_separators.append(separator)
+
+        if buttons:
+            buttons[-1].state = 'normal'
+        for node in nodes[common:]:
+            if buttons:
+                separator = self._free_separators.pop() \
+                    if self._free_separators else StatusNavBarSeparator()
+                self._nav_separators.append(separator)
+                self.navbar.add_widget(separator)
+            if self._free_buttons:
+                button = self._free_buttons.pop()
+                button.node = node
             else:
-                child.state = 'down'
+                button = StatusNavBarButton(node=node)
+            buttons.append(button)
+            self.navbar.add_widget(button)
+
+        if buttons:
+            buttons[-1].state = 'down'
+        else:
+            self.update_nav_size()
 
     def on_app(self, instance, app, *args):
         app.bind(widget_focused=self._update_navbar)
@@ -289,6 +358,26 @@ class StatusBar(BoxLayout):
         '''
         self.status_info.update_info(info, branch_name)
 
+    def show_progress(self, value, max_value, message=''):
+        '''Shows the progress bar and a loading message until
+        :meth:`hide_progress` is called
+        :param value: number of finished items
+        :param max_value: number of items, 0 if unknown
+        :param message: message to display
+        '''
+        progress_bar = self.ids.progress_bar
+        progress_bar.max = max(max_value, 1)
+        progress_bar.value = min(value, progress_bar.max)
+        self.show_progress_bar = True
+        if message:
+            self.show_message(message, -1, 'loading')
+
+    def hide_progress(self):
+        '''Hides the progress bar and its message
+        '''
+        self.show_progress_bar = False
+        self.status_message.clear_message()
+
     def on_message_press(self, *args):
         '''Event handler to message widget touch down
         '''
@@ -298,3 +387,8 @@ class StatusBar(BoxLayout):
         '''Event handler to info widget touch down
         '''
         pass
+
+    def on_instrumentation_press(self, *args):
+        '''Event handler to instrumentation button release
+        '''
+        pass
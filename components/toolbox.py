@@ -1,13 +1,20 @@
-__all__ = ['ToolboxCategory', 'ToolboxButton', 'Toolbox']
+__all__ = ['ToolboxCategory', 'ToolboxButton', 'ToolboxPreview', 'Toolbox']
 
-from utils.toolbox_widgets import toolbox_widgets
+from utils.toolbox_widgets import toolbox_index
+from utils.utils import get_current_project
+from core.thumbnails import thumbnail_cache
 
 from kivy.clock import Clock
+from kivy.metrics import dp
 from kivy.factory import Factory
+from kivy.uix.image import Image
 from kivy.uix.button import Button
+from kivy.core.window import Window
 from kivy.lang.builder import Builder
 from kivy.uix.boxlayout import BoxLayout
-from kivy.properties import ObjectProperty
+from kivy.properties import (
+    ListProperty, ObjectProperty, StringProperty,
+)
 from kivy.uix.accordion import AccordionItem
 
 
@@ -15,58 +22,144 @@ Builder.load_string("""
 
 <Toolbox>:
     accordion: accordion
+    search_input: search_input
+    orientation: 'vertical'
+    TextInput:
+        id: search_input
+        size_hint_y: None
+        height: '30sp'
+        multiline: False
+        write_tab: False
+        hint_text: 'Search widgets'
+        on_text: root.filter(self.text)
     Accordion:
         id: accordion
         orientation: 'vertical'
-        pos: root.pos
         min_space: '1dp'
-        size_hint_y: None
-        height: root.height
 
 <ToolboxCategory>:
-    gridlayout: gridlayout
+    recycleview: recycleview
     size_hint_y: None
     height: '22dp'
-    title: self.title[0].upper() + self.title[1:]
-    ScrollView:
+    title: root.label + (' (%d)' % len(root.names) if root.search else '')
+    RecycleView:
+        id: recycleview
         pos: root.pos
         bar_width: '10dp'
         scroll_type: ['bars', 'content']
-        GridLayout:
-            id: gridlayout
-            cols: 1
-            padding: '5dp'
+        viewclass: 'ToolboxButton'
+        RecycleBoxLayout:
+            orientation: 'vertical'
+            padding: ['5dp', '48dp', '5dp', '45dp']
             spacing: '3dp'
+            default_size: None, dp(52)
+            default_size_hint: 1, None
             size_hint_y: None
-            height: self.minimum_height + dp(40)
-            Widget:
-                size_hint_y:None
-                height: '40dp'
+            height: self.minimum_height
 
 <ToolboxButton>:
     size_hint_y: None
     height: '52dp'
     font_size: '10pt'
+    padding: [self.height, 0, 0, 0] if self.thumbnail else [0, 0, 0, 0]
     on_press_and_touch: app.create_draggable_element(self, self.text, args[1])
+    Image:
+        source: root.thumbnail
+        opacity: 1 if root.thumbnail else 0
+        size: root.height - dp(8), root.height - dp(8)
+        pos: root.x + dp(4), root.y + dp(4)
+        fit_mode: 'contain'
+
+<ToolboxPreview>:
+    size_hint: None, None
+    size: '160dp', '120dp'
+    fit_mode: 'contain'
+    canvas.before:
+        Color:
+            rgba: 0.1, 0.1, 0.1, 0.9
+        Rectangle:
+            pos: self.pos
+            size: self.size
 
 """)
 
 class ToolboxCategory(AccordionItem):
     '''ToolboxCategory is responsible for grouping and showing
        :class:`~designer.components.toolbox.ToolboxButton`
-       of same class into one category.
+       of same class into one category. The buttons are only created while
+       the category is expanded, and are recycled when scrolling.
     '''
-    gridlayout = ObjectProperty(None)
-    '''An instance of :class:`~kivy.uix.gridlayout.GridLayout`.
-       :data:`gridlayout` is an
+    recycleview = ObjectProperty(None)
+    '''An instance of :class:`~kivy.uix.recycleview.RecycleView`.
+       :data:`recycleview` is an
        :class:`~kivy.properties.ObjectProperty`
     '''
+    label = StringProperty('')
+    '''Category name displayed in the title
+       :data:`label` is a :class:`~kivy.properties.StringProperty`
+    '''
+    names = ListProperty([])
+    '''Names of the widgets displayed in this category
+       :data:`names` is a :class:`~kivy.properties.ListProperty`
+    '''
+    search = StringProperty('')
+    '''Text used to filter :data:`names`
+       :data:`search` is a :class:`~kivy.properties.StringProperty`
+    '''
+
+    def __init__(self, **kwargs):
+        self._populated = False
+        super(ToolboxCategory, self).__init__(**kwargs)
+
+    def on_names(self, *args):
+        self._populated = False
+        if not self.collapse:
+            self.populate()
+
+    def on_collapse(self, instance, collapse, *args):
+        super(ToolboxCategory, self).on_collapse(instance, collapse)
+        if not collapse and not self._populated:
+            self.populate()
+
+    def populate(self):
+        '''Displays the buttons of :data:`names`
+        '''
+        self.recycleview.data = [
+            {'text': name, 'thumbnail': thumbnail_cache.get(name) or ''}
+            for name in self.names]
+        self._populated = True
+
+    def update_thumbnail(self, name, source):
+        '''Displays the thumbnail of a widget, if its button is populated
+        '''
+        if not self._populated:
+            return None
+        data = self.recycleview.data
+        for i, item in enumerate(data):
+            if item['text'] == name:
+                data[i] = {'text': name, 'thumbnail': source}
+                break
+
+    def button_at(self, pos):
+        '''Returns the displayed button at the window position, or None
+        '''
+        layout = self.recycleview.layout_manager
+        if self.collapse or layout is None:
+            return None
+        for button in layout.children:
+            if button.collide_point(*button.to_widget(*pos)):
+                return button
+        return None
 
 class ToolboxButton(Button):
     '''ToolboxButton is a subclass of :class:`~kivy.uix.button.Button`,
        to display class of Widgets in
        :class:`~designer.components.toolbox.ToolboxCategory`.
     '''
+    thumbnail = StringProperty('')
+    '''Path of the widget thumbnail, displayed beside its name
+       :data:`thumbnail` is a :class:`~kivy.properties.StringProperty`
+    '''
     def __init__(self, **kwargs):
         self.register_event_type('on_press_and_touch')
         super(ToolboxButton, self).__init__(**kwargs)
@@ -84,9 +177,17 @@ class ToolboxButton(Button):
         '''
         pass
 
+class ToolboxPreview(Image):
+    '''ToolboxPreview displays the thumbnail of the App Widget under the
+       mouse, beside the :class:`~designer.components.toolbox.Toolbox`.
+    '''
+    pass
+
 class Toolbox(BoxLayout):
     '''Toolbox is used to display all the widgets in designer.common.widgets
-       in their respective classes.
+       in their respective classes. The widgets are read from
+       :data:`~designer.utils.toolbox_widgets.toolbox_index` and can be
+       filtered by name.
     '''
     accordion = ObjectProperty()
     '''An instance to :class:`~kivy.uix.accordion.Accordion`,
@@ -94,70 +195,125 @@ class Toolbox(BoxLayout):
        :data:`accordion` is an
        :class:`~kivy.properties.ObjectProperty`
     '''
+    search_input = ObjectProperty()
+    '''An instance to :class:`~kivy.uix.textinput.TextInput`, used to
+       filter the widgets.
+       :data:`search_input` is an
+       :class:`~kivy.properties.ObjectProperty`
+    '''
     app = ObjectProperty()
     '''An instance to the current running app.
        :data:`app` is an
        :class:`~kivy.properties.ObjectProperty`
     '''
+    search = StringProperty('')
+    '''Text used to filter the widgets
+       :data:`search` is a :class:`~kivy.properties.StringProperty`
+    '''
     def __init__(self, **kwargs):
         super(Toolbox, self).__init__(**kwargs)
         Clock.schedule_once(self.discover_widgets)
         self.custom_category = None
-        self._list = []
+        self.categories = {}  # category -> ToolboxCategory
+        self.preview = ToolboxPreview()
+        thumbnail_cache.bind(on_thumbnail=self._on_thumbnail)
+        Window.bind(mouse_pos=self._on_mouse_pos)
 
     def discover_widgets(self, *largs):
-        '''To create and add ToolboxCategory and ToolboxButton for widgets in
-           designer.common.widgets
+        '''To create and add ToolboxCategory for widgets in
+           designer.common.widgets. The buttons are created when the
+           category is expanded
         '''
         # for now, don't do auto detection of widgets.
         # just do manual discovery, and tagging.
-        categories = list(set([x[1] for x in toolbox_widgets]))
-        categories.sort()
-        for category in categories:
-            toolbox_category = ToolboxCategory(title=category)
+        for category in toolbox_index.categories():
+            if category == 'custom':
+                # displayed by update_app_widgets
+                continue
+            toolbox_category = ToolboxCategory(
+                label=category[0].upper() + category[1:])
+            self.categories[category] = toolbox_category
             self.accordion.add_widget(toolbox_category)
+            self._filter_category(category)
+
+        self.accordion.children[-1].collapse = False
 
-            cat_widgets = []
-            for widget in toolbox_widgets:
-                if widget[1] == category:
-                    cat_widgets.append(widget)
+    def filter(self, search):
+        '''Displays only the widgets whose names contain the search text.
+        If the expanded category has no results, expands the first one that
+        has
+        '''
+        self.search = search.strip()
+        for category in self.categories:
+            self._filter_category(category)
 
-            cat_widgets.sort()
-            for widget in cat_widgets:
-                toolbox_category.gridlayout.add_widget(
-                    ToolboxButton(text=widget[0]))
+        expanded = [c for c in self.categories.values() if not c.collapse]
+        if expanded and expanded[0].names:
+            return None
+        for toolbox_category in reversed(self.accordion.children):
+            if toolbox_category.names:
+                toolbox_category.collapse = False
+                break
 
-        self.accordion.children[-1].collapse = False
+    def _filter_category(self, category):
+        toolbox_category = self.categories[category]
+        toolbox_category.search = self.search
+        toolbox_category.names = toolbox_index.names(category, self.search)
 
     def cleanup(self):
-        '''To clean all the children in self.custom_category.
+        '''To remove self.custom_category.
         '''
         if not self.custom_category:
             return None
         
         self.accordion.remove_widget(self.custom_category)
         Factory.register('BoxLayout', module='kivy.uix.boxlayout')
-        self.custom_category = ToolboxCategory(title='App Widgets')
-        self._list.append(self.custom_category)
+        self.custom_category = None
+        self.categories.pop('custom', None)
+        thumbnail_cache.clear()
+        self._hide_preview()
 
     def update_app_widgets(self):
         '''To add/update self.custom_category with new custom classes loaded
            by project.
         '''
+        toolbox_index.refresh()
+        if not self.custom_category:
+            self.custom_category = ToolboxCategory(label='App Widgets')
+            self.categories['custom'] = self.custom_category
+            self.accordion.add_widget(self.custom_category)
+        self._filter_category('custom')
+        self.update_thumbnails()
+
+    def update_thumbnails(self):
+        '''Renders the thumbnails of the App Widgets changed since the last
+        update, in background. The thumbnails show the classes loaded by the
+        last parse of the project
+        '''
+        thumbnail_cache.update(get_current_project())
+
+    def _on_thumbnail(self, instance, name, source, *args):
         if self.custom_category:
-            self.accordion.remove_widget(self.custom_category)
-            self._list = []
-        
-        self.custom_category = ToolboxCategory(title='App Widgets')
-        self._list.append(self.custom_category)
-        self.accordion.add_widget(self.custom_category)
-
-        custom_widgets = []
-        for widget in toolbox_widgets:
-            if widget[1] == 'custom':
-                custom_widgets.append(widget)
-
-        custom_widgets.sort()
-        grid = self.custom_category.gridlayout
-        for widget in custom_widgets:
-            grid.add_widget(ToolboxButton(text=widget[0]))
+            self.custom_category.update_thumbnail(name, source)
+
+    def _on_mouse_pos(self, window, pos, *args):
+        '''Shows the thumbnail of the App Widget under the mouse
+        '''
+        button = None
+        if self.custom_category and self.get_root_window():
+            button = self.custom_category.button_at(pos)
+        if button is None or not button.thumbnail:
+            self._hide_preview()
+            return None
+
+        preview = self.preview
+        preview.source = button.thumbnail
+        right = self.to_window(self.right, self.y)[0]
+        center_y = button.to_window(*button.center)[1]
+        preview.pos = (right + dp(5), center_y - preview.height / 2.)
+        if not preview.parent:
+            Window.add_widget(preview)
+
+    def _hide_preview(self):
+        if self.preview.parent:
+            self.preview.parent.remove_widget(self.preview)
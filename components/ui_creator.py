@@ -27,6 +27,7 @@ Builder.load_string("""
     tab_pannel: tab_pannel
     eventviewer: eventviewer
     py_console: py_console
+    frame_monitor: frame_monitor
 
     GridLayout:
         height: root.height
@@ -117,6 +118,11 @@ Builder.load_string("""
                                 pos_hint: {'x': 0.8}
                                 on_release: root.reload_btn_pressed()
 
+                    DesignerTabbedPanelItem:
+                        text: 'Diagnostics'
+                        FrameMonitor:
+                            id: frame_monitor
+
                     DesignerTabbedPanelItem:
                         text: 'Kivy Console'
                         KivyConsole:
@@ -350,6 +356,9 @@ class UICreator(FloatLayout):
        containing error_console, kivy_console and kv_lang_area
     '''
     eventviewer = ObjectProperty(None)
+    frame_monitor = ObjectProperty(None)
+    '''Instance of :class:`~designer.components.frame_monitor.FrameMonitor`
+    '''
 
     def __init__(self, **kwargs):
         super(UICreator, self).__init__(**kwargs)
@@ -1,5 +1,6 @@
 __all__ = ['WidgetTreeElement', 'WidgetsTree']
 
+from utils.instrumentation import instrumentation
 from utils.toolbox_widgets import toolbox_widgets
 from utils.utils import get_current_project
 
@@ -130,6 +131,7 @@ class WidgetsTree(ScrollView):
             self._clear_tree(tree, n)
             remove_node(n)
 
+    @instrumentation.timed('WidgetsTree.refresh')
     def _refresh(self, *l):
         '''This function will refresh the tree. It will first remove all nodes
            and then insert them using recursive_insert
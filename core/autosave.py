@@ -0,0 +1,167 @@
+__all__ = ['AutoSaveService', ]
+
+from utils.utils import write_file_atomic
+
+from kivy.event import EventDispatcher
+from kivy.properties import BooleanProperty, ObjectProperty
+from kivy.clock import Clock
+
+from functools import partial
+import threading
+import hashlib
+import os
+
+
+def content_hash(content):
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+class AutoSaveService(EventDispatcher):
+    '''Saves the modified code inputs in background.
+
+       Only the buffers whose content changed since they were last saved are
+       written. Files are written by a background thread with
+       :func:`~designer.utils.utils.write_file_atomic`, and the project
+       watcher ignores only the written files while saving.
+       When the files are written, on_saved is dispatched on the main thread
+       with the list of saved paths, and on_error with a dict of
+       {path: error message} if some of them failed.
+
+       Files saved by the main thread must be passed to :meth:`cancel` before
+       being written, so an older content is not written over them.
+    '''
+
+    running = BooleanProperty(False)
+    '''Indicates if there are files being written
+       :data:`running` is a :class:`~kivy.properties.BooleanProperty`
+    '''
+    project_watcher = ObjectProperty(None)
+    '''Instance of :class:`~designer.core.project_manager.ProjectWatcher`
+       paused for the written files
+       :data:`project_watcher` is a :class:`~kivy.properties.ObjectProperty`
+    '''
+    __events__ = ('on_saved', 'on_error', )
+
+    def __init__(self, **kwargs):
+        super(AutoSaveService, self).__init__(**kwargs)
+        self._hashes = {}  # path -> hash of the last saved content
+        self._pending = {}  # path -> hash of the content to be written
+        self._lock = threading.Lock()
+
+    def mark_saved(self, path, content):
+        '''Records the content saved to a file by someone else, e.g. by
+        :meth:`~designer.core.project_manager.Project.save`
+        '''
+        with self._lock:
+            self._hashes[path] = content_hash(content)
+
+    def cancel(self, path):
+        '''Drops the pending write of a file. If the file is being written,
+        the written content doesn't replace it
+        '''
+        with self._lock:
+            self._pending.pop(path, None)
+
+    def forget(self):
+        '''Removes the saved hashes, used when the project is closed
+        '''
+        with self._lock:
+            self._hashes = {}
+
+    def save(self, code_inputs):
+        '''Writes the code inputs modified since they were saved
+        :param code_inputs: list of code inputs of the project
+        :return: False if a previous save is still running
+        '''
+        if self.running:
+            return False
+
+        jobs = []  # (code input, path, content, hash)
+        for code in code_inputs:
+            if not code.path or code.saved:
+                continue
+            content = code.text
+            digest = content_hash(content)
+            with self._lock:
+                if self._hashes.get(code.path) == digest:
+                    # changed and restored
+                    code.saved = True
+                    continue
+            jobs.append((code, code.path, content, digest))
+
+        if not jobs:
+            return True
+
+        paths = [job[1] for job in jobs]
+        with self._lock:
+            for code, path, content, digest in jobs:
+                self._pending[path] = digest
+        if self.project_watcher:
+            self.project_watcher.pause_paths(paths)
+        self.running = True
+        files = [(path, content) for code, path, content, digest in jobs]
+        threading.Thread(target=self._write, args=(jobs, files),
+                         daemon=True).start()
+        return True
+
+    def _write(self, jobs, files):
+        '''Writes the files, runs in a separated thread
+        '''
+        errors = {}
+        written = set()
+        for path, content in files:
+            with self._lock:
+                if path not in self._pending:
+                    # cancelled
+                    continue
+            # the lock is not held while writing, so the main thread isn't
+            # blocked by the fsync of large files
+            try:
+                if write_file_atomic(path, content, commit=self._commit):
+                    written.add(path)
+            except (OSError, UnicodeError) as e:
+                errors[path] = str(e)
+            with self._lock:
+                self._pending.pop(path, None)
+        Clock.schedule_once(partial(self._done, jobs, written, errors))
+
+    def _commit(self, temp_path, path):
+        '''Replaces the file with the written one, unless the write was
+        cancelled meanwhile
+        '''
+        with self._lock:
+            if self._pending.pop(path, None) is None:
+                return False
+            os.replace(temp_path, path)
+        return True
+
+    def _done(self, jobs, written, errors, *args):
+        saved = []
+        for code, path, content, digest in jobs:
+            if path not in written:
+                continue
+            with self._lock:
+                self._hashes[path] = digest
+            saved.append(path)
+            # the buffer may have been modified while writing
+            if code.path == path and code.text == content:
+                code.saved = True
+
+        paths = [job[1] for job in jobs]
+        if self.project_watcher:
+            self.project_watcher.resume_paths(paths)
+        self.running = False
+        if saved:
+            self.dispatch('on_saved', saved)
+        if errors:
+            self.dispatch('on_error', errors)
+
+    def on_saved(self, *args):
+        '''Dispatched with the list of saved paths
+        '''
+        pass
+
+    def on_error(self, *args):
+        '''Dispatched with a dict of {path: error message}
+        '''
+        pass
@@ -0,0 +1,273 @@
+__all__ = ['copy_file', 'CopyEngine', ]
+
+from kivy.event import EventDispatcher
+from kivy.properties import BooleanProperty, NumericProperty
+from kivy.clock import Clock
+
+from functools import partial
+import threading
+import shutil
+import errno
+import time
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+FICLONE = 0x40049409
+'''Linux ioctl cloning a file, supported by btrfs, xfs and other
+copy-on-write filesystems
+'''
+IGNORED_DIRS = ('.designer', '.buildozer', 'bin', '__pycache__', )
+'''Folders not copied by :meth:`CopyEngine.copy_tree`
+'''
+CHUNK_SIZE = 8 * 1024 * 1024
+# errors meaning that a fast path is not available for these files
+_UNSUPPORTED = {errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EPERM,
+                errno.EOPNOTSUPP, errno.ENOTTY, errno.EBADF}
+
+
+class CopyCancelled(Exception):
+    pass
+
+
+def _clone(src_fd, dst_fd):
+    '''Shares the blocks of the file, if the filesystem supports it
+    '''
+    if fcntl is None:
+        return False
+    try:
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+    except OSError as e:
+        if e.errno in _UNSUPPORTED:
+            return False
+        raise
+    return True
+
+
+def _copy_range(src_fd, dst_fd, size, on_chunk):
+    '''Copies the file in the kernel with copy_file_range
+    :return: False if not supported
+    '''
+    if not hasattr(os, 'copy_file_range'):
+        return False
+    done = 0
+    while done < size:
+        try:
+            copied = os.copy_file_range(
+                src_fd, dst_fd, min(CHUNK_SIZE, size - done))
+        except OSError as e:
+            if done == 0 and e.errno in _UNSUPPORTED:
+                return False
+            raise
+        if copied == 0:
+            # the file was truncated while copying
+            break
+        done += copied
+        on_chunk(copied)
+    return True
+
+
+def _copy_chunks(src, dst, on_chunk):
+    while True:
+        data = src.read(CHUNK_SIZE)
+        if not data:
+            break
+        dst.write(data)
+        on_chunk(len(data))
+
+
+def copy_file(src, dst, on_chunk=None):
+    '''Copies a file with its permission bits and times, trying the fastest
+    way first: a clone of the file blocks, copy_file_range and then a copy
+    by chunks.
+    :param on_chunk: called with the number of bytes copied, may raise
+        an exception to stop the copy
+    :return: the method used: 'clone', 'range' or 'chunks'
+    '''
+    on_chunk = on_chunk or (lambda size: None)
+    size = os.stat(src).st_size
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        if _clone(fsrc.fileno(), fdst.fileno()):
+            method = 'clone'
+            on_chunk(size)
+        elif _copy_range(fsrc.fileno(), fdst.fileno(), size, on_chunk):
+            method = 'range'
+        else:
+            method = 'chunks'
+            _copy_chunks(fsrc, fdst, on_chunk)
+    shutil.copystat(src, dst)
+    return method
+
+
+class CopyEngine(EventDispatcher):
+    '''Copies files and folders in a background thread.
+
+       A copy first lists the sources to know the total size, then copies
+       the files with :func:`copy_file`. on_progress is dispatched on the main
+       thread with (copied bytes, total bytes) at most every
+       :data:`progress_interval` seconds, on_copied with the destination when
+       the copy is done and on_error with the error message.
+
+       :meth:`cancel` stops the copy between two chunks. A destination folder
+       created by the copy is removed when it's cancelled or fails. A new
+       copy waits for the cancelled one to stop before writing anything.
+    '''
+
+    running = BooleanProperty(False)
+    '''Indicates if there is a copy running
+       :data:`running` is a :class:`~kivy.properties.BooleanProperty`
+    '''
+    progress_interval = NumericProperty(0.1)
+    '''Minimum time in seconds between two on_progress
+       :data:`progress_interval` is a
+       :class:`~kivy.properties.NumericProperty`
+    '''
+    __events__ = ('on_progress', 'on_copied', 'on_error', )
+
+    def __init__(self, **kwargs):
+        super(CopyEngine, self).__init__(**kwargs)
+        self._token = None
+        self._thread = None
+
+    def copy_tree(self, src, dst, ignore=IGNORED_DIRS):
+        '''Copies the content of the folder src to the folder dst,
+        cancelling the current copy. Existing files are replaced
+        :param ignore: names of the folders not copied
+        '''
+        self.copy_files([(src, dst)], dst, ignore)
+
+    def copy_files(self, pairs, dst, ignore=IGNORED_DIRS):
+        '''Copies a list of (source, destination) files or folders,
+        cancelling the current copy
+        :param dst: destination dispatched by on_copied
+        '''
+        self.cancel()
+        token = self._token = object()
+        self.running = True
+        self._thread = threading.Thread(
+            target=self._copy,
+            args=(token, self._thread, list(pairs), dst, set(ignore)),
+            daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        '''Stops the current copy
+        '''
+        self._token = None
+        self.running = False
+
+    def _is_cancelled(self, token):
+        return token is not self._token
+
+    def _list(self, token, pairs, ignore):
+        '''Returns the folders to create and the files to copy
+        '''
+        dirs = []  # destination folders
+        files = []  # (source, destination, size)
+        links = []  # (link target, destination)
+        for src, dst in pairs:
+            if not os.path.isdir(src):
+                files.append((src, dst, os.stat(src).st_size))
+                continue
+            dirs.append(dst)
+            stack = [(src, dst)]
+            while stack:
+                if self._is_cancelled(token):
+                    raise CopyCancelled()
+                folder, target = stack.pop()
+                with os.scandir(folder) as it:
+                    for entry in it:
+                        dest = os.path.join(target, entry.name)
+                        if entry.is_symlink():
+                            links.append((os.readlink(entry.path), dest))
+                        elif entry.is_dir():
+                            if entry.name in ignore:
+                                continue
+                            dirs.append(dest)
+                            stack.append((entry.path, dest))
+                        else:
+                            files.append(
+                                (entry.path, dest, entry.stat().st_size))
+        return dirs, files, links
+
+    def _copy(self, token, previous, pairs, dst, ignore):
+        '''Copies the files, runs in a separated thread
+        :param previous: thread of the cancelled copy
+        '''
+        if previous is not None:
+            # it may still be removing the folder it created
+            previous.join()
+        if self._is_cancelled(token):
+            return None
+        created = not os.path.exists(dst)
+        progress = {'done': 0, 'total': 0, 'time': 0}
+
+        def on_chunk(size):
+            if self._is_cancelled(token):
+                raise CopyCancelled()
+            progress['done'] += size
+            now = time.monotonic()
+            if now - progress['time'] >= self.progress_interval:
+                progress['time'] = now
+                Clock.schedule_once(partial(
+                    self._progress, token, progress['done'],
+                    progress['total']))
+
+        try:
+            dirs, files, links = self._list(token, pairs, ignore)
+            progress['total'] = sum(size for src, dest, size in files)
+            for folder in dirs:
+                os.makedirs(folder, exist_ok=True)
+            for src, dest, size in files:
+                on_chunk(0)
+                os.makedirs(os.path.dirname(dest) or '.', exist_ok=True)
+                copy_file(src, dest, on_chunk)
+            for target, dest in links:
+                if os.path.lexists(dest):
+                    os.remove(dest)
+                os.symlink(target, dest)
+        except CopyCancelled:
+            self._remove(dst, created)
+            return None
+        except Exception as e:
+            self._remove(dst, created)
+            Clock.schedule_once(
+                partial(self._done, token, None, str(e) or repr(e)))
+            return None
+        Clock.schedule_once(partial(self._done, token, dst, None))
+
+    def _remove(self, dst, created):
+        if created:
+            shutil.rmtree(dst, ignore_errors=True)
+
+    def _progress(self, token, done, total, *args):
+        if not self._is_cancelled(token):
+            self.dispatch('on_progress', done, total)
+
+    def _done(self, token, dst, error, *args):
+        if self._is_cancelled(token):
+            return None
+        self._token = None
+        self.running = False
+        if error is not None:
+            self.dispatch('on_error', error)
+        else:
+            self.dispatch('on_copied', dst)
+
+    def on_progress(self, *args):
+        '''Dispatched with (copied bytes, total bytes)
+        '''
+        pass
+
+    def on_copied(self, *args):
+        '''Dispatched with the destination when the copy is done
+        '''
+        pass
+
+    def on_error(self, *args):
+        '''Dispatched with the error message if the copy failed
+        '''
+        pass
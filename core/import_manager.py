@@ -0,0 +1,166 @@
+__all__ = ['ImportGeneration', 'ImportManager', 'import_manager']
+
+from kivy.factory import Factory
+from kivy.lang import Builder
+from kivy.lang.parser import ParserSelectorName
+
+try:
+    from imp import new_module
+except ModuleNotFoundError:
+    from types import ModuleType as new_module
+from six import exec_
+import hashlib
+import inspect
+import sys
+
+
+class ImportGeneration(object):
+    '''A project module and the classes created by one import of its file
+    '''
+    __slots__ = ('name', 'path', 'digest', 'generation', 'module', 'classes')
+
+    def __init__(self, name, path, digest, generation, module):
+        self.name = name
+        self.path = path
+        self.digest = digest
+        self.generation = generation
+        self.module = module
+        self.classes = []  # list of (name, class)
+
+
+class ImportManager(object):
+    '''Imports the project python files as KDImport modules.
+
+       Each import of a changed file creates a new generation of its module.
+       The previous generation is retired before the new one is executed: the
+       module leaves sys.modules and its widget classes are removed from the
+       Factory and from the Builder match cache. The Builder rules of these
+       classes are removed only if they're in the `rules` given by the
+       project (the entries loaded from its kv files), so rules of the same
+       name from other files, like Kivy's style.kv or the designer kv files,
+       are kept.
+
+       Kivy keeps internal per-class caches that can't be cleared, so each
+       generation leaves its classes behind. Files whose source didn't change
+       keep their current generation instead of being executed again.
+    '''
+
+    def __init__(self):
+        self.generation = 0
+        '''Incremented each time a module is imported or retired
+        '''
+        self.modules = {}  # module name -> ImportGeneration
+
+    def load(self, name, source, path, compile_source, rules=()):
+        '''Imports a project file as the module `name`. If the source changed
+        since the last import, the previous generation is retired and the
+        code returned by compile_source(source) is executed.
+        Exceptions raised by the code are propagated.
+        :param rules: Builder rule entries that can be removed, see
+            :meth:`retire`
+        :return: the :class:`ImportGeneration`
+        '''
+        digest = hashlib.sha1(source.encode('utf-8')).hexdigest()
+        record = self.modules.get(name)
+        if self._is_current(record, name, digest, path):
+            return record
+
+        code = compile_source(source)
+        self.retire(name, rules)
+        self.generation += 1
+        module = new_module(name)
+        module.__file__ = path
+        exec_(code, module.__dict__)
+        sys.modules[name] = module
+
+        record = ImportGeneration(name, path, digest, self.generation, module)
+        record.classes = inspect.getmembers(
+            module,
+            lambda member:
+                inspect.isclass(member) and member.__module__ == name)
+        self.modules[name] = record
+        return record
+
+    def is_current(self, name, source, path):
+        '''Indicates if :meth:`load` would keep the current generation of
+        the module, without executing the source
+        '''
+        digest = hashlib.sha1(source.encode('utf-8')).hexdigest()
+        return self._is_current(self.modules.get(name), name, digest, path)
+
+    def _is_current(self, record, name, digest, path):
+        return record is not None and record.digest == digest and \
+            record.path == path and sys.modules.get(name) is record.module
+
+    def get(self, name):
+        '''Returns the current :class:`ImportGeneration` of a module
+        '''
+        return self.modules.get(name)
+
+    def retire(self, name, rules=()):
+        '''Removes a module and all references to its classes
+        :param rules: Builder rule entries that can be removed, usually the
+            ones loaded from the project kv files. The entries targeting the
+            retired classes are removed from the Builder
+        '''
+        record = self.modules.pop(name, None)
+        module = sys.modules.get(name)
+        if record is None:
+            # imported before the manager, or failed while executing
+            if module is None:
+                return None
+            classes = inspect.getmembers(
+                module,
+                lambda member:
+                    inspect.isclass(member) and member.__module__ == name)
+        else:
+            classes = record.classes
+            record.classes = []
+            record.module = None
+
+        if module is not None:
+            del sys.modules[name]
+        self.generation += 1
+        self._forget_classes(classes, rules)
+
+    def retire_missing(self, paths, rules=()):
+        '''Retires the modules whose files are not in paths
+        '''
+        paths = set(paths)
+        for name, record in list(self.modules.items()):
+            if record.path not in paths:
+                self.retire(name, rules)
+
+    def retire_all(self, rules=()):
+        for name in list(self.modules):
+            self.retire(name, rules)
+
+    def _forget_classes(self, classes, rules):
+        if not classes:
+            return None
+        retired = dict((klass_name, klass) for klass_name, klass in classes)
+
+        # the Factory ignores redeclarations, unregister the old classes so
+        # the next generation can be registered
+        for klass_name, klass in retired.items():
+            item = Factory.classes.get(klass_name)
+            if item is not None and item['cls'] is klass:
+                Factory.unregister(klass_name)
+
+        # entries are removed by identity, a rule with many selectors
+        # (<Foo,Bar>) has one entry by class
+        keys = set(klass_name.lower() for klass_name in retired)
+        purged = set(id(item) for item in rules
+                     if isinstance(item[0], ParserSelectorName) and
+                     item[0].key in keys)
+        if purged:
+            Builder.rules = [item for item in Builder.rules
+                             if id(item) not in purged]
+        # the match cache is keyed by class
+        Builder._clear_matchcache()
+
+
+import_manager = ImportManager()
+'''Import manager shared by the projects, module names depend only on the
+   file paths
+'''
@@ -0,0 +1,151 @@
+__all__ = ['KVParseResult', 'KVParseCache', 'kv_cache']
+
+from kivy.factory import Factory
+from kivy.lang import Builder
+from kivy.lang.parser import Parser
+
+from collections import OrderedDict
+from functools import partial
+import threading
+import hashlib
+import os
+import re
+
+KV_EVENT_RE = r'(\s+on_\w+\s*:.+)|(^[\s\w\d]+:[\.]+[\s\w]+\(.*)'
+KV_ROOT_WIDGET = r'^([\w\d_]+)\:'
+KV_APP_WIDGET = r'^<([\w\d_@]+)>\:'
+
+
+def kv_digest(src):
+    return hashlib.sha1(src.encode('utf-8')).hexdigest()
+
+
+class KVParseResult(object):
+    '''The parsed rule tree of a kv source and the widget names found in it
+    '''
+    __slots__ = ('digest', 'path', 'parser', 'root_widgets', 'app_widgets')
+
+    def __init__(self, digest, path, parser, root_widgets, app_widgets):
+        self.digest = digest
+        self.path = path
+        self.parser = parser
+        self.root_widgets = root_widgets
+        self.app_widgets = app_widgets
+
+
+class KVParseCache(object):
+    '''Keeps the :class:`~kivy.lang.parser.Parser` of the last kv sources,
+       keyed by their content hash and path.
+
+       :meth:`load` does the same as Builder.load_string, but registers the
+       rules from the cached Parser, so unchanged files are not tokenized
+       again. Results are keyed by path too: the rules of a Parser are indexed
+       by identity when their file is unloaded, so two files can't share them.
+
+       :meth:`strip_events` doesn't use kivy, and can run in a background
+       thread. :meth:`parse` must run on the main thread: the Parser executes
+       the #:import and #:set directives of the source.
+    '''
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.results = OrderedDict()  # (digest, path) -> KVParseResult
+        self.stripped = OrderedDict()  # digest -> source without events
+        self._lock = threading.Lock()
+
+    def strip_events(self, src):
+        '''Returns the kv source without the events and method calls
+        '''
+        digest = kv_digest(src)
+        with self._lock:
+            stripped = self.stripped.get(digest)
+            if stripped is not None:
+                self.stripped.move_to_end(digest)
+                return stripped
+        stripped = re.sub(KV_EVENT_RE, '', src, flags=re.MULTILINE)
+        self._store(self.stripped, digest, stripped)
+        return stripped
+
+    def parse(self, src, path):
+        '''Returns the :class:`KVParseResult` of the kv source and a boolean
+        indicating if it came from the cache. Raises the Parser exceptions
+        '''
+        key = (kv_digest(src), path)
+        with self._lock:
+            result = self.results.get(key)
+            if result is not None:
+                self.results.move_to_end(key)
+                return result, True
+
+        parser = Parser(content=src, filename=os.path.basename(path))
+        result = KVParseResult(
+            key[0], path, parser,
+            re.findall(KV_ROOT_WIDGET, src, re.MULTILINE),
+            re.findall(KV_APP_WIDGET, src, re.MULTILINE))
+        self._store(self.results, key, result)
+        return result, False
+
+    def load(self, src, path):
+        '''Loads the kv source in the Builder, as Builder.load_string
+        :return: (the root widget or None, the :class:`KVParseResult`)
+        '''
+        result, cached = self.parse(src, path)
+        parser = result.parser
+        if cached:
+            # imports and #:set values may have been overwritten since the
+            # parse, a new Parser would run the directives again
+            parser.execute_directives()
+        return self._load_parser(parser, parser.filename), result
+
+    def _load_parser(self, parser, fn):
+        Builder._current_filename = fn
+        try:
+            Builder.rules.extend(parser.rules)
+            Builder._clear_matchcache()
+
+            for name, cls, template in parser.templates:
+                Builder.templates[name] = (cls, template, fn)
+                Factory.register(name,
+                                 cls=partial(Builder.template, name),
+                                 is_template=True, warn=True)
+
+            for name, baseclasses in parser.dynamic_classes.items():
+                Factory.register(name, baseclasses=baseclasses, filename=fn,
+                                 warn=True)
+
+            if fn and (parser.templates or
+                       parser.dynamic_classes or parser.rules):
+                Builder.files.append(fn)
+
+            if not parser.root:
+                return None
+            widget = Factory.get(parser.root.name)(__no_builder=True)
+            rule_children = []
+            widget.apply_class_lang_rules(
+                root=widget, rule_children=rule_children)
+            Builder._apply_rule(
+                widget, parser.root, parser.root,
+                rule_children=rule_children)
+
+            for child in rule_children:
+                child.dispatch('on_kv_post', widget)
+            widget.dispatch('on_kv_post', widget)
+            return widget
+        finally:
+            Builder._current_filename = None
+
+    def _store(self, entries, key, value):
+        with self._lock:
+            entries[key] = value
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self.results.clear()
+            self.stripped.clear()
+
+
+kv_cache = KVParseCache()
+'''Parse cache shared by the projects
+'''
@@ -0,0 +1,168 @@
+__all__ = ['ProjectLoader', ]
+
+from kivy.event import EventDispatcher
+from kivy.properties import BooleanProperty, NumericProperty, ObjectProperty, StringProperty
+from kivy.clock import Clock
+
+from functools import partial
+import threading
+import time
+
+
+class ProjectLoader(EventDispatcher):
+    '''Opens a project in stages, without blocking the UI:
+
+       - discover: lists the project files in a background thread, then
+         on_files_found is dispatched, so the project tree can be displayed.
+       - prepare: reads the sources, strips the events of the kv files and
+         compiles the python files in a background thread.
+       - parse: imports the python files and loads the kv files in the
+         Builder, on the main thread, parsing files until
+         :data:`frame_budget` is used in each frame.
+
+       on_progress is dispatched with the stage, the number of processed
+       files and the number of files. on_loaded is dispatched after the last
+       file is parsed. Loading another project cancels the current one.
+    '''
+
+    project = ObjectProperty(None)
+    '''Instance of the :class:`~designer.core.project_manager.Project` being
+       loaded.
+       :data:`project` is a :class:`~kivy.properties.ObjectProperty`
+    '''
+    stage = StringProperty('')
+    '''Current stage: 'discover', 'prepare', 'parse' or '' when not running
+       :data:`stage` is a :class:`~kivy.properties.StringProperty`
+    '''
+    running = BooleanProperty(False)
+    '''Indicates if there is a project being loaded
+       :data:`running` is a :class:`~kivy.properties.BooleanProperty`
+    '''
+    frame_budget = NumericProperty(1 / 60.)
+    '''Time in seconds used to parse files in each frame. At least one file
+       is parsed by frame.
+       :data:`frame_budget` is a :class:`~kivy.properties.NumericProperty`
+    '''
+    __events__ = ('on_files_found', 'on_progress', 'on_loaded', 'on_error', )
+
+    def __init__(self, **kwargs):
+        super(ProjectLoader, self).__init__(**kwargs)
+        self._token = None
+        self._steps = None
+        self._parse_event = None
+
+    def load(self, project):
+        '''Starts loading a project, cancelling the current load
+        '''
+        self.cancel()
+        token = self._token = object()
+        self.project = project
+        self.running = True
+        self.stage = 'discover'
+        self.dispatch('on_progress', 'discover', 0, 0)
+        threading.Thread(target=self._discover, args=(project, token),
+                         daemon=True).start()
+
+    def cancel(self):
+        '''Stops the current load. Files already parsed stay loaded
+        '''
+        self._token = None
+        if self._parse_event is not None:
+            self._parse_event.cancel()
+            self._parse_event = None
+        if self._steps is not None:
+            self._steps.close()
+            self._steps = None
+        self.running = False
+        self.stage = ''
+
+    def _is_cancelled(self, token):
+        return token is not self._token
+
+    def _discover(self, project, token):
+        try:
+            files = project.find_files()
+        except OSError as e:
+            Clock.schedule_once(partial(self._fail, token, str(e)))
+            return None
+        Clock.schedule_once(partial(self._files_found, token, files))
+
+    def _files_found(self, token, files, *args):
+        if self._is_cancelled(token):
+            return None
+        self.project.file_list = files
+        self.dispatch('on_files_found', self.project)
+
+        self.stage = 'prepare'
+        self.dispatch('on_progress', 'prepare', 0, len(files))
+        threading.Thread(target=self._prepare,
+                         args=(self.project, files, token),
+                         daemon=True).start()
+
+    def _prepare(self, project, files, token):
+        project.prepare_sources(files, partial(self._is_cancelled, token))
+        Clock.schedule_once(partial(self._start_parse, token))
+
+    def _start_parse(self, token, *args):
+        if self._is_cancelled(token):
+            return None
+        self.stage = 'parse'
+        self._steps = self.project.parse_steps()
+        self._parse_event = Clock.schedule_interval(
+            partial(self._parse_frame, token), 0)
+
+    def _parse_frame(self, token, *args):
+        if self._is_cancelled(token):
+            return False
+        deadline = time.perf_counter() + self.frame_budget
+        try:
+            while True:
+                done, total, path = next(self._steps)
+                if time.perf_counter() >= deadline:
+                    break
+        except StopIteration:
+            self._finish()
+            return False
+        except Exception as e:
+            self._fail(token, str(e))
+            return False
+        self.dispatch('on_progress', 'parse', done, total)
+
+    def _finish(self):
+        project = self.project
+        self._parse_event = None
+        self._steps = None
+        self._token = None
+        self.running = False
+        self.stage = ''
+        self.dispatch('on_loaded', project)
+
+    def _fail(self, token, error, *args):
+        if self._is_cancelled(token):
+            return None
+        self._token = None
+        self._parse_event = None
+        self._steps = None
+        self.running = False
+        self.stage = ''
+        self.dispatch('on_error', error)
+
+    def on_files_found(self, *args):
+        '''Dispatched when the project file list is available
+        '''
+        pass
+
+    def on_progress(self, *args):
+        '''Dispatched with (stage, number of processed files, number of files)
+        '''
+        pass
+
+    def on_loaded(self, *args):
+        '''Dispatched when all the project files were parsed
+        '''
+        pass
+
+    def on_error(self, *args):
+        '''Dispatched with the error message if the project can't be opened
+        '''
+        pass
@@ -1,10 +1,14 @@
 __all__ = [
     'ProjectEventHandler', 'ProjectWatcher', 'CallWrapper',
-    'AppWidget', 'Project', 'ProjectManager']
+    'compile_project_source', 'AppWidget', 'Project', 'ProjectManager']
 
+from core.import_manager import import_manager
+from core.project_loader import ProjectLoader
+from core.kv_cache import kv_cache
+from utils.instrumentation import instrumentation
 from utils.utils import (
-    get_app_widget, get_designer,
-    show_error_console, show_message,
+    get_designer, show_error_console, show_message,
+    write_file_atomic, ATOMIC_WRITE_EXT,
 )
 
 from kivy.event import EventDispatcher
@@ -18,25 +22,16 @@ from kivy.properties import (
     StringProperty, DictProperty,
 )
 
-import re
-try:
-    from imp import new_module
-except ModuleNotFoundError:
-    from types import ModuleType as new_module
+import threading
 import ast
-import os, sys
-import inspect
+import os
 from io import open
-from six import exec_
 from watchdog.observers import Observer
 from watchdog.events import RegexMatchingEventHandler
 
 
 IGNORED_PATHS = ('/.designer', '/.buildozer', '/.git', '/bin', )
-IGNORED_EXTS = ('.pyc', )
-KV_EVENT_RE = r'(\s+on_\w+\s*:.+)|(^[\s\w\d]+:[\.]+[\s\w]+\(.*)'
-KV_ROOT_WIDGET = r'^([\w\d_]+)\:'
-KV_APP_WIDGET = r'^<([\w\d_@]+)>\:'
+IGNORED_EXTS = ('.pyc', ATOMIC_WRITE_EXT, )
 
 
 class ProjectEventHandler(RegexMatchingEventHandler):
@@ -70,6 +65,8 @@ class ProjectWatcher(EventDispatcher):
         self._observer = None
         self._handler = None
         self._watcher = None
+        self._paused_paths = {}  # path -> number of pauses
+        self._paused_lock = threading.Lock()
 
     def start_watching(self, path):
         '''To start watching project_dir.
@@ -115,8 +112,41 @@ class ProjectWatcher(EventDispatcher):
             self._observer.event_queue.queue.clear()
         self._active = True
 
+    def pause_paths(self, paths):
+        '''Ignores the events of some files and of their folders, while
+        the rest of the project is still watched
+        :param paths: list of file paths
+        '''
+        with self._paused_lock:
+            for path in paths:
+                for p in (path, os.path.dirname(path)):
+                    self._paused_paths[p] = self._paused_paths.get(p, 0) + 1
+
+    def resume_paths(self, paths, delay=1):
+        '''Resume the watching of paths paused by :meth:`pause_paths`
+        :param delay: seconds to start the watching
+        '''
+        Clock.schedule_once(lambda *a: self._resume_paths(paths), delay)
+
+    def _resume_paths(self, paths):
+        with self._paused_lock:
+            for path in paths:
+                for p in (path, os.path.dirname(path)):
+                    count = self._paused_paths.get(p, 0) - 1
+                    if count > 0:
+                        self._paused_paths[p] = count
+                    else:
+                        self._paused_paths.pop(p, None)
+
+    def _is_paused(self, event):
+        with self._paused_lock:
+            if not self._paused_paths:
+                return False
+            return event.src_path in self._paused_paths or \
+                getattr(event, 'dest_path', None) in self._paused_paths
+
     def on_any_event(self, event):
-        if self._active:
+        if self._active and not self._is_paused(event):
             # filter events
             path = event.src_path.replace(self._path, '')
             if not path:
@@ -141,6 +171,17 @@ class CallWrapper(ast.NodeTransformer):
             return None
         return node
 
+
+def compile_project_source(src, path):
+    '''Compiles a project python file without the module level calls, to do
+    a safe import
+    '''
+    # remove method calls to do a safe import
+    p = ast.parse(src, os.path.basename(path))
+    p = CallWrapper().visit(p)
+    p = ast.fix_missing_locations(p)
+    return compile(p, os.path.basename(path), 'exec')
+
 class AppWidget(EventDispatcher):
     name = StringProperty('')
     '''Root Widget name.
@@ -212,6 +253,10 @@ class Project(EventDispatcher):
     def __init__(self, **kw):
         super(Project, self).__init__(**kw)
         self._errors = []  # exception messages
+        # kv path -> rules, Factory names and dynamic widgets it loaded
+        self._kv_index = {}
+        # path -> (source, compiled code), see prepare_sources
+        self._prepared = {}
 
     def open(self):
         '''Opens then project
@@ -234,28 +279,44 @@ class Project(EventDispatcher):
         if not force_reload:
             return self.file_list
 
-        file_list = []
+        self.file_list = self.find_files(path)
+        return self.file_list
+
+    def find_files(self, path=None):
+        '''Lists the files in the project folder, without changing
+        :data:`file_list`. The files of the project root come first.
+        Doesn't use kivy, so it can run in a background thread
+        '''
+        if path is None:
+            path = self.path
         for ignored in IGNORED_PATHS:
             if ignored in path:
                 return []
 
-        for _file in os.listdir(path):
-            file_path = os.path.join(path, _file)
-            if os.path.isdir(file_path):
-                file_list += self.get_files(file_path)
-            else:
-                if file_path[file_path.rfind('.'):] not in IGNORED_EXTS:
-                    if os.path.dirname(file_path) == self.path:
-                        file_list.insert(0, file_path)
+        file_list = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    file_list += self.find_files(entry.path)
+                elif entry.path[entry.path.rfind('.'):] not in IGNORED_EXTS:
+                    if path == self.path:
+                        file_list.insert(0, entry.path)
                     else:
-                        file_list.append(file_path)
-
-        self.file_list = file_list
+                        file_list.append(entry.path)
         return file_list
 
     def parse(self, reload_files=False):
         '''Parse project files to analyse python and kv files
         '''
+        for step in self.parse_steps(reload_files):
+            pass
+
+    def parse_steps(self, reload_files=False):
+        '''Generator parsing one project file at each step, used to parse
+        the project without blocking the UI. The errors are displayed after
+        the last file.
+        Yields (number of parsed files, number of files, file path)
+        '''
         if reload_files:
             if not self.get_files():
                 return None
@@ -275,18 +336,66 @@ class Project(EventDispatcher):
             elif ext == '.py' or ext == '.py2' or ext == '.py3':
                 self.py_list.append(_file)
 
-        # find and load classes
-        for py in self.py_list:
-            self.parse_py(py)
-        # find and load root widgets
-        for kv in self.kv_list:
-            src = open(kv, 'r', encoding='utf-8').read()
-            # removes events
-            src = re.sub(KV_EVENT_RE, '', src, flags=re.MULTILINE)
-            self.parse_kv(src, kv)
+        # modules of removed files
+        import_manager.retire_missing(self.py_list, self.kv_rules())
+
+        total = len(self.py_list) + len(self.kv_list)
+        done = 0
+        try:
+            # find and load classes
+            for py in self.py_list:
+                self.parse_py(py)
+                done += 1
+                yield done, total, py
+            # find and load root widgets
+            for kv in self.kv_list:
+                src, code = self._prepared.pop(kv, (None, None))
+                if src is None:
+                    src = open(kv, 'r', encoding='utf-8').read()
+                    # removes events
+                    src = kv_cache.strip_events(src)
+                self.parse_kv(src, kv)
+                done += 1
+                yield done, total, kv
+        finally:
+            self._prepared = {}
 
         self.show_errors()
 
+    def prepare_sources(self, files, cancelled=None):
+        '''Reads the project files and does the parsing work that doesn't
+        need kivy: the events are stripped from the kv sources and changed
+        python files are compiled. Used by the background stage of
+        :class:`~designer.core.project_loader.ProjectLoader`, the next
+        :meth:`parse_steps` uses the prepared sources.
+        The kv Parser is not created here: it runs the #:import and #:set
+        directives, which must run on the main thread.
+        :param cancelled: callable returning True to stop preparing
+        '''
+        prepared = {}
+        for path in files:
+            if cancelled is not None and cancelled():
+                return None
+            ext = path[path.rfind('.'):]
+            if ext not in ('.kv', '.py', '.py2', '.py3'):
+                continue
+            try:
+                src = open(path, 'r', encoding='utf-8').read()
+                if ext == '.kv':
+                    prepared[path] = (kv_cache.strip_events(src), None)
+                elif import_manager.is_current(
+                        self.module_name(path), src, path):
+                    prepared[path] = (src, None)
+                else:
+                    prepared[path] = (src, compile_project_source(src, path))
+            except Exception:
+                # the error is reported when the file is parsed
+                continue
+        if cancelled is not None and cancelled():
+            # another load started, its sources may be different
+            return None
+        self._prepared = prepared
+
     def show_errors(self, *args):
         '''Pop errors got in the last operations and display it on
         Error Console
@@ -302,49 +411,61 @@ class Project(EventDispatcher):
             show_error_console(errors[er], append=True)
             self._errors.remove(errors[er])
 
+    def kv_rules(self):
+        '''Returns the Builder rule entries loaded from the project kv files
+        '''
+        return [item for loaded in self._kv_index.values()
+                for item in loaded['rules']]
+
+    def loaded_digests(self, app_widget):
+        '''Returns the hashes of the kv and python sources that the classes
+        of an :class:`AppWidget` were loaded from, None if not loaded. Saving
+        a file doesn't change them until the project is parsed again
+        '''
+        kv_digest = py_digest = None
+        if app_widget.kv_path in self._kv_index:
+            kv_digest = self._kv_index[app_widget.kv_path]['digest']
+        if app_widget.py_path:
+            record = import_manager.get(self.module_name(app_widget.py_path))
+            if record is not None:
+                py_digest = record.digest
+        return kv_digest, py_digest
+
+    def unload(self):
+        '''Removes the rules and the classes loaded by the project kv files
+        from the Builder and the Factory
+        '''
+        for path in list(self._kv_index):
+            self._clean_old_kv(path)
+
     def _clean_old_kv(self, path):
         '''
         Removes widgets and rules already processed to this file
         :param path: file path - the same that in app_widgets
         '''
-        for key in dict(self.app_widgets):
-            wd = self.app_widgets[key]
-            if path != wd.kv_path:
-                continue
-
-            wdg = get_app_widget(wd)
-            if wdg is None:
-                p = get_designer().ui_creator.playground
-                if p.root_name == wd.name:
-                    wdg = p._last_root
-
-                if not wdg:
-                    continue
-
-            if wd.is_dynamic:
-                del self.app_widgets[key]
+        loaded = self._kv_index.pop(path, None)
+        if loaded is None:
+            return None
 
-            rules = Builder.match(wdg)
-            # Cleaning widget rules
-            for _rule in rules:
-                for _tuple in Builder.rules[:]:
-                    if _tuple[1] != _rule:
-                        continue
+        for name in loaded['dynamic']:
+            self.app_widgets.pop(name, None)
 
-                    Builder.rules.remove(_tuple)
-                    if wd.is_dynamic:
-                        Factory.unregister(wd.name.split('@')[0])
+        if loaded['rules']:
+            rules = set(id(rule) for rule in loaded['rules'])
+            Builder.rules = [rule for rule in Builder.rules
+                             if id(rule) not in rules]
+            Builder._clear_matchcache()
 
-            # Cleaning class rules
-            for rule in Builder.rules[:]:
-                if rule[1].name == '<' + wd.name + '>':
-                    Builder.rules.remove(rule)
-                    break
+        Factory.unregister(*loaded['factory'])
+        if loaded['filename'] in Builder.files:
+            Builder.files.remove(loaded['filename'])
 
+    @instrumentation.timed('Project.parse_kv')
     def parse_kv(self, src, path):
         '''
-        Parses a KV file with Builder.load_string. Identify root widgets and
-        add them to self.root_widgets dict
+        Parses a KV file and loads it in the Builder. Identify root widgets and
+        add them to self.root_widgets dict. Unchanged sources are loaded from
+        the parsed rules kept by :data:`~designer.core.kv_cache.kv_cache`
         :param path: path of the kv file
         :param src: kv string
         :return boolean indicating if succeed in parsing the file
@@ -352,17 +473,30 @@ class Project(EventDispatcher):
         print('parser_kv -> ', path)
         self._clean_old_kv(path)
         root = None
+        filename = os.path.basename(path)
+        # index what the file adds to the Builder and Factory, so it can
+        # be unloaded without searching the rules
+        loaded = {'rules': [], 'factory': [], 'dynamic': [],
+                  'filename': filename, 'digest': None}
+        self._kv_index[path] = loaded
+        first_rule = len(Builder.rules)
+        factory_names = set(Factory.classes)
         try:
-            root = Builder.load_string(src, filename=os.path.basename(path))
+            root, result = kv_cache.load(src, path)
         except Exception as e:
             self._errors.append(str(e))
             d = get_designer()
             d.ui_creator.kv_code_input.have_error = True
             return False
+        finally:
+            loaded['rules'] = Builder.rules[first_rule:]
+            loaded['factory'] = [name for name in Factory.classes
+                                 if name not in factory_names]
+        loaded['digest'] = result.digest
         
         # first, if a root widget was found, maps it
         if root:
-            root_widgets = re.findall(KV_ROOT_WIDGET, src, re.MULTILINE)
+            root_widgets = result.root_widgets
             root_name = type(root).__name__
             for r in root_widgets:
                 if r != root_name:
@@ -383,62 +517,58 @@ class Project(EventDispatcher):
                     self.app_widgets[r] = wdg
 
         # now, get all custom widgets
-        app_widgets = re.findall(KV_APP_WIDGET, src, re.MULTILINE)
-        for a in app_widgets:
+        for a in result.app_widgets:
             wdg = self.app_widgets[a] if a in self.app_widgets else AppWidget()
             wdg.name = a
             if path:
                 wdg.kv_path = path
 
             wdg.is_dynamic = '@' in a
+            if wdg.is_dynamic:
+                loaded['dynamic'].append(a)
             # dynamic widgets are not preloaded by py files
             if wdg not in self.app_widgets:
                 self.app_widgets[a] = wdg
 
         return True
 
+    @instrumentation.timed('Project.parse_py')
     def parse_py(self, path):
         '''Parses a Python file and load it.
         '''
         print('parse_py -> ', path)
-        rel_path = path.replace(self.path, '')
-        # creates a name to the import based in the file name and its path
-        module_name = 'KDImport' + ''.join([x.replace('.py', '').capitalize()
-                                            for x in rel_path.split('/')])
+        module_name = self.module_name(path)
 
-        # remove method calls to do a safe import
-        src = open(path, 'r', encoding='utf-8').read()
-        try:
-            p = ast.parse(src, os.path.basename(path))
-        except SyntaxError as e:
-            self._errors.append(str(e))
-            return False
-        
-        p = CallWrapper().visit(p)
-        p = ast.fix_missing_locations(p)
-        # if module is already loaded, removes it
-        if module_name in sys.modules:
-            del sys.modules[module_name]
-
-        # imports the new python
-        module = new_module(module_name)
+        src, code = self._prepared.pop(path, (None, None))
+        if src is None:
+            src = open(path, 'r', encoding='utf-8').read()
+
+        def compile_source(src):
+            if code is not None:
+                return code
+            return compile_project_source(src, path)
+
+        # imports the python file if it changed, retiring the previous import
         try:
-            exec_(compile(p, os.path.basename(path), 'exec'), module.__dict__)
+            record = import_manager.load(module_name, src, path,
+                                         compile_source, self.kv_rules())
         except Exception as e:
             self._errors.append(str(e))
             return False
-        sys.modules[module_name] = module
 
         # find classes and possible widgets
-        classes = inspect.getmembers(
-            sys.modules[module_name],
-            lambda member:
-                inspect.isclass(member) and member.__module__ == module_name)
-
-        if classes:
-            self.load_widgets(path, classes, module_name)
+        if record.classes:
+            self.load_widgets(path, record.classes, module_name)
         return True
 
+    def module_name(self, path):
+        '''Returns the module name used to import a python file
+        '''
+        rel_path = path.replace(self.path, '')
+        # creates a name to the import based in the file name and its path
+        return 'KDImport' + ''.join([x.replace('.py', '').capitalize()
+                                     for x in rel_path.split('/')])
+
     def load_widgets(self, path, classes, module_name):
         '''
         Analyze classes and loads Widgets from an array
@@ -463,12 +593,13 @@ class Project(EventDispatcher):
 
         return self.app_widgets
 
+    @instrumentation.timed('Project.save')
     def save(self, code_inputs=None, *args):
         '''Get all KD Code input and save the content
         :param code_inputs list of files to save. If None, get all open files
         '''
+        d = get_designer()
         if not code_inputs:
-            d = get_designer()
             code_inputs = d.code_inputs
 
         try:
@@ -478,10 +609,13 @@ class Project(EventDispatcher):
                     continue
             
                 content = code.text
-                with open(fname, 'w', encoding='utf-8') as file:
-                    file.write(content)
-                    file.close()
+                # an older content may be waiting to be autosaved
+                d.autosave.cancel(fname)
+                write_file_atomic(fname, content)
                 code.saved = True
+                d.autosave.mark_saved(fname, content)
+                # check the saved content in background
+                d.lint_service.lint_source(fname, content)
         except IOError as e:
             return False
 
@@ -503,9 +637,15 @@ class ProjectManager(EventDispatcher):
     '''Auto save the project
         :data:`project_manager` is a :class:`~kivy.properties.BooleanProperty`
     '''
+    loader = ObjectProperty(None)
+    '''Instance of :class:`~designer.core.project_loader.ProjectLoader` used
+       by :meth:`load_project`
+       :data:`loader` is a :class:`~kivy.properties.ObjectProperty`
+    '''
     def __init__(self, **kwargs):
         super(ProjectManager, self).__init__(**kwargs)
         self.current_project = Project()
+        self.loader = ProjectLoader()
 
     def open_project(self, path):
         '''Opens a Python project by path, and returns the Project instance
@@ -529,6 +669,27 @@ class ProjectManager(EventDispatcher):
         print('Abriu projeto com sucesso!!')
         return self.projects[path]
 
+    def load_project(self, path):
+        '''Opens a Python project by path, like :meth:`open_project`, but the
+        files are found and parsed in stages by :data:`loader`.
+        Returns the Project instance, that is parsed after the loader
+        on_loaded event
+        '''
+        if path == '' or path is None:
+            return None
+
+        if os.path.isfile(path):
+            path = os.path.dirname(path)
+
+        p = self.projects.get(path)
+        if p is None:
+            p = Project(path=path)
+            self.projects[path] = p
+        p.saved = True
+        self.current_project = p
+        self.loader.load(p)
+        return p
+
     def close_current_project(self):
         '''Closes a project, setting saved as True and new_project as False,
         and removing it from current_project
@@ -536,4 +697,8 @@ class ProjectManager(EventDispatcher):
         '''
         self.current_project.saved = True
         self.current_project.new_project = False
+        self.loader.cancel()
+        self.current_project.unload()
         self.current_project = Project()
+        import_manager.retire_all()
+        kv_cache.clear()
@@ -0,0 +1,264 @@
+__all__ = ['text_diff', 'RecoveryStore', ]
+
+from utils.utils import write_file_atomic
+
+from kivy.event import EventDispatcher
+from kivy.properties import NumericProperty, StringProperty
+from kivy.clock import Clock
+
+import threading
+import hashlib
+import weakref
+import queue
+import json
+import os
+
+RECOVERY_DIR = os.path.join('.designer', 'recovery')
+'''Folder of the recovery journals, relative to the project
+'''
+JOURNAL_EXT = '.journal'
+MAX_RECORDS = 100
+'''Number of diffs in a journal before it is rewritten with the full text
+'''
+
+
+def text_diff(old, new):
+    '''Returns the single change from old to new as (start, end, text):
+    new == old[:start] + text + old[end:]. Comparing slices keeps the
+    search in C, so it's cheap on large texts
+    '''
+    size = min(len(old), len(new))
+    # length of the common prefix
+    low, high = 0, size
+    while low < high:
+        mid = (low + high + 1) // 2
+        if old[:mid] == new[:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    prefix = low
+
+    # length of the common suffix, not overlapping the prefix
+    low, high = 0, size - prefix
+    while low < high:
+        mid = (low + high + 1) // 2
+        if old[len(old) - mid:] == new[len(new) - mid:]:
+            low = mid
+        else:
+            high = mid - 1
+    suffix = low
+    return prefix, len(old) - suffix, new[prefix:len(new) - suffix]
+
+
+def read_journal(journal_path):
+    '''Replays a journal
+    :return: (file path, text), or None if the journal can't be read
+    '''
+    path = text = None
+    try:
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # the last record may be incomplete after a crash
+                    break
+                if 'path' in record:
+                    path, text = record['path'], record['text']
+                elif text is not None:
+                    text = text[:record['s']] + record['t'] + text[record['e']:]
+    except (OSError, KeyError, TypeError):
+        return None
+    if path is None:
+        return None
+    return path, text
+
+
+class RecoveryStore(EventDispatcher):
+    '''Journals the unsaved code inputs in the project folder, so their
+       content can be restored after a crash.
+
+       Text changes are collected at most every :data:`interval` seconds.
+       A background thread appends the difference from the last journaled
+       text to a journal by file, in .designer/recovery. The first record of
+       a journal has the full text, and it is rewritten after
+       :data:`MAX_RECORDS` diffs. The journal of a file is removed when it's
+       saved, and all of them when the project is closed.
+
+       The journals found by :meth:`open` are kept in :attr:`recovered`.
+    '''
+
+    interval = NumericProperty(3)
+    '''Seconds between the checks of the modified code inputs
+       :data:`interval` is a :class:`~kivy.properties.NumericProperty`
+    '''
+    project_path = StringProperty('')
+    '''Path of the project being journaled
+       :data:`project_path` is a :class:`~kivy.properties.StringProperty`
+    '''
+
+    def __init__(self, **kwargs):
+        # used by on_interval
+        self._trigger = Clock.create_trigger(self._collect)
+        super(RecoveryStore, self).__init__(**kwargs)
+        self._trigger.timeout = self.interval
+        self.recovered = {}  # path -> text found by open
+        self._tracked = weakref.WeakSet()
+        self._last = {}  # path -> last text sent to the worker
+        self._queue = queue.Queue()
+        self._worker = None
+
+    def on_interval(self, *args):
+        self._trigger.timeout = self.interval
+
+    @property
+    def recovery_dir(self):
+        return os.path.join(self.project_path, RECOVERY_DIR)
+
+    def journal_path(self, path):
+        name = hashlib.sha1(path.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.recovery_dir, name + JOURNAL_EXT)
+
+    def open(self, project_path):
+        '''Starts journaling a project. The journals left by a previous
+        session are read into :attr:`recovered`
+        '''
+        self._last = {}
+        self._put('reset')
+        self.project_path = project_path
+        self.recovered = {}
+        try:
+            names = os.listdir(self.recovery_dir)
+        except OSError:
+            return None
+        for name in names:
+            if not name.endswith(JOURNAL_EXT):
+                continue
+            journal = read_journal(os.path.join(self.recovery_dir, name))
+            if journal is not None:
+                path, text = journal
+                self.recovered[path] = text
+
+    def close(self):
+        '''Stops journaling and removes the journals, used when the project
+        is closed without crashing
+        '''
+        self._trigger.cancel()
+        self.discard_all()
+        self.project_path = ''
+
+    def track(self, code_inputs):
+        '''Watches the text of the code inputs not tracked yet
+        '''
+        for code in code_inputs:
+            # ids from kv are weak proxies, they can't be weakly referenced
+            code = getattr(code, '__self__', code)
+            if code in self._tracked:
+                continue
+            self._tracked.add(code)
+            code.bind(text=self._on_text, saved=self._on_saved)
+
+    def _on_text(self, code, *args):
+        if not code.saved:
+            self._trigger()
+
+    def _on_saved(self, code, saved, *args):
+        if saved and code.path:
+            self.discard(code.path)
+        elif not saved:
+            self._trigger()
+
+    def discard(self, path):
+        '''Removes the journal of a file
+        '''
+        if self._last.pop(path, None) is not None:
+            self._put('discard', self.journal_path(path))
+
+    def discard_all(self):
+        '''Removes the journals of the project, including the recovered ones
+        '''
+        self._last = {}
+        self.recovered = {}
+        if self.project_path:
+            self._put('discard_all', self.recovery_dir)
+
+    def _collect(self, *args):
+        '''Sends the modified texts to the worker
+        '''
+        if not self.project_path:
+            return None
+        for code in list(self._tracked):
+            if not code.path or code.saved or \
+                    not code.path.startswith(self.project_path):
+                continue
+            text = code.text
+            last = self._last.get(code.path)
+            if last is text or last == text:
+                continue
+            self._last[code.path] = text
+            self._put('write', code.path, text, self.journal_path(code.path))
+
+    def _put(self, *job):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._work, daemon=True)
+            self._worker.start()
+        self._queue.put(job)
+
+    def _work(self):
+        '''Background worker writing the journals
+        '''
+        texts = {}  # journal path -> (journaled text, number of records)
+        while True:
+            job = self._queue.get()
+            action = job[0]
+            try:
+                if action == 'write':
+                    self._write(texts, *job[1:])
+                elif action == 'discard':
+                    texts.pop(job[1], None)
+                    self._remove(job[1])
+                elif action == 'discard_all':
+                    texts.clear()
+                    self._remove_all(job[1])
+                elif action == 'reset':
+                    texts.clear()
+            except (OSError, ValueError):
+                # recovery is best effort, never disturb the edition
+                pass
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        '''Waits until the queued journal operations are done
+        '''
+        if self._worker is not None:
+            self._queue.join()
+
+    def _write(self, texts, path, text, journal_path):
+        last, records = texts.get(journal_path, (None, 0))
+        if last is None or records >= MAX_RECORDS:
+            os.makedirs(os.path.dirname(journal_path), exist_ok=True)
+            write_file_atomic(journal_path, json.dumps(
+                {'path': path, 'text': text}) + '\n')
+            texts[journal_path] = (text, 0)
+            return None
+
+        start, end, diff = text_diff(last, text)
+        with open(journal_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'s': start, 'e': end, 't': diff}) + '\n')
+        texts[journal_path] = (text, records + 1)
+
+    def _remove(self, journal_path):
+        try:
+            os.remove(journal_path)
+        except FileNotFoundError:
+            pass
+
+    def _remove_all(self, recovery_dir):
+        try:
+            names = os.listdir(recovery_dir)
+        except OSError:
+            return None
+        for name in names:
+            if name.endswith(JOURNAL_EXT):
+                self._remove(os.path.join(recovery_dir, name))
@@ -1,9 +1,8 @@
 __all__ = ['DesignerSettings', '']
 
 from utils.utils import get_config_dir, get_kd_data_dir, profiles_path
-from uix.settings import SettingList, SettingShortcut
+from uix.settings import LazySettings, SettingList, SettingShortcut
 from kivy.properties import ObjectProperty
-from kivy.uix.settings import Settings
 from kivy.config import ConfigParser
 
 import shutil
@@ -28,9 +27,9 @@ if not hasattr(ConfigParser, 'upgrade'):
     ConfigParser.upgrade = upgrade
 
 
-class DesignerSettings(Settings):
-    '''Subclass of :class:`kivy.uix.settings.Settings` responsible for
-       showing settings of Kivy Designer.
+class DesignerSettings(LazySettings):
+    '''Subclass of :class:`~designer.uix.settings.LazySettings` responsible
+       for showing settings of Kivy Designer.
     '''
     config_parser = ObjectProperty(None)
     '''Config Parser for this class. Instance
@@ -43,9 +42,11 @@ class DesignerSettings(Settings):
         self.register_type('shortcut', SettingShortcut)
 
     def load_settings(self):
-        '''This function loads project settings
+        '''This function loads project settings. The panels are only created
+        when the settings are displayed, see :meth:`load_panels`
         '''
         self.config_parser = ConfigParser(name='DesignerSettings')
+        self._panels_loaded = False
         
         DESIGNER_CONFIG = os.path.join(get_config_dir(), 'config.ini')
         DEFAULT_CONFIG = profiles_path('config')
@@ -55,21 +56,6 @@ class DesignerSettings(Settings):
 
         self.config_parser.read(DESIGNER_CONFIG)
         self.config_parser.upgrade(DEFAULT_CONFIG)
-        
-        # creates a panel before insert it to update code input theme list
-        path = os.path.join(get_kd_data_dir(), 'settings', 'designer_settings.json')
-        panel = self.create_json_panel('Kivy Designer Settings', self.config_parser, path)
-
-        uid = panel.uid
-        if self.interface is not None:
-            self.interface.add_panel(panel, 'Kivy Designer Settings', uid)
-
-        # loads available themes
-        for child in panel.children:
-            if hasattr(child, 'items'):
-                if len(child.items) > 0:
-                    if child.items[0] == 'code_input_theme_options':
-                        child.items = styles.get_all_styles()
 
         # tries to find python and buildozer path if it's not defined
         getdefault = self.config_parser.getdefault
@@ -87,12 +73,32 @@ class DesignerSettings(Settings):
                 self.config_parser.set('buildozer', 'buildozer_path', buildozer_path)
                 self.config_parser.write()
 
+    def load_panels(self):
+        '''Adds the settings panels. Only the first call has effect
+        '''
+        if self._panels_loaded:
+            return None
+        self._panels_loaded = True
+
         dir_setting = lambda file: os.path.join(get_kd_data_dir(), 'settings', file+'.json')
 
+        self.add_json_panel('Kivy Designer Settings', self.config_parser, dir_setting('designer_settings'))
         self.add_json_panel('Buildozer', self.config_parser, dir_setting('buildozer_settings'))
         self.add_json_panel('Hanga', self.config_parser, dir_setting('hanga_settings'))
         self.add_json_panel('Keyboard Shortcuts', self.config_parser, dir_setting('shortcuts'))
 
+    def populate_panel(self, panel, schema):
+        '''Creates the panel settings and update the code input theme list
+        '''
+        super(DesignerSettings, self).populate_panel(panel, schema)
+
+        # loads available themes
+        for child in panel.children:
+            if hasattr(child, 'items'):
+                if len(child.items) > 0:
+                    if child.items[0] == 'code_input_theme_options':
+                        child.items = list(styles.get_all_styles())
+
     def on_config_change(self, *args):
         '''This function is default handler of on_config_change event.
         '''
@@ -0,0 +1,229 @@
+__all__ = ['ThumbnailCache', 'thumbnail_cache', ]
+
+from utils.utils import ATOMIC_WRITE_EXT, get_app_widget, get_config_dir
+
+from kivy.event import EventDispatcher
+from kivy.properties import BooleanProperty, ListProperty, NumericProperty
+from kivy.clock import Clock
+
+from collections import deque
+from functools import partial
+import threading
+import hashlib
+import os
+
+THUMBNAIL_DIR = 'thumbnails'
+'''Folder of the thumbnails, relative to the config dir
+'''
+THUMBNAIL_EXT = '.png'
+MAX_FILES = 256
+'''Number of thumbnails kept on disk, the oldest ones are removed
+'''
+
+
+def thumbnail_digest(name, sources, size):
+    '''Returns the cache key of a widget: the hash of its name, the hashes of
+    the kv and py sources its classes were loaded from and the thumbnail size
+    '''
+    digest = hashlib.sha1(f'{name}:{size[0]}x{size[1]}'.encode('utf-8'))
+    for source in sources:
+        digest.update(b'\0')
+        if source:
+            digest.update(source.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ThumbnailCache(EventDispatcher):
+    '''Renders images of the project widgets, displayed by the toolbox and
+       while dragging them, instead of instances of the widgets.
+
+       Thumbnails are saved in the config dir, named by the hash of the
+       widget name and of the kv and py sources its classes were loaded from,
+       so they're rendered again only when these files are parsed again after
+       a change. Saving a file doesn't change the loaded classes, so it
+       doesn't change the thumbnails. The cache folder is checked by a
+       background thread. The missing thumbnails are rendered offscreen,
+       one widget by frame, because the widgets must be created and drawn on
+       the main thread: the widget is created with :data:`render_size` in a
+       frame, and exported as a png scaled to :data:`size` in the next one,
+       after its layout.
+
+       on_thumbnail is dispatched with the widget name and the image path
+       when a thumbnail is available.
+    '''
+
+    size = ListProperty([160, 120])
+    '''Size in pixels of the thumbnails
+       :data:`size` is a :class:`~kivy.properties.ListProperty`
+    '''
+    render_size = ListProperty([400, 300])
+    '''Size in pixels of the widgets when rendered, they're scaled down to
+       :data:`size`
+       :data:`render_size` is a :class:`~kivy.properties.ListProperty`
+    '''
+    max_files = NumericProperty(MAX_FILES)
+    '''Number of thumbnails kept in the cache folder
+       :data:`max_files` is a :class:`~kivy.properties.NumericProperty`
+    '''
+    running = BooleanProperty(False)
+    '''Indicates if there are thumbnails being rendered
+       :data:`running` is a :class:`~kivy.properties.BooleanProperty`
+    '''
+    __events__ = ('on_thumbnail', )
+
+    def __init__(self, **kwargs):
+        super(ThumbnailCache, self).__init__(**kwargs)
+        self.sources = {}  # widget name -> thumbnail path
+        self._failed = set()  # digests that can't be rendered
+        self._queue = deque()  # (name, app widget, thumbnail path, digest)
+        self._current = None  # (name, widget, path, digest) being rendered
+        self._render_event = None
+        self._token = None
+
+    @property
+    def cache_dir(self):
+        return os.path.join(get_config_dir(), THUMBNAIL_DIR)
+
+    def get(self, name):
+        '''Returns the thumbnail path of a widget, or None if not available
+        '''
+        return self.sources.get(name)
+
+    def update(self, project):
+        '''Looks for the thumbnails of the project widgets, rendering the
+        missing ones. Called when the project is parsed
+        :param project: the :class:`~designer.core.project_manager.Project`
+        '''
+        token = self._token = object()
+        jobs = []
+        for name, app_widget in project.app_widgets.items():
+            if app_widget.is_root:
+                # the root widgets are instantiated by the Builder, dragging
+                # them doesn't create a widget
+                continue
+            jobs.append((name, app_widget,
+                         project.loaded_digests(app_widget)))
+        size = tuple(self.size)
+        threading.Thread(target=self._hash,
+                         args=(token, jobs, size, self.cache_dir),
+                         daemon=True).start()
+
+    def clear(self):
+        '''Stops rendering and forgets the thumbnails, used when the project
+        is closed. The files are kept for the next time
+        '''
+        self._token = None
+        self.sources = {}
+        self._queue.clear()
+        self._stop()
+
+    def _hash(self, token, jobs, size, cache_dir):
+        '''Computes the thumbnail paths, runs in a separated thread
+        '''
+        found = []  # (name, app widget, thumbnail path, digest, exists)
+        for name, app_widget, sources in jobs:
+            digest = thumbnail_digest(name, sources, size)
+            path = os.path.join(cache_dir, digest + THUMBNAIL_EXT)
+            try:
+                # keeps the used thumbnails out of the pruning
+                os.utime(path)
+                exists = True
+            except OSError:
+                exists = False
+            found.append((name, app_widget, path, digest, exists))
+        self._prune(cache_dir)
+        Clock.schedule_once(partial(self._hashed, token, found))
+
+    def _hashed(self, token, found, *args):
+        if token is not self._token:
+            return None
+        self._queue.clear()
+        names = set()
+        for name, app_widget, path, digest, exists in found:
+            names.add(name)
+            if exists:
+                if self.sources.get(name) != path:
+                    self.sources[name] = path
+                    self.dispatch('on_thumbnail', name, path)
+            elif digest not in self._failed:
+                self._queue.append((name, app_widget, path, digest))
+        for name in list(self.sources):
+            if name not in names:
+                del self.sources[name]
+
+        if self._queue and self._render_event is None:
+            self.running = True
+            self._render_event = Clock.schedule_interval(self._render, 0)
+
+    def _render(self, *args):
+        '''Renders one widget by frame
+        '''
+        if self._current is not None:
+            self._export(*self._current)
+            self._current = None
+            return None
+        if not self._queue:
+            self._stop()
+            return False
+
+        name, app_widget, path, digest = self._queue.popleft()
+        try:
+            widget = get_app_widget(app_widget)
+        except Exception:
+            widget = None
+        if widget is None or widget.parent is not None:
+            self._failed.add(digest)
+            return None
+        widget.size_hint = (None, None)
+        widget.size = self.render_size
+        # exported in the next frame, after the layout
+        self._current = (name, widget, path, digest)
+
+    def _export(self, name, widget, path, digest):
+        tmp_path = path + ATOMIC_WRITE_EXT
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            scale = min(self.size[0] / float(self.render_size[0]),
+                        self.size[1] / float(self.render_size[1]))
+            image = widget.export_as_image(scale=scale)
+            image.save(tmp_path, flipped=False, fmt='png')
+            os.replace(tmp_path, path)
+        except Exception:
+            self._failed.add(digest)
+            return None
+        self.sources[name] = path
+        self.dispatch('on_thumbnail', name, path)
+
+    def _stop(self):
+        if self._render_event is not None:
+            self._render_event.cancel()
+            self._render_event = None
+        self._current = None
+        self.running = False
+
+    def _prune(self, cache_dir):
+        '''Removes the oldest thumbnails above :data:`max_files`
+        '''
+        try:
+            entries = [e for e in os.scandir(cache_dir)
+                       if e.name.endswith(THUMBNAIL_EXT)]
+        except OSError:
+            return None
+        if len(entries) <= self.max_files:
+            return None
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - int(self.max_files)]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def on_thumbnail(self, *args):
+        '''Dispatched with the widget name and the thumbnail path
+        '''
+        pass
+
+
+thumbnail_cache = ThumbnailCache()
+'''Thumbnails of the current project widgets
+'''
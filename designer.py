@@ -8,20 +8,22 @@ from utils.utils import (
 )
 
 from uix.confirmation_dialog import ConfirmationDialog, ConfirmationDialogSave
-from components.buildozer_spec_editor import BuildozerSpecEditor
 from core.project_manager import ProjectManager, ProjectWatcher
 from components.run_contextual_view import ModulesContView
 from components.edit_contextual_view import EditContView
 from components.designer_content import DesignerContent
-from core.profile_settings import ProfileSettings
 from core.project_settings import ProjectSettings
 from utils.toolbox_widgets import toolbox_widgets
 from core.recent_manager import RecentManager
 from core.settings import DesignerSettings
 from core.undo_manager import UndoManager
-from tools.tools import DesignerTools
+from utils.instrumentation import instrumentation
+from utils.startup_timer import startup_timer
+from tools.lint_service import LintService
+from core.autosave import AutoSaveService
+from core.recovery import RecoveryStore
+from core.copy_engine import CopyEngine
 from core.shortcuts import Shortcuts
-from core.builder import Profiler
 
 from kivy.app import App
 from kivy.clock import Clock
@@ -44,13 +46,6 @@ class Designer(FloatLayout):
        :data:`message` is a :class:`~kivy.properties.StringProperty`
     '''
     
-    spec_editor = ObjectProperty(None)
-    '''Instance of
-        :class:`~designer.components.buildozer_spec_editor.BuildozerSpecEditor`
-    '''
-    designer_tools = ObjectProperty(None)
-    '''Instance of :class:`~designer.tools.tools.DesignerTools`
-    '''
     designer_git = ObjectProperty(None)
     '''Instance of :class:`~designer.tools.git_integration.DesignerGit`
     '''
@@ -88,6 +83,10 @@ class Designer(FloatLayout):
     '''Reference to the :class:`~designer.core.project_manager.ProjectManager`.
        :data:`project_manager` is a :class:`~kivy.properties.ObjectProperty`
     '''
+    lint_service = ObjectProperty(None)
+    '''Reference to the :class:`~designer.tools.lint_service.LintService`.
+       :data:`lint_service` is a :class:`~kivy.properties.ObjectProperty`
+    '''
     proj_settings = ObjectProperty(None)
     '''Reference of :class:`~designer.core.project_settings.ProjectSettings`.
        :data:`proj_settings` is a :class:`~kivy.properties.ObjectProperty`
@@ -130,58 +129,127 @@ class Designer(FloatLayout):
 
     def __init__(self, program_designer, **kwargs):
         super(Designer, self).__init__(**kwargs)
+        self._spec_editor = None
+        self._prof_settings = None
+        self._profiler = None
+        self._designer_tools = None
+        self._instrumentation_view = None
         Clock.schedule_once(self.config)
         Clock.schedule_once(program_designer._setup)
 
     def config(self, *args):
+        with startup_timer.measure('Designer.config'):
+            self._config()
+
+    def _config(self):
+        '''Creates the subsystems needed by the start page. The others are
+        created on first use, see :attr:`spec_editor`, :attr:`prof_settings`,
+        :attr:`profiler` and :attr:`designer_tools`
+        '''
         self.project_watcher = ProjectWatcher()
         self.project_watcher.bind(on_project_modified=self.project_modified)
         self.project_manager = ProjectManager()
         self.recent_manager = RecentManager()
-        self.spec_editor = BuildozerSpecEditor()
         self.widget_to_paste = None
 
-        self.designer_settings = DesignerSettings()
-        self.designer_settings.bind(on_config_change=self._config_change)
-        self.designer_settings.load_settings()
-        self.designer_settings.bind(on_close=self.ids.toll_bar_top.close_popup)
-
-        self.shortcuts = Shortcuts()
-        self.shortcuts.map_shortcuts(self.designer_settings.config_parser)
-        self.designer_settings.config_parser.add_callback(
-                self.on_designer_settings)
-        self.display_shortcuts()
+        with startup_timer.measure('settings'):
+            self.designer_settings = DesignerSettings()
+            self.designer_settings.bind(on_config_change=self._config_change)
+            self.designer_settings.load_settings()
+            self.designer_settings.bind(on_close=self.ids.toll_bar_top.close_popup)
 
-        self.prof_settings = ProfileSettings()
-        self.prof_settings.bind(on_close=self.ids.toll_bar_top.close_popup)
-        self.prof_settings.load_profiles()
+        with startup_timer.measure('shortcuts'):
+            self.shortcuts = Shortcuts()
+            self.shortcuts.map_shortcuts(self.designer_settings.config_parser)
+            self.designer_settings.config_parser.add_callback(
+                    self.on_designer_settings)
+            self.display_shortcuts()
 
-        self.designer_content = DesignerContent(size_hint=(1, None))
-        self.designer_content = self.designer_content.__self__
+        with startup_timer.measure('DesignerContent'):
+            self.designer_content = DesignerContent(size_hint=(1, None))
+            self.designer_content = self.designer_content.__self__
 
         self.designer_git.bind(on_branch=lambda i, name, *a: update_info('Git', name))
+        self.designer_git.bind(
+            on_status=lambda i, index, *a: self.designer_content.update_git_status(index))
+        self.project_watcher.bind(
+            on_project_modified=self.designer_content.on_project_modified)
         self.statusbar.bind(on_info_press=self.on_info_press)
+        self.statusbar.bind(on_message_press=self.on_message_press)
+        self.statusbar.bind(
+            on_instrumentation_press=self.on_instrumentation_press)
+        self.update_instrumentation()
 
         getdefault = self.designer_settings.config_parser.getdefault
-        Clock.schedule_interval(self.save_project,
+        Clock.schedule_interval(self.auto_save,
             (int(getdefault('global', 'auto_save_time', 5)) * 60),
         )
-
-        self.profiler = Profiler()
-        self.profiler.designer = self
-        self.profiler.bind(
-            on_error=lambda i, msg: show_alert('Profile error', msg),
-            on_message=lambda i, msg, dt=0: show_message(msg, dt, 'info'),
-            on_run=lambda *a: setattr(self.ids.actn_btn_stop_proj, 'disabled', False),
-            on_stop=lambda *a: setattr(self.ids.actn_btn_stop_proj, 'disabled', True),
+        self.autosave = AutoSaveService(project_watcher=self.project_watcher)
+        self.autosave.bind(on_saved=self._on_autosaved,
+                           on_error=self._on_autosave_error)
+        self.recovery = RecoveryStore()
+        self.bind(code_inputs=lambda i, codes, *a: self.recovery.track(codes))
+        self.copy_engine = CopyEngine()
+
+        self.lint_service = LintService()
+        self.lint_service.bind(
+            on_lint_done=lambda i, results, *a: self.update_diagnostics(results),
+            on_file_linted=lambda i, path, diags, *a: self.update_diagnostics({path: diags}),
         )
-
-        self.designer_tools = DesignerTools(designer=self)
         # variables used in the project
         self.help_dlg = None
 
         self.temp_proj_directories = []
 
+    @property
+    def spec_editor(self):
+        '''Instance of
+            :class:`~designer.components.buildozer_spec_editor.BuildozerSpecEditor`
+           created on first use
+        '''
+        if self._spec_editor is None:
+            from components.buildozer_spec_editor import BuildozerSpecEditor
+            self._spec_editor = BuildozerSpecEditor()
+        return self._spec_editor
+
+    @property
+    def prof_settings(self):
+        '''Instance of :class:`~designer.core.profile_settings.ProfileSettings`
+           created on first use
+        '''
+        if self._prof_settings is None:
+            from core.profile_settings import ProfileSettings
+            self._prof_settings = ProfileSettings()
+            self._prof_settings.bind(on_close=self.ids.toll_bar_top.close_popup)
+        return self._prof_settings
+
+    @property
+    def profiler(self):
+        '''Instance of :class:`~designer.core.builder.Profiler`, the build
+           subsystem. Created on first use
+        '''
+        if self._profiler is None:
+            from core.builder import Profiler
+            self._profiler = Profiler()
+            self._profiler.designer = self
+            self._profiler.bind(
+                on_error=lambda i, msg: show_alert('Profile error', msg),
+                on_message=lambda i, msg, dt=0: show_message(msg, dt, 'info'),
+                on_run=lambda *a: setattr(self.ids.actn_btn_stop_proj, 'disabled', False),
+                on_stop=lambda *a: setattr(self.ids.actn_btn_stop_proj, 'disabled', True),
+            )
+        return self._profiler
+
+    @property
+    def designer_tools(self):
+        '''Instance of :class:`~designer.tools.tools.DesignerTools`
+           created on first use
+        '''
+        if self._designer_tools is None:
+            from tools.tools import DesignerTools
+            self._designer_tools = DesignerTools(designer=self)
+        return self._designer_tools
+
     def load_view_settings(self, *args):
         '''Load "View" menu saved settings
         '''
@@ -245,6 +313,38 @@ class Designer(FloatLayout):
             else:
                 btn.hint = get_hint(name)
 
+    def on_message_press(self, *args):
+        '''Callback to statusbar message press, offers to cancel the
+        project copy
+        '''
+        if not self.copy_engine.running or self.ids.toll_bar_top.popup:
+            return None
+
+        def cancel(*args):
+            self.copy_engine.cancel()
+            self.statusbar.hide_progress()
+            self.ids.toll_bar_top.close_popup()
+            show_message('Copy cancelled', 5, 'info')
+
+        confirm_dlg = ConfirmationDialog(
+            message="The project is being copied.\n"
+                    "Do you want to cancel the copy?")
+        confirm_dlg.bind(on_ok=cancel,
+                         on_cancel=self.ids.toll_bar_top.close_popup)
+
+        popup = self.ids.toll_bar_top.popup = Popup(
+            title='Kivy Designer', content=confirm_dlg,
+            size_hint=(None, None), size=('200pt', '150pt'),
+            auto_dismiss=False)
+        popup.open()
+
+        def finished(engine, running, *args):
+            # the copy ended before an answer
+            engine.unbind(running=finished)
+            if self.ids.toll_bar_top.popup is popup:
+                self.ids.toll_bar_top.close_popup()
+        self.copy_engine.bind(running=finished)
+
     def on_info_press(self, *args):
         '''Callback to git statusbar info press
         '''
@@ -256,10 +356,10 @@ class Designer(FloatLayout):
         '''Event Handler for 'on_config_change'
            event of self.designer_settings.
         '''
-        Clock.unschedule(self.save_project)
+        Clock.unschedule(self.auto_save)
         getdefault = self.designer_settings.config_parser.getdefault
         
-        Clock.schedule_interval(self.save_project,
+        Clock.schedule_interval(self.auto_save,
             (int(getdefault('global', 'auto_save_time', 5))*60),
         )
 
@@ -269,6 +369,27 @@ class Designer(FloatLayout):
         recent_files = int(getdefault('global', 'num_recent_files', 10))
         self.recent_manager.max_recent_files = recent_files
 
+        self.update_instrumentation()
+
+    def update_instrumentation(self, *args):
+        '''Enables the instrumentation according to the designer settings
+        '''
+        getdefault = self.designer_settings.config_parser.getdefault
+        enabled = getdefault('global', 'instrumentation', '0') in ('1', 'True')
+        instrumentation.enabled = enabled
+        self.statusbar.show_instrumentation = enabled
+        if not enabled and self._instrumentation_view is not None:
+            self._instrumentation_view.hide()
+
+    def on_instrumentation_press(self, statusbar, button, *args):
+        '''Callback to the statusbar instrumentation button, shows or hides
+        the instrumentation results
+        '''
+        if self._instrumentation_view is None:
+            from components.instrumentation_view import InstrumentationBubble
+            self._instrumentation_view = InstrumentationBubble()
+        self._instrumentation_view.toggle(button)
+
     def _add_designer_content(self):
         '''Add designer_content to Designer, when a project is loaded
         '''
@@ -374,7 +495,9 @@ class Designer(FloatLayout):
 
         def reload_spec_editor(*args):
             self.spec_editor.load_settings(proj_path)
-        if os.path.exists(os.path.join(proj_path, 'buildozer.spec')):
+        # the spec editor reads the spec when it's shown for the first time
+        if self._spec_editor is not None and \
+                os.path.exists(os.path.join(proj_path, 'buildozer.spec')):
             Clock.schedule_once(reload_spec_editor, 1)
 
     def on_show_edit(self, *args):
@@ -484,11 +607,11 @@ class Designer(FloatLayout):
         '''
         self.ui_creator.cleanup()
         self.undo_manager.cleanup()
+        self.autosave.forget()
         self.designer_content.toolbox.cleanup()
         self.designer_content.tab_pannel.cleanup()
 
-        for node in self.proj_tree_view.root.nodes[:]:
-            self.proj_tree_view.remove_node(node)
+        self.designer_content.clear_tree_view()
 
         for widget in toolbox_widgets[:]:
             if widget[1] == 'custom':
@@ -521,11 +644,101 @@ class Designer(FloatLayout):
         '''
         proj = self.project_manager.current_project
         saved = proj.save()
+        # the watcher is paused while saving, so refresh the git status here
+        self.designer_git.invalidate_status()
+        self.designer_git.files_changed(
+            [code.path for code in self.code_inputs if code.path])
         if saved:
             show_message('Project saved!', 5, 'info')
         else:
             show_message('Failed to save the project!', 5, 'error')
 
+    def auto_save(self, *args):
+        '''Saves the modified files of the current project in background
+        '''
+        if not self.project_manager.current_project.path:
+            return None
+        self.autosave.save(self.code_inputs)
+
+    def _on_autosaved(self, instance, paths, *args):
+        '''Event handler for 'on_saved' event of self.autosave
+        '''
+        self.designer_git.invalidate_status()
+        self.designer_git.files_changed(paths)
+        for code in self.code_inputs:
+            if code.path in paths:
+                # check the saved content in background
+                self.lint_service.lint_source(code.path, code.text)
+
+        if all(code.saved for code in self.code_inputs if code.path):
+            self.project_manager.current_project.saved = True
+        show_message('Project saved!', 5, 'info')
+
+    def _on_autosave_error(self, instance, errors, *args):
+        '''Event handler for 'on_error' event of self.autosave
+        '''
+        show_error_console('\n'.join(
+            f'{path}: {error}' for path, error in errors.items()))
+        show_message('Failed to save the project!', 5, 'error')
+
+    def offer_recovery(self):
+        '''Offers to restore the unsaved files journaled by the last session
+        of the current project
+        '''
+        recovered = self.recovery.recovered
+        if not recovered or self.ids.toll_bar_top.popup:
+            return None
+
+        def discard(*args):
+            self.recovery.discard_all()
+            self.ids.toll_bar_top.close_popup()
+
+        confirm_dlg = ConfirmationDialog(
+            message=f"Kivy Designer was closed with {len(recovered)}\n"
+                    "unsaved file(s) in this project.\n"
+                    "Do you want to restore them?")
+        confirm_dlg.bind(on_ok=self._restore_recovered, on_cancel=discard)
+
+        self.ids.toll_bar_top.popup = Popup(
+            title='Kivy Designer', content=confirm_dlg,
+            size_hint=(None, None), size=('200pt', '150pt'),
+            auto_dismiss=False)
+        self.ids.toll_bar_top.popup.open()
+
+    def _restore_recovered(self, *args):
+        '''Opens the recovered files as unsaved tabs
+        '''
+        self.ids.toll_bar_top.close_popup()
+        recovered = dict(self.recovery.recovered)
+        self.recovery.discard_all()
+        proj = self.project_manager.current_project
+        tab_pannel = self.designer_content.tab_pannel
+
+        restored = 0
+        for path, text in recovered.items():
+            if not os.path.isfile(path):
+                continue
+            tab_pannel.open_file(path, os.path.relpath(path, proj.path),
+                                 switch_to=False)
+            for code in reversed(self.code_inputs):
+                if code.path == path and code is not self.ui_creator.kv_code_input:
+                    code.text = text
+                    code.saved = False
+                    restored += 1
+                    break
+
+        if restored:
+            proj.saved = False
+        show_message(f'{restored} file(s) restored', 5, 'info')
+
+    def update_diagnostics(self, results):
+        '''Updates the lint markers of the open code inputs
+        :param results: dict of {path: [Diagnostic, ...]}
+        '''
+        for code in self.code_inputs:
+            if code.path in results and hasattr(code, 'diagnostics'):
+                code.diagnostics = results[code.path]
+
     def _recent_file_release(self, instance, *args):
         '''Event Handler for 'on_select' event of RecentDialog.
         '''
@@ -577,6 +790,9 @@ class Designer(FloatLayout):
         '''Perform Application qui.Application
         '''
         self.remove_temp_proj_directories()
+        self.lint_service.shutdown()
+        self.recovery.close()
+        self.recovery.flush()
         App.get_running_app().stop()
 
     def action_btn_pressed(self, action, *args):
@@ -1,12 +1,17 @@
 __all__ = ['ProgramDesigner', ]
 
+import sys
+from utils.startup_timer import startup_timer
+# must run before kivy is imported, kivy parses sys.argv
+startup_timer.parse_args(sys.argv)
+
 from kivy.config import Config
 Config.set('graphics', 'maxfps', '100')
 
-from designer import Designer
+with startup_timer.measure('import designer'):
+    from designer import Designer
 from uix.sandbox import DesignerSandbox
-from utils.toolbox_widgets import toolbox_widgets
-from components.playground import PlaygroundDragElement
+from utils.toolbox_widgets import toolbox_index
 from utils.utils import get_config_dir, get_fs_encoding, show_message
 
 from kivy.app import App
@@ -77,7 +82,6 @@ class ProgramDesigner(App):
             ('KivyConsole', 'components.kivy_console'),
             ('KVLangAreaScroll', 'components.kv_lang_area'),
             ('PythonConsole', 'uix.py_console'),
-            ('DesignerContent', 'components.designer_content'),
             ('EventDropDown', 'components.event_viewer'),
             ('DesignerActionGroup', 'uix.action_items'),
             ('DesignerActionButton', 'uix.action_items'),
@@ -88,16 +92,25 @@ class ProgramDesigner(App):
             ('ContextMenu', 'components.edit_contextual_view'),
             ('PlaygroundSizeSelector', 'components.playground_size_selector'),
             ('CodeInputFind', 'uix.code_find'),
+            ('FrameMonitor', 'components.frame_monitor'),
         )
         for classname, module in modules:
             Factory.register(classname, module=module)
 
         self._widget_focused = None
-        return Designer(self)
+        startup_timer.watch_first_frame(Window)
+        with startup_timer.measure('Designer()'):
+            return Designer(self)
 
     def _setup(self, *args):
         '''To setup the properties of different classes
         '''
+        with startup_timer.measure('ProgramDesigner._setup'):
+            self._setup_components()
+        # the start page is ready
+        startup_timer.report()
+
+    def _setup_components(self):
         self.root.ui_creator = self.root.designer_content.ui_creator
         playground = self.root.ui_creator.playground
         eventviewer = self.root.ui_creator.eventviewer
@@ -150,10 +163,8 @@ class ProgramDesigner(App):
         """
         container = None
         if widget:
-            container = PlaygroundDragElement(
-                    playground=self.root.ui_creator.playground,
-                    child=Widget(),
-                    widget=widget)
+            playground = self.root.ui_creator.playground
+            container = playground.acquire_drag_element(Widget(), widget)
             touch.grab(container)
             touch.grab_current = container
             container.on_touch_move(touch)
@@ -163,15 +174,12 @@ class ProgramDesigner(App):
 
         default_args = {}
         extra_args = {}
-        for options in toolbox_widgets:
-            if widget_name != options[0]:
-                continue
-
+        options = toolbox_index.get(widget_name)
+        if options is not None:
             if len(options) > 2:
                 default_args = options[2].copy()
             if len(options) > 3:
                 extra_args = options[3].copy()
-            break
         
         _drag_element = self.root.ui_creator.playground.get_playground_drag_element
         container = _drag_element(instance, widget_name, touch, default_args, extra_args)
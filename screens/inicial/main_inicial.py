@@ -22,10 +22,10 @@ from utils.utils import (
     utils_source_rst, template_file,
 )
 from tempfile import mkdtemp
-from distutils.dir_util import copy_tree
+from functools import partial
 from kivy.clock import Clock
 from kivy.metrics import dp
-import os, shutil, io
+import os, io
 
 Builder.load_file(get_path('screens/inicial/tool_bar_first_screen.kv'))
 
@@ -34,6 +34,7 @@ class ToolBarTopDesigner(DesignerActionView):
     designer = ObjectProperty(None)
     popup = None
     _new_dialog = None
+    _after_copy = None
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -264,6 +265,7 @@ class ToolBarTopDesigner(DesignerActionView):
         self.disable_actn('disabled', True)
         self.project_manager.close_current_project()
         self.project_watcher.stop_watching()
+        self.designer.recovery.close()
 
     def _perform_save_as(self, instance, exit_on_save=False):
         '''Event handler for 'on_success' event of self._save_as_browser
@@ -272,16 +274,49 @@ class ToolBarTopDesigner(DesignerActionView):
         # save the project in the folder and then copy it to a new folder
         self.designer.save_project()
         path = self.designer.project_manager.current_project.path
-        if os.path.isdir(path):
-            copy_tree(path, proj_dir)
+        after_copy = partial(self._open_saved_as, exit_on_save)
+        if not os.path.isdir(path):
+            after_copy(proj_dir)
+            return None
+        self._start_copy(after_copy)
+        self.designer.copy_engine.copy_tree(path, proj_dir)
 
+    def _open_saved_as(self, exit_on_save, proj_dir):
         if exit_on_save:
             self.designer._perform_quit()
             return None
-        
-        print('salvando e abrindo -> ', proj_dir)
         self._perform_open(proj_dir)
 
+    def _start_copy(self, after_copy):
+        '''Binds the copy engine events, after_copy(destination) is called
+        when the copy is done
+        '''
+        self._after_copy = after_copy
+        engine = self.designer.copy_engine
+        engine.unbind(on_progress=self._on_copy_progress,
+                      on_copied=self._on_copied,
+                      on_error=self._on_copy_error)
+        engine.bind(on_progress=self._on_copy_progress,
+                    on_copied=self._on_copied,
+                    on_error=self._on_copy_error)
+        self.designer.statusbar.show_progress(
+            0, 0, 'Copying project files... (click to cancel)')
+
+    def _on_copy_progress(self, engine, done, total, *args):
+        self.designer.statusbar.show_progress(
+            done, total, 'Copying project files... (click to cancel)')
+
+    def _on_copied(self, engine, dst, *args):
+        self.designer.statusbar.hide_progress()
+        after_copy, self._after_copy = self._after_copy, None
+        if after_copy is not None:
+            after_copy(dst)
+
+    def _on_copy_error(self, engine, error, *args):
+        self._after_copy = None
+        self.designer.statusbar.hide_progress()
+        show_message(f'Failed to copy the project: {error}', 5, 'error')
+
     def action_btn_settings_pressed(self, *args):
         '''Event handler for 'on_release' event of
            DesignerActionButton "Settings"
@@ -289,6 +324,7 @@ class ToolBarTopDesigner(DesignerActionView):
         if self.popup:
             return False
 
+        self.designer.designer_settings.load_panels()
         self.designer.designer_settings.parent = None
         self.popup = Popup(
             title="Kivy Designer Settings",
@@ -531,9 +567,8 @@ class ToolBarTopDesigner(DesignerActionView):
         self.designer.designer_content.update_tree_view(current_project)
         self.close_popup()
     
-    @ignore_proj_watcher
     def _perform_new(self, *args):
-        '''To load new project
+        '''To load new project. The template files are copied in background
         '''
         self.close_popup()
         new_proj_dir = mkdtemp(prefix=constants.NEW_PROJECT_DIR_NAME_PREFIX)
@@ -548,9 +583,6 @@ class ToolBarTopDesigner(DesignerActionView):
         kv_file = template_file(NEW_PROJECTS[template][0])
         py_file = template_file(NEW_PROJECTS[template][1])
 
-        shutil.copy(py_file, os.path.join(new_proj_dir, "main.py"))
-        shutil.copy(kv_file, os.path.join(new_proj_dir, "main.kv"))
-
         buildozer = io.open(os.path.join(new_proj_dir, 'buildozer.spec'), 'w', encoding='utf-8')
         for line in io.open(template_file('default.spec'), 'r', encoding='utf-8'):
             line = line.replace('$app_name', app_name)
@@ -560,53 +592,86 @@ class ToolBarTopDesigner(DesignerActionView):
             buildozer.write(line)
         buildozer.close()
 
-        print('Abrindo -> ', new_proj_dir)
+        self._start_copy(self._open_new_project)
+        self.designer.copy_engine.copy_files([
+            (py_file, os.path.join(new_proj_dir, "main.py")),
+            (kv_file, os.path.join(new_proj_dir, "main.kv"))], new_proj_dir)
+
+    @ignore_proj_watcher
+    def _open_new_project(self, new_proj_dir):
         self._perform_open(new_proj_dir, True)
         self.designer.project_manager.current_project.new_project = True
         self.designer.project_manager.current_project.saved = False
         show_message('Project created successfully', 5, 'info')
     
     def _perform_open(self, file_path, new_project=False):
-        '''To open a project given by file_path
+        '''To open a project given by file_path. The project is loaded in
+        stages by the project manager loader: the project tree is displayed
+        when the files are found, and the playground when they are parsed
         '''
         if file_path == '' or file_path is None:
             return None
-        
-        print('INICIANDO projeto -> def _perform_open: ', file_path, new_project)
 
         self.designer.project_watcher.stop_watching()
-        show_message('Project loaded successfully', 5, 'info')
         self.designer.cleanup()
         if os.path.isfile(file_path):
             file_path = os.path.dirname(file_path)
 
-        project = self.designer.project_manager.open_project(file_path)
-            
-        self.designer.project_watcher.start_watching(file_path)
-        self.designer.designer_content.update_tree_view(project)
+        loader = self.designer.project_manager.loader
+        loader.unbind(on_files_found=self._on_project_files_found,
+                      on_progress=self._on_project_progress,
+                      on_loaded=self._on_project_loaded,
+                      on_error=self._on_project_error)
+        loader.bind(on_files_found=self._on_project_files_found,
+                    on_progress=self._on_project_progress,
+                    on_loaded=self._on_project_loaded,
+                    on_error=self._on_project_error)
+
+        project = self.designer.project_manager.load_project(file_path)
+        # the journal is kept in the folder the project manager opened
+        self.designer.recovery.open(project.path)
         if not new_project:
             self.designer.recent_manager.add_path(project.path)
-        
+
+    def _on_project_files_found(self, loader, project, *args):
+        '''Displays the project tree while the files are parsed
+        '''
+        self.designer.project_watcher.start_watching(project.path)
+        self.designer.designer_content.update_tree_view(project, False)
+        self.designer._add_designer_content()
+
+        run_command = self.designer.ui_creator.kivy_console.run_command
+        Clock.schedule_once(lambda *a: run_command(f'cd {project.path}'), 1)
+        self.designer.designer_git.load_repo(project.path)
+
+    def _on_project_progress(self, loader, stage, done, total, *args):
+        if stage == 'discover':
+            message = 'Looking for project files...'
+        elif stage == 'prepare':
+            message = f'Reading {total} project files...'
+        else:
+            message = f'Parsing project files {done}/{total}'
+        self.designer.statusbar.show_progress(done, total, message)
+
+    def _on_project_loaded(self, loader, project, *args):
+        '''Adds the project widgets to the toolbox and displays the first one
+        '''
+        self.designer.statusbar.hide_progress()
         for widget in toolbox_widgets[:]:
             if widget[1] == 'custom':
                 toolbox_widgets.remove(widget)
-        
-        self.designer._add_designer_content()
-        app_widgets = self.designer.project_manager.current_project.app_widgets
+
+        app_widgets = project.app_widgets
         if app_widgets:
             for name in app_widgets.keys():
                 toolbox_widgets.append((name, 'custom'))
 
             self.designer.designer_content.toolbox.update_app_widgets()
-            if len(app_widgets):
-                first_wdg = app_widgets[list(app_widgets.keys())[-1]]
-                self.designer.ui_creator.playground.load_widget(first_wdg.name)
-            else:
-                self.designer.ui_creator.playground.no_widget()
-
-        run_command = self.designer.ui_creator.kivy_console.run_command
-        Clock.schedule_once(lambda *a: run_command(f'cd {file_path}'), 1)
-        # return None
-        self.designer.designer_git.load_repo(file_path)
-        print('Iniciu com sucesso!!')
+            first_wdg = app_widgets[list(app_widgets.keys())[-1]]
+            self.designer.ui_creator.playground.load_widget(first_wdg.name)
+        show_message('Project loaded successfully', 5, 'info')
+        self.designer.offer_recovery()
 
+    def _on_project_error(self, loader, error, *args):
+        self.designer.statusbar.hide_progress()
+        show_message(f'Cannot open the project: {error}', 5, 'error')
@@ -0,0 +1,27 @@
+import os
+import sys
+
+# the designer modules are imported from the repository root, as main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+os.environ.setdefault('KIVY_NO_FILELOG', '1')
+
+import pytest
+
+
+@pytest.fixture
+def tick():
+    '''Returns a function running the Clock until condition() is True
+    '''
+    from kivy.clock import Clock
+    import time
+
+    def run(condition, timeout=30):
+        start = time.time()
+        while not condition():
+            if time.time() - start > timeout:
+                raise AssertionError('timed out')
+            Clock.tick()
+            time.sleep(0.01)
+    return run
@@ -0,0 +1,172 @@
+from core import copy_engine
+from core.copy_engine import CopyEngine, copy_file
+
+import threading
+import time
+import errno
+import os
+import pytest
+
+
+def make_tree(root):
+    os.makedirs(os.path.join(root, 'pkg', '__pycache__'))
+    os.makedirs(os.path.join(root, '.designer'))
+    files = {
+        'main.py': 'import pkg\n',
+        os.path.join('pkg', 'mod.py'): 'x = 1\n' * 1000,
+        os.path.join('pkg', '__pycache__', 'mod.pyc'): 'cache',
+        os.path.join('.designer', 'state'): 'state',
+    }
+    for name, content in files.items():
+        with open(os.path.join(root, name), 'w') as f:
+            f.write(content)
+    os.chmod(os.path.join(root, 'main.py'), 0o755)
+
+
+def unsupported(*args):
+    raise OSError(errno.EXDEV, 'cross-device link')
+
+
+@pytest.fixture
+def src_file(tmp_path):
+    src = tmp_path / 'src.bin'
+    src.write_bytes(os.urandom(3 * 1024 + 1))
+    os.chmod(src, 0o640)
+    return str(src)
+
+
+def test_copy_file_clones_first(src_file, tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(copy_engine, '_clone', lambda *a: calls.append(a) or True)
+    assert copy_file(src_file, str(tmp_path / 'dst')) == 'clone'
+    assert calls
+
+
+@pytest.mark.skipif(not hasattr(os, 'copy_file_range'),
+                    reason='copy_file_range not available')
+def test_copy_file_falls_back_to_copy_range(src_file, tmp_path, monkeypatch):
+    monkeypatch.setattr(copy_engine, '_clone', lambda *a: False)
+    dst = str(tmp_path / 'dst')
+    sizes = []
+    assert copy_file(src_file, dst, sizes.append) == 'range'
+    assert open(dst, 'rb').read() == open(src_file, 'rb').read()
+    assert sum(sizes) == os.path.getsize(src_file)
+
+
+def test_copy_file_falls_back_to_chunks(src_file, tmp_path, monkeypatch):
+    monkeypatch.setattr(copy_engine, '_clone', lambda *a: False)
+    monkeypatch.setattr(os, 'copy_file_range', unsupported, raising=False)
+    monkeypatch.setattr(copy_engine, 'CHUNK_SIZE', 1024)
+    dst = str(tmp_path / 'dst')
+    sizes = []
+    assert copy_file(src_file, dst, sizes.append) == 'chunks'
+    assert open(dst, 'rb').read() == open(src_file, 'rb').read()
+    assert sizes == [1024, 1024, 1024, 1]
+    assert os.stat(dst).st_mode == os.stat(src_file).st_mode
+
+
+def test_clone_unsupported(src_file, tmp_path, monkeypatch):
+    if copy_engine.fcntl is None:
+        pytest.skip('fcntl not available')
+    monkeypatch.setattr(copy_engine.fcntl, 'ioctl', unsupported)
+    with open(src_file, 'rb') as src, open(str(tmp_path / 'dst'), 'wb') as dst:
+        assert not copy_engine._clone(src.fileno(), dst.fileno())
+
+
+class Events(object):
+
+    def __init__(self, engine):
+        self.copied = []
+        self.errors = []
+        engine.bind(on_copied=lambda i, dst: self.copied.append(dst),
+                    on_error=lambda i, error: self.errors.append(error))
+
+
+def test_copy_tree(tmp_path, tick):
+    src, dst = str(tmp_path / 'src'), str(tmp_path / 'dst')
+    make_tree(src)
+    os.symlink('main.py', os.path.join(src, 'link.py'))
+    engine = CopyEngine()
+    events = Events(engine)
+    engine.copy_tree(src, dst)
+    tick(lambda: events.copied)
+
+    assert events.copied == [dst]
+    assert not engine.running
+    assert sorted(os.listdir(dst)) == ['link.py', 'main.py', 'pkg']
+    assert os.listdir(os.path.join(dst, 'pkg')) == ['mod.py']
+    assert os.readlink(os.path.join(dst, 'link.py')) == 'main.py'
+    assert os.stat(os.path.join(dst, 'main.py')).st_mode & 0o777 == 0o755
+
+
+@pytest.fixture
+def blocked_copy(monkeypatch):
+    '''Makes the first copied file wait until the event is set
+    '''
+    started = threading.Event()
+    release = threading.Event()
+    copy = copy_engine.copy_file
+
+    def blocked(src, dst, on_chunk=None):
+        if not started.is_set():
+            started.set()
+            release.wait(10)
+        return copy(src, dst, on_chunk)
+    monkeypatch.setattr(copy_engine, 'copy_file', blocked)
+    return started, release
+
+
+def test_cancel_removes_the_destination(tmp_path, blocked_copy):
+    started, release = blocked_copy
+    src, dst = str(tmp_path / 'src'), str(tmp_path / 'dst')
+    make_tree(src)
+    engine = CopyEngine()
+    engine.copy_tree(src, dst)
+    assert started.wait(10)
+    assert os.path.isdir(dst)
+
+    engine.cancel()
+    assert not engine.running
+    release.set()
+    engine._thread.join(10)
+    assert not os.path.exists(dst)
+
+
+def test_new_copy_waits_for_the_cancelled_one(tmp_path, tick, blocked_copy):
+    started, release = blocked_copy
+    src, dst = str(tmp_path / 'src'), str(tmp_path / 'dst')
+    make_tree(src)
+    engine = CopyEngine()
+    events = Events(engine)
+    engine.copy_tree(src, dst)
+    assert started.wait(10)
+    cancelled = engine._thread
+
+    # the cancelled copy removes dst, it must not remove the new copy
+    engine.copy_tree(src, dst)
+    # give the new copy the time to write before the cancelled one resumes
+    time.sleep(0.2)
+    release.set()
+    tick(lambda: events.copied)
+    cancelled.join(10)
+
+    assert events.copied == [dst]
+    assert sorted(os.listdir(dst)) == ['main.py', 'pkg']
+    assert os.listdir(os.path.join(dst, 'pkg')) == ['mod.py']
+
+
+def test_unexpected_error_is_dispatched(tmp_path, tick, monkeypatch):
+    def broken(*args):
+        raise ValueError('broken copy')
+    monkeypatch.setattr(copy_engine, 'copy_file', broken)
+    src, dst = str(tmp_path / 'src'), str(tmp_path / 'dst')
+    make_tree(src)
+    engine = CopyEngine()
+    events = Events(engine)
+    engine.copy_tree(src, dst)
+    tick(lambda: events.errors)
+
+    assert events.errors == ['broken copy']
+    assert not events.copied
+    assert not engine.running
+    assert not os.path.exists(dst)
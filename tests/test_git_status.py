@@ -0,0 +1,46 @@
+import pytest
+
+git = pytest.importorskip('git')
+
+from tools.git_integration import parse_status
+
+
+def porcelain(*entries):
+    return '\0'.join(entries) + '\0'
+
+
+def test_untracked_modified_and_staged():
+    assert parse_status(porcelain(
+        '?? new.py', ' M edited.py', 'M  staged.py', 'MM both.py',
+        'A  added.py')) == {
+        'new.py': 'untracked',
+        'edited.py': 'modified',
+        'staged.py': 'staged',
+        'both.py': 'modified',
+        'added.py': 'staged',
+    }
+
+
+def test_deleted():
+    assert parse_status(porcelain(' D gone.py', 'D  removed.py')) == {
+        'gone.py': 'deleted',
+        'removed.py': 'staged',
+    }
+
+
+def test_renames_and_copies_skip_the_original_path():
+    # with -z, the original path follows the new one as its own entry
+    assert parse_status(porcelain(
+        'R  new_name.py', 'old_name.py', 'C  copy.py', 'source.py',
+        'RM moved.py', 'before.py', '?? other.py')) == {
+        'new_name.py': 'staged',
+        'copy.py': 'staged',
+        'moved.py': 'modified',
+        'other.py': 'untracked',
+    }
+
+
+def test_paths_with_spaces_and_empty_output():
+    assert parse_status(porcelain('?? a file.py')) == {
+        'a file.py': 'untracked'}
+    assert parse_status('') == {}
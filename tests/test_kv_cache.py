@@ -0,0 +1,74 @@
+from core.kv_cache import KVParseCache
+
+from kivy.lang import Builder, global_idmap
+
+import pytest
+
+KV = '''
+#:set kv_cache_spacing 10
+
+BoxLayout:
+    spacing: kv_cache_spacing
+    Button:
+        on_press: app.do_something()
+'''
+
+
+@pytest.fixture
+def cache():
+    cache = KVParseCache()
+    yield cache
+    for result in cache.results.values():
+        Builder.unload_file(result.parser.filename)
+
+
+def test_parse_hit_and_miss(cache):
+    result, cached = cache.parse(KV, '/project/main.kv')
+    assert not cached
+    assert result.root_widgets == ['BoxLayout']
+
+    again, cached = cache.parse(KV, '/project/main.kv')
+    assert cached
+    assert again is result
+
+    # a rule tree is never shared between two files
+    other, cached = cache.parse(KV, '/project/other.kv')
+    assert not cached
+    assert other.parser is not result.parser
+
+    changed, cached = cache.parse(KV + '    Label:\n', '/project/main.kv')
+    assert not cached
+    assert changed.digest != result.digest
+
+
+def test_load_cached_runs_the_directives_again(cache):
+    root, result = cache.load(KV, '/project/main.kv')
+    assert root.spacing == 10
+    Builder.unload_file(result.parser.filename)
+
+    global_idmap['kv_cache_spacing'] = 3
+    root2, result2 = cache.load(KV, '/project/main.kv')
+    assert result2 is result
+    assert root2 is not root
+    assert root2.spacing == 10
+    assert len(root2.children) == 1
+
+
+def test_results_are_bounded():
+    cache = KVParseCache(max_entries=2)
+    src = 'BoxLayout:\n    spacing: %d\n'
+    cache.parse(src % 1, 'a.kv')
+    cache.parse(src % 2, 'b.kv')
+    # the hit moves a.kv to the end, so b.kv is the oldest entry
+    assert cache.parse(src % 1, 'a.kv')[1]
+    cache.parse(src % 3, 'c.kv')
+
+    assert [path for _, path in cache.results] == ['a.kv', 'c.kv']
+    assert not cache.parse(src % 2, 'b.kv')[1]
+
+
+def test_strip_events(cache):
+    stripped = cache.strip_events(KV)
+    assert 'on_press' not in stripped
+    assert 'spacing: kv_cache_spacing' in stripped
+    assert cache.strip_events(KV) is stripped
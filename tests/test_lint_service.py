@@ -0,0 +1,78 @@
+import os
+import signal
+
+import pytest
+
+from tools import lint_service
+from tools.lint_service import LintService
+
+
+@pytest.fixture
+def service():
+    service = LintService(max_workers=1)
+    yield service
+    service.shutdown()
+
+
+def check(service, tick, paths):
+    results = []
+    service.bind(on_lint_done=lambda instance, r: results.append(r))
+    assert service.check_files(paths)
+    tick(lambda: results)
+    assert not service.running
+    return results[0]
+
+
+def test_unchanged_files_are_not_checked_again(service, tick, tmp_path,
+                                                monkeypatch):
+    path = tmp_path / 'a.py'
+    path.write_text('x =  1\n')
+    results = check(service, tick, [str(path)])
+    assert [d.code for d in results[str(path)]] == ['E222']
+
+    submitted = []
+    submit = service._submit
+    monkeypatch.setattr(service, '_submit',
+                        lambda source: submitted.append(source) or
+                        submit(source))
+    assert check(service, tick, [str(path)]) == results
+    assert submitted == []
+
+    # the same content in another file is found by its hash
+    copy = tmp_path / 'b.py'
+    copy.write_text('x =  1\n')
+    results = check(service, tick, [str(copy)])
+    assert [d.code for d in results[str(copy)]] == ['E222']
+    assert submitted == []
+
+    path.write_text('x = 1\n')
+    assert check(service, tick, [str(path)]) == {str(path): []}
+    assert submitted == ['x = 1\n']
+
+
+def test_cache_is_bounded(service, tick, tmp_path, monkeypatch):
+    monkeypatch.setattr(lint_service, 'MAX_CACHE_ENTRIES', 2)
+    paths = []
+    for i in range(4):
+        path = tmp_path / f'f{i}.py'
+        path.write_text(f'x = {i}\n')
+        paths.append(str(path))
+    check(service, tick, paths)
+    assert len(service._cache) == 2
+
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGKILL'), reason='posix only')
+def test_broken_pool_is_replaced(service, tick, tmp_path):
+    path = tmp_path / 'a.py'
+    path.write_text('x = 1\n')
+    check(service, tick, [str(path)])
+    broken = service._executor
+    for pid in list(broken._processes):
+        os.kill(pid, signal.SIGKILL)
+    # the pool is broken once its manager thread saw the processes die
+    tick(lambda: broken._broken)
+
+    path.write_text('x =  1\n')
+    results = check(service, tick, [str(path)])
+    assert service._executor is not broken
+    assert [d.code for d in results[str(path)]] == ['E222']
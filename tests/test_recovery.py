@@ -0,0 +1,98 @@
+from core import recovery
+from core.recovery import RecoveryStore, read_journal, text_diff
+
+from kivy.event import EventDispatcher
+from kivy.properties import BooleanProperty, StringProperty
+from kivy.weakproxy import WeakProxy
+
+import os
+import pytest
+
+
+class CodeInput(EventDispatcher):
+    text = StringProperty('')
+    saved = BooleanProperty(True)
+    path = StringProperty('')
+
+
+@pytest.mark.parametrize('old, new', [
+    ('', ''),
+    ('', 'abc'),
+    ('abc', ''),
+    ('abc', 'abc'),
+    ('hello world', 'hello, world'),
+    ('hello world', 'hello'),
+    ('aaaa', 'aaaaa'),
+    ('abcabc', 'abc'),
+    ('def f():\n    pass\n', 'def g():\n    return 1\n'),
+])
+def test_text_diff(old, new):
+    start, end, text = text_diff(old, new)
+    assert old[:start] + text + old[end:] == new
+    assert len(text) <= len(new)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = RecoveryStore()
+    store.open(str(tmp_path))
+    yield store
+    store.flush()
+
+
+def edit(store, code, text):
+    code.text = text
+    store._collect()
+    store.flush()
+
+
+def test_journal_round_trip(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(recovery, 'MAX_RECORDS', 3)
+    path = os.path.join(str(tmp_path), 'main.py')
+    code = CodeInput(path=path)
+    # kv ids are weak proxies
+    store.track([WeakProxy(code)])
+    store.track([code])
+
+    code.saved = False
+    texts = ['a = 1\n', 'a = 12\n', 'b = 0\na = 12\n', 'b = 0\n', 'b = 0\n#\n',
+             'c = 3\n']
+    for text in texts:
+        edit(store, code, text)
+        assert read_journal(store.journal_path(path)) == (path, text)
+
+    # a journal cut by a crash keeps the records before the partial one
+    with open(store.journal_path(path), 'a', encoding='utf-8') as f:
+        f.write('{"s": 0, "e"')
+    assert read_journal(store.journal_path(path)) == (path, texts[-1])
+
+    reopened = RecoveryStore()
+    reopened.open(str(tmp_path))
+    assert reopened.recovered == {path: texts[-1]}
+
+
+def test_saving_removes_the_journal(store, tmp_path):
+    path = os.path.join(str(tmp_path), 'main.py')
+    code = CodeInput(path=path, saved=False)
+    store.track([code])
+    edit(store, code, 'x = 1\n')
+    assert os.path.exists(store.journal_path(path))
+
+    code.saved = True
+    store.flush()
+    assert not os.path.exists(store.journal_path(path))
+
+
+def test_files_outside_the_project_are_not_journaled(store, tmp_path):
+    code = CodeInput(path=os.path.join(os.path.dirname(str(tmp_path)), 'x.py'),
+                     saved=False)
+    store.track([code])
+    edit(store, code, 'x = 1\n')
+    assert not os.path.exists(store.recovery_dir)
+
+
+def test_read_journal_without_header(tmp_path):
+    journal = tmp_path / 'x.journal'
+    journal.write_text('{"s": 0, "e": 0, "t": "x"}\n', encoding='utf-8')
+    assert read_journal(str(journal)) is None
+    assert read_journal(str(tmp_path / 'missing.journal')) is None
@@ -1,4 +1,6 @@
-__all__ = ['RemoteProgress', 'GitRemoteProgress', 'DesignerGit']
+__all__ = [
+    'RemoteProgress', 'GitRemoteProgress', 'GitWorker',
+    'GitDiffView', 'DesignerGit']
 
 from uix.action_items import DesignerActionSubMenu, DesignerSubActionButton
 from components.designer_content import DesignerCloseableTab
@@ -9,16 +11,17 @@ from uix.input_dialog import InputDialog
 from utils.utils import (
     FakeSettingList, get_current_project,
     get_designer, get_kd_dir, show_message,
-    ignore_proj_watcher, show_alert,
+    show_alert,
 )
 
 import os
 os.environ["GIT_PYTHON_REFRESH"] = "quiet"
-from git import GitCommandError, RemoteProgress, Repo
-from git.exc import InvalidGitRepositoryError
 
-from kivy.properties import ObjectProperty, StringProperty
+from kivy.properties import DictProperty, ObjectProperty, StringProperty
+from kivy.factory import Factory
+from kivy.uix.boxlayout import BoxLayout
 from kivy.core.window import Window
+from kivy.lang.builder import Builder
 from kivy.uix.label import Label
 from kivy.uix.actionbar import ActionButton
 from kivy.uix.popup import Popup
@@ -26,8 +29,40 @@ from kivy.clock import Clock
 from kivy.metrics import dp
 
 from pygments.lexers.diff import DiffLexer
+from functools import partial
 import threading, subprocess
 from io import open
+import traceback
+import queue
+
+Builder.load_string("""
+
+<GitDiffView>:
+    orientation: 'vertical'
+    files_layout: files_layout
+    scroll: scroll
+    code_input: scroll.code_input
+    ScrollView:
+        size_hint_y: None
+        height: '30dp'
+        do_scroll_y: False
+        bar_width: '4dp'
+        BoxLayout:
+            id: files_layout
+            size_hint_x: None
+            width: self.minimum_width
+            spacing: '2dp'
+    PyScrollView:
+        id: scroll
+
+<GitDiffFileButton@ToggleButton>:
+    size_hint_x: None
+    width: self.texture_size[0] + dp(20)
+    font_size: '10pt'
+    group: 'git_diff_file'
+    allow_no_selection: False
+
+""")
 
 class RemoteProgress(Label):
     pass
@@ -64,6 +99,139 @@ class GitRemoteProgress(RemoteProgress):
         Clock.unschedule(self.update_text)
 
 
+def parse_status(output):
+    '''Parses the output of `git status --porcelain -z`
+    :return: dict of {path: status}, where status is 'untracked', 'modified',
+        'deleted' or 'staged' and path is relative to the repository root
+    '''
+    statuses = {}
+    entries = output.split('\0')
+    i = 0
+    while i < len(entries):
+        entry = entries[i]
+        i += 1
+        if len(entry) < 4:
+            continue
+
+        xy, path = entry[:2], entry[3:]
+        if xy[0] in 'RC':
+            # renames and copies are followed by the original path
+            i += 1
+
+        if xy == '??':
+            statuses[path] = 'untracked'
+        elif xy[1] == 'D':
+            # removed from the worktree, but still in the index
+            statuses[path] = 'deleted'
+        elif xy[1] != ' ':
+            statuses[path] = 'modified'
+        else:
+            statuses[path] = 'staged'
+    return statuses
+
+
+class GitWorker(object):
+    '''GitWorker runs the repository queries in a background thread, one at
+       a time and in order, posting the results back to the main thread
+       with :class:`~kivy.clock.Clock`.
+    '''
+    def __init__(self):
+        super(GitWorker, self).__init__()
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def submit(self, func, callback=None, errback=None):
+        '''Queue a function to run in background
+        :param func: function to run in the worker thread
+        :param callback: called on the main thread with the func result
+        :param errback: called on the main thread with the raised exception
+        '''
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._work)
+            self._thread.daemon = True
+            self._thread.start()
+        self._queue.put((func, callback, errback))
+
+    @staticmethod
+    def post(callback, *args):
+        '''Calls the callback on the main thread. Can be used inside a
+        submitted function to deliver partial results
+        '''
+        Clock.schedule_once(lambda dt: callback(*args))
+
+    def _work(self):
+        while True:
+            func, callback, errback = self._queue.get()
+            try:
+                result = func()
+            except Exception as e:
+                if errback:
+                    self.post(errback, e)
+                else:
+                    traceback.print_exc()
+                continue
+
+            if callback:
+                self.post(callback, result)
+
+
+class GitDiffView(BoxLayout):
+    '''Displays the git diff one file at a time. The file list is filled
+       while the diff is streamed by the worker, and a file diff is only
+       rendered in the CodeInput when its button is selected.
+    '''
+    files_layout = ObjectProperty(None)
+    '''Layout with a button to each modified file
+       :data:`files_layout` is a :class:`~kivy.properties.ObjectProperty`
+    '''
+    scroll = ObjectProperty(None)
+    '''Instance of :class:`~designer.uix.py_code_input.PyScrollView`
+       :data:`scroll` is a :class:`~kivy.properties.ObjectProperty`
+    '''
+    code_input = ObjectProperty(None)
+    '''CodeInput displaying the selected file diff
+       :data:`code_input` is a :class:`~kivy.properties.ObjectProperty`
+    '''
+    diffs = DictProperty({})
+    '''Map of file path -> diff text
+       :data:`diffs` is a :class:`~kivy.properties.DictProperty`
+    '''
+
+    def __init__(self, **kwargs):
+        super(GitDiffView, self).__init__(**kwargs)
+        self.code_input.path = ''
+        self.code_input.readonly = True
+        self.code_input.lexer = DiffLexer()
+        self.code_input.saved = True
+        self._selected = None
+
+    def clear(self, message='Loading diff...'):
+        '''Remove all files from the view
+        '''
+        self.diffs = {}
+        self._selected = None
+        self.files_layout.clear_widgets()
+        self.code_input.text = message
+
+    def add_file_diff(self, path, diff):
+        '''Add a file to the view. The first file added is displayed
+        '''
+        self.diffs[path] = diff
+        btn = Factory.GitDiffFileButton(text=path)
+        btn.bind(on_press=lambda *a: self.show_file(path))
+        self.files_layout.add_widget(btn)
+        if self._selected is None:
+            btn.state = 'down'
+            self.show_file(path)
+
+    def show_file(self, path):
+        '''Renders the diff of a file
+        '''
+        self._selected = path
+        self.code_input.text = self.diffs.get(path, '')
+        self.code_input.cursor = (0, 0)
+
+
 class DesignerGit(DesignerActionSubMenu):
 
     is_repo = ObjectProperty(False)
@@ -82,14 +250,32 @@ class DesignerGit(DesignerActionSubMenu):
        to None.
     '''
     diff_code_input = ObjectProperty(None)
-    '''Instance of PyCodeInput with Git diff
+    '''Tab with the :class:`~designer.tools.git_integration.GitDiffView`
     :data:`diff_code_input` is a :class:`~kivy.properties.ObjectProperty`,
         defaults to None.
     '''
-    __events__ = ('on_branch', )
+    worker = ObjectProperty(None)
+    '''Instance of :class:`~designer.tools.git_integration.GitWorker` used
+       to run all the repository queries.
+    :data:`worker` is a :class:`~kivy.properties.ObjectProperty`
+    '''
+    status_index = DictProperty({})
+    '''Map of project relative file path -> git status ('untracked',
+       'modified', 'deleted' or 'staged'). Clean files are not in the index.
+       It's refreshed in background, only for the paths reported by the
+       ProjectWatcher.
+    :data:`status_index` is a :class:`~kivy.properties.DictProperty`
+    '''
+    __events__ = ('on_branch', 'on_status', )
 
     def __init__(self, **kwargs):
         super(DesignerGit, self).__init__(**kwargs)
+        self.worker = GitWorker()
+        self._status_cache = {}
+        self._status_generation = 0
+        self._changed_paths = set()
+        self._trigger_status_refresh = Clock.create_trigger(
+            self._refresh_changed_status, 1)
         self._update_menu()
 
     def load_repo(self, path):
@@ -97,18 +283,151 @@ class DesignerGit(DesignerActionSubMenu):
         :param path: project path
         '''
         self.path = path
-        try:
-            self.repo = Repo(path)
-            self.is_repo = True
-            branch_name = self.repo.active_branch.name
-            self.dispatch('on_branch', branch_name)
+        self.is_repo = False
+        self.repo = None
+        self.invalidate_status()
+        self._changed_paths = set()
+        self.status_index = {}
+        self.dispatch('on_status', {})
+
+        watcher = get_designer().project_watcher
+        watcher.unbind(on_project_modified=self._on_project_modified)
+        watcher.bind(on_project_modified=self._on_project_modified)
+
+        def load():
+            # GitPython is slow to import, load it on the worker thread
+            from git import Repo
+            from git.exc import InvalidGitRepositoryError
+            try:
+                repo = Repo(path)
+            except InvalidGitRepositoryError:
+                return None, None
             if os.name in ('posix', 'nt'):
                 script = os.path.join(get_kd_dir(), 'tools', 'ssh-agent', 'ssh.sh')
-                self.repo.git.update_environment(GIT_SSH_COMMAND=script)
-        except InvalidGitRepositoryError:
-            self.is_repo = False
-        self.is_repo = False
+                repo.git.update_environment(GIT_SSH_COMMAND=script)
+            return repo, repo.active_branch.name
+
+        def loaded(result):
+            repo, branch_name = result
+            if path != self.path:
+                # another project was opened meanwhile
+                return None
+            self.repo = repo
+            self.is_repo = repo is not None
+            if branch_name:
+                self.dispatch('on_branch', branch_name)
+            self._update_menu()
+            self.refresh_status()
+
         self._update_menu()
+        self.worker.submit(load, loaded, self._on_git_error)
+
+    def _on_project_modified(self, instance, event, *args):
+        '''ProjectWatcher callback. Can be called from the watchdog thread,
+        so the status is updated on the main thread
+        '''
+        paths = [event.src_path, getattr(event, 'dest_path', '')]
+        Clock.schedule_once(
+            partial(self._project_modified, [p for p in paths if p]))
+
+    def _project_modified(self, paths, *args):
+        self.invalidate_status()
+        self.files_changed(paths)
+
+    def files_changed(self, paths):
+        '''Schedule an incremental status refresh of the paths. Must be
+        called on the main thread
+        :param paths: list of absolute paths modified
+        '''
+        self._changed_paths.update(paths)
+        self._trigger_status_refresh()
+
+    def _refresh_changed_status(self, *args):
+        paths = self._changed_paths
+        self._changed_paths = set()
+        if paths:
+            self.refresh_status(paths)
+
+    def refresh_status(self, paths=None):
+        '''Updates the status_index in background.
+        :param paths: absolute paths to refresh. If None, refresh the
+            status of the whole repository
+        '''
+        if not self.is_repo:
+            return None
+
+        repo = self.repo
+        project_path = self.path
+        paths = list(paths) if paths else None
+
+        def status():
+            args = ['--porcelain', '-z', '--untracked-files=all']
+            if paths:
+                args += ['--'] + paths
+            root = repo.working_tree_dir
+            statuses = {}
+            for path, st in parse_status(repo.git.status(*args)).items():
+                rel_path = os.path.relpath(os.path.join(root, path), project_path)
+                if not rel_path.startswith(os.pardir):
+                    statuses[rel_path] = st
+            return statuses
+
+        def done(statuses):
+            if repo is not self.repo:
+                return None
+            if paths is None:
+                index = statuses
+            else:
+                index = dict(self.status_index)
+                for path in paths:
+                    rel_path = os.path.relpath(path, project_path)
+                    prefix = rel_path + os.sep
+                    for key in list(index):
+                        if key == rel_path or key.startswith(prefix):
+                            del index[key]
+                index.update(statuses)
+
+            self.status_index = index
+            self.dispatch('on_status', index)
+
+        self.worker.submit(status, done, self._on_git_error)
+
+    def on_status(self, *args):
+        '''Dispatch the status_index when it's updated
+        '''
+        pass
+
+    def invalidate_status(self, *args):
+        '''Drop the cached repository status. Called when the project is
+        modified and after git operations.
+        '''
+        self._status_cache = {}
+        self._status_generation += 1
+
+    def query(self, key, func, callback):
+        '''Runs a repository query in the worker, caching its result until
+        the status is invalidated.
+        :param key: cache key
+        :param func: function that runs the query in background
+        :param callback: receives the result on the main thread
+        '''
+        if key in self._status_cache:
+            callback(self._status_cache[key])
+            return None
+
+        generation = self._status_generation
+
+        def done(result):
+            if generation == self._status_generation:
+                self._status_cache[key] = result
+            callback(result)
+
+        self.worker.submit(func, done, self._on_git_error)
+
+    def _on_git_error(self, error, *args):
+        '''Show errors raised by the git worker
+        '''
+        show_alert('Git', f'Git operation failed!\n{error}')
 
     def _update_menu(self, *args):
         '''Update the Git ActionSubMenu content.
@@ -176,19 +495,34 @@ class DesignerGit(DesignerActionSubMenu):
 
         return True
 
-    @ignore_proj_watcher
     def do_init(self, *args):
         '''Git init
         '''
-        try:
-            self.repo = Repo.init(self.path, mkdir=False)
-            self.repo.index.commit('Init commit')
+        path = self.path
+        watcher = get_designer().project_watcher
+        watcher.pause_watching()
+
+        def init():
+            from git import Repo
+            repo = Repo.init(path, mkdir=False)
+            repo.index.commit('Init commit')
+            return repo
+
+        def done(repo):
+            watcher.resume_watching()
+            self.repo = repo
             self.is_repo = True
+            self.invalidate_status()
             self._update_menu()
+            self.refresh_status()
             show_message('Git repo initialized', 5, 'info')
-        except Exception:
+
+        def failed(e):
+            watcher.resume_watching()
             show_alert('Git Init', 'Failted to initialize repo!')
 
+        self.worker.submit(init, done, failed)
+
     def do_commit(self, *args):
         '''Git commit
         '''
@@ -209,35 +543,55 @@ class DesignerGit(DesignerActionSubMenu):
         toll_bar_top.popup.open()
         return True
 
-    @ignore_proj_watcher
     def _perform_do_commit(self, input, *args):
         '''Perform the git commit with data from InputDialog
         '''
         message = input.user_input.text
+        get_designer().ids.toll_bar_top.close_popup()
+        watcher = get_designer().project_watcher
+        watcher.pause_watching()
 
-        if self.repo.is_dirty():
-            try:
-                self.repo.git.commit('-am', message)
+        def commit():
+            if not self.repo.is_dirty():
+                return False
+            self.repo.git.commit('-am', message)
+            return True
+
+        def committed(result):
+            watcher.resume_watching()
+            self.invalidate_status()
+            self.refresh_status()
+            if result:
                 show_message(f'Commit: {message}', 5, 'info')
-            except GitCommandError as e:
-                show_alert('Git Commit', f'Failed to commit!\n{e}')
-        else:
-            show_alert('Git Commit', 'There is nothing to commit')
+            else:
+                show_alert('Git Commit', 'There is nothing to commit')
 
-        get_designer().ids.toll_bar_top.close_popup()
+        def failed(e):
+            watcher.resume_watching()
+            show_alert('Git Commit', f'Failed to commit!\n{e}')
+
+        self.worker.submit(commit, committed, failed)
 
-    @ignore_proj_watcher
     def do_add(self, *args):
-        '''Git select files from a list to add
+        '''Git select files from a list to add: the untracked and the
+        modified files. Deleted files can't be added, so they're not listed
         '''
-        d = get_designer()
-        toll_bar_top = d.ids.toll_bar_top
+        if get_designer().ids.toll_bar_top.popup:
+            return False
+
+        files = [path for path, st in self.status_index.items()
+                 if st in ('untracked', 'modified')]
+        self._show_add_popup(sorted(files))
+
+    def _show_add_popup(self, files):
+        '''Show the files to be selected
+        '''
+        toll_bar_top = get_designer().ids.toll_bar_top
         if toll_bar_top.popup:
             return False
 
-        files = self.repo.untracked_files
         if not files:
-            show_alert('Git Add', 'All files are already indexed by Git')
+            show_alert('Git Add', 'There are no modified or untracked files')
             return None
 
         # create the popup
@@ -261,28 +615,42 @@ class DesignerGit(DesignerActionSubMenu):
         toll_bar_top.popup = popup
         popup.open()
 
-    @ignore_proj_watcher
     def _perform_do_add(self, instance, selected_files, *args):
         '''Add the selected files to git index
         '''
-        try:
-            self.repo.index.add(selected_files)
+        get_designer().ids.toll_bar_top.close_popup()
+
+        def added(*args):
+            self.invalidate_status()
+            self.files_changed(paths)
             show_message(f'{len(selected_files)} file(s) added to Git index', 5, 'info')
-            get_designer().ids.toll_bar_top.close_popup()
-        except GitCommandError as e:
+
+        def failed(e):
             show_alert('Git Add', f'Failed to add files to Git!\n{e}')
 
+        paths = [os.path.join(self.path, f) for f in selected_files]
+        self.worker.submit(lambda: self.repo.index.add(paths), added, failed)
+
     def do_branches(self, *args):
         '''Shows a list of git branches and allow to change the current one
         '''
-        d = get_designer()
-        toll_bar_top = d.ids.toll_bar_top
+        if get_designer().ids.toll_bar_top.popup:
+            return False
+
+        def branches():
+            return [b.name for b in self.repo.heads], self.repo.active_branch.name
+
+        self.query('branches', branches, self._show_branches_popup)
+
+    def _show_branches_popup(self, result):
+        '''Show the branches list
+        :param result: tuple with the branches names and the active one
+        '''
+        toll_bar_top = get_designer().ids.toll_bar_top
         if toll_bar_top.popup:
             return False
 
-        branches = []
-        for b in self.repo.heads:
-            branches.append(b.name)
+        branches, active_branch = result
 
         # create the popup
         fake_setting = FakeSettingList()
@@ -302,81 +670,94 @@ class DesignerGit(DesignerActionSubMenu):
             on_apply=self._perform_do_branches,
             on_cancel=toll_bar_top.close_popup)
 
-        content.selected_items = [self.repo.active_branch.name]
+        content.selected_items = [active_branch]
         content.show_items()
         toll_bar_top.popup = popup
         popup.open()
 
-    @ignore_proj_watcher
     def _perform_do_branches(self, instance, branches, *args):
         '''If the branch name exists, try to checkout. If a new name, create
         the branch and checkout.
         If the code has modification, shows an alert and stops
         '''
         get_designer().ids.toll_bar_top.close_popup()
-
-        if self.repo.is_dirty():
-            show_alert('Git checkout', 'Please, commit your changes before switch branches.')
-            return None
-
         if not branches:
             return None
 
         branch = branches[0]
-        try:
-            if branch in self.repo.heads:
-                self.repo.heads[branch].checkout()
-            else:
+        watcher = get_designer().project_watcher
+        watcher.pause_watching()
+
+        def checkout():
+            if self.repo.is_dirty():
+                return None
+            if branch not in self.repo.heads:
                 self.repo.create_head(branch)
-                self.repo.heads[branch].checkout()
-            
-            branch_name = self.repo.active_branch.name
+            self.repo.heads[branch].checkout()
+            return self.repo.active_branch.name
+
+        def done(branch_name):
+            watcher.resume_watching()
+            self.invalidate_status()
+            self.refresh_status()
+            if branch_name is None:
+                show_alert('Git checkout', 'Please, commit your changes before switch branches.')
+                return None
             self.dispatch('on_branch', branch_name)
-        except GitCommandError as e:
+
+        def failed(e):
+            watcher.resume_watching()
             show_alert('Git Branches', f'Failed to switch branch!\n{e}')
 
+        self.worker.submit(checkout, done, failed)
+
     def on_branch(self, *args):
         '''Dispatch the branch name
         '''
         pass
 
     def do_diff(self, *args):
-        '''Open a CodeInput with git diff
+        '''Open a tab with git diff. The diff is computed file by file in the
+        worker and each file is added to the view as soon as it's ready
         '''
-        diff = self.repo.git.diff()
-        if not diff:
-            diff = 'Empty diff'
-
         d = get_designer()
         panel = d.designer_content.tab_pannel
 
-        # check if diff is visible on tabbed panel.
-        # if so, update the text content
-        for i, code_input in enumerate(panel.tab_list):
-            if code_input == self.diff_code_input:
-                panel.switch_to(panel.tab_list[len(panel.tab_list) - i - 2])
-                code_input.content.code_input.text = diff
-                return None
-
-        # if not displayed, create or add it to the screen
         if self.diff_code_input is None:
             panel_item = DesignerCloseableTab(title='Git diff')
             panel_item.bind(on_close=panel.on_close_tab)
-            scroll = PyScrollView()
-            _py_code_input = scroll.code_input
-            _py_code_input.text = diff
-            _py_code_input.path = ''
-            _py_code_input.readonly = True
-            _py_code_input.lexer = DiffLexer()
-            _py_code_input.saved = True
-            panel_item.content = scroll
+            panel_item.content = GitDiffView()
             panel_item.rel_path = ''
             self.diff_code_input = panel_item
-        else:
-            self.diff_code_input.content.code_input.text = diff
-        
-        panel.add_widget(self.diff_code_input)
-        panel.switch_to(panel.tab_list[0])
+
+        diff_view = self.diff_code_input.content
+        diff_view.clear()
+        # if not displayed, add it to the screen
+        if self.diff_code_input not in panel.tab_list:
+            panel.add_widget(self.diff_code_input)
+        panel.switch_to(self.diff_code_input)
+
+        self._diff_generation = getattr(self, '_diff_generation', 0) + 1
+        generation = self._diff_generation
+
+        def add_file(path, diff):
+            if generation == self._diff_generation:
+                diff_view.add_file_diff(path, diff)
+
+        def diff():
+            files = self.repo.git.diff('--name-only').splitlines()
+            for path in files:
+                if generation != self._diff_generation:
+                    # a newer diff was requested
+                    return len(files)
+                self.worker.post(add_file, path, self.repo.git.diff('--', path))
+            return len(files)
+
+        def done(count):
+            if generation == self._diff_generation and not count:
+                diff_view.clear('Empty diff')
+
+        self.worker.submit(diff, done, self._on_git_error)
 
     def do_push(self, *args):
         '''Open a list of remotes to push repository data.
@@ -433,27 +814,25 @@ class DesignerGit(DesignerActionSubMenu):
             size_hint=(None, None), size=(dp(500), dp(200)))
         status.open()
 
-        @ignore_proj_watcher
-        def push(*args):
-            '''Do a push in a separated thread
-            '''
-            try:
-                remote_repo.push(self.repo.active_branch.name, progress=progress)
+        get_designer().ids.toll_bar_top.close_popup()
 
-                def set_progress_done(*args):
-                    progress.label.text = 'Completed!'
+        def pushed(*args):
+            def set_progress_done(*args):
+                progress.label.text = 'Completed!'
 
-                Clock.schedule_once(set_progress_done, 1)
-                progress.stop()
-                show_message('Git remote push completed!', 5, 'info')
-            except GitCommandError as e:
-                progress.label.text = f'Failed to push!\n{e}'
-                show_message('Failed to push', 5, 'error')
+            Clock.schedule_once(set_progress_done, 1)
+            progress.stop()
+            show_message('Git remote push completed!', 5, 'info')
 
-            get_designer().ids.toll_bar_top.close_popup()
+        def failed(e):
+            progress.stop()
+            progress.label.text = f'Failed to push!\n{e}'
+            show_message('Failed to push', 5, 'error')
 
         progress.start()
-        threading.Thread(target=push).start()
+        self.worker.submit(
+            lambda: remote_repo.push(self.repo.active_branch.name, progress=progress),
+            pushed, failed)
 
     def do_pull(self, *args):
         '''Open a list of remotes to pull remote data.
@@ -515,23 +894,26 @@ class DesignerGit(DesignerActionSubMenu):
             size=(dp(500), dp(200)))
         status.open()
 
-        @ignore_proj_watcher
-        def pull(*args):
-            '''Do a pull in a separated thread
-            '''
-            try:
-                remote_repo.pull(progress=progress)
+        get_designer().ids.toll_bar_top.close_popup()
+        watcher = get_designer().project_watcher
+        watcher.pause_watching()
 
-                def set_progress_done(*args):
-                    progress.label.text = 'Completed!'
+        def pulled(*args):
+            def set_progress_done(*args):
+                progress.label.text = 'Completed!'
 
-                Clock.schedule_once(set_progress_done, 1)
-                progress.stop()
-                show_message('Git remote pull completed!', 5)
-            except GitCommandError as e:
-                progress.label.text = f'Failed to pull!\n{e}'
-            
-            get_designer().ids.toll_bar_top.close_popup()
+            watcher.resume_watching()
+            self.invalidate_status()
+            self.refresh_status()
+            Clock.schedule_once(set_progress_done, 1)
+            progress.stop()
+            show_message('Git remote pull completed!', 5)
+
+        def failed(e):
+            watcher.resume_watching()
+            progress.stop()
+            progress.label.text = f'Failed to pull!\n{e}'
 
         progress.start()
-        threading.Thread(target=pull).start()
+        self.worker.submit(
+            lambda: remote_repo.pull(progress=progress), pulled, failed)
@@ -0,0 +1,326 @@
+__all__ = ['Diagnostic', 'LintService']
+
+from tools.lint_worker import check_source
+
+from kivy.event import EventDispatcher
+from kivy.properties import BooleanProperty, NumericProperty
+from kivy.clock import Clock
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from functools import partial
+import multiprocessing
+import threading
+import hashlib
+import queue
+import sys
+import os
+
+EXCLUDE_DIRS = ('.designer', '.buildozer', '.git', 'bin', '__pycache__', )
+LINT_EXTS = ('.py', '.py2', '.py3', )
+MAX_CACHE_ENTRIES = 512
+'''Number of checked sources kept in the cache, the least recently used
+   ones are dropped
+'''
+
+Diagnostic = namedtuple('Diagnostic', ('path', 'line', 'column', 'code', 'text'))
+'''A single PEP8 occurrence. `line` is 1-based and `column` is 0-based,
+   `code` is the pep8 code (E501, W291...) and `text` the message.
+'''
+
+
+_spawn_lock = threading.Lock()
+
+
+@contextmanager
+def _hidden_main():
+    '''The spawned processes run the main module of the parent before their
+    task, so the workers would import the designer, kivy and open a window.
+    Hides the main module file while the workers are started, they only
+    need :mod:`~designer.tools.lint_worker`
+    '''
+    main = sys.modules['__main__']
+    with _spawn_lock:
+        path = main.__dict__.pop('__file__', None)
+        try:
+            yield
+        finally:
+            if path is not None:
+                main.__file__ = path
+
+
+def content_hash(source):
+    '''Returns the hash used to index the lint cache
+    '''
+    return hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+
+class LintService(EventDispatcher):
+    '''LintService checks the project python files with the bundled pep8
+       rules. The files are checked in a process pool and the results are
+       cached by content hash (up to :data:`MAX_CACHE_ENTRIES` sources), so
+       only files modified since the last run are checked again. When a run
+       finishes, on_lint_done is dispatched on the main thread with a dict of
+       {path: [Diagnostic, ...]}.
+
+       Single files can also be queued with :meth:`lint_source` (e.g. when
+       saved). Those are checked by a background worker, and the result is
+       dispatched with on_file_linted. A queued job is dropped if the file
+       changed again before it was checked.
+    '''
+    max_workers = NumericProperty(None, allownone=True)
+    '''Number of worker processes. If None, uses the number of CPUs.
+       :data:`max_workers` is a :class:`~kivy.properties.NumericProperty`
+    '''
+    running = BooleanProperty(False)
+    '''Indicates if there is a check in progress
+       :data:`running` is a :class:`~kivy.properties.BooleanProperty`
+    '''
+    __events__ = ('on_lint_done', 'on_file_linted', )
+
+    def __init__(self, **kwargs):
+        super(LintService, self).__init__(**kwargs)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()  # content hash -> list of tuples
+        self._signatures = {}  # path -> (mtime, size, content hash)
+        self._results = {}  # path -> list of Diagnostic
+        self._generations = {}  # path -> last queued job generation
+        self._queue = queue.Queue()
+        self._worker = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # forking would copy the designer process, with its GL
+                # context and running threads, spawned workers only import
+                # the lint_worker module
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def _submit(self, source):
+        '''Submits a source to the process pool. If a worker process died,
+        the pool is broken and is replaced by a new one
+        '''
+        executor = self._get_executor()
+        try:
+            with _hidden_main():
+                return executor.submit(check_source, source)
+        except BrokenProcessPool:
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False)
+            with _hidden_main():
+                return self._get_executor().submit(check_source, source)
+
+    def _cache_get(self, source_hash):
+        with self._lock:
+            diagnostics = self._cache.get(source_hash)
+            if diagnostics is not None:
+                self._cache.move_to_end(source_hash)
+            return diagnostics
+
+    def _cache_store(self, source_hash, diagnostics):
+        with self._lock:
+            self._cache[source_hash] = diagnostics
+            self._cache.move_to_end(source_hash)
+            while len(self._cache) > MAX_CACHE_ENTRIES:
+                self._cache.popitem(last=False)
+
+    def get_diagnostics(self, path):
+        '''Returns the last known diagnostics of a file
+        '''
+        with self._lock:
+            return list(self._results.get(path, []))
+
+    def find_files(self, path):
+        '''Returns the python files of a directory, skipping the folders
+        that are not part of the project sources
+        '''
+        files = []
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames[:] = [d for d in dirnames if d not in EXCLUDE_DIRS]
+            for filename in filenames:
+                if filename.endswith(LINT_EXTS):
+                    files.append(os.path.join(dirpath, filename))
+        return sorted(files)
+
+    def lint_source(self, path, source):
+        '''Queue a file content to be checked in background. Jobs of the same
+        path that are still waiting on the queue become outdated.
+        :param path: absolute file path
+        :param source: file content
+        :return: False if the file is not a python file
+        '''
+        if not path.endswith(LINT_EXTS):
+            return False
+
+        with self._lock:
+            generation = self._generations.get(path, 0) + 1
+            self._generations[path] = generation
+
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._work)
+            self._worker.daemon = True
+            self._worker.start()
+        self._queue.put((path, source, generation))
+        return True
+
+    def cancel(self, path):
+        '''Drop the queued jobs of a path. Used when the buffer is modified
+        again, so the pending result would be outdated.
+        '''
+        with self._lock:
+            if path in self._generations:
+                self._generations[path] += 1
+
+    def _is_outdated(self, path, generation):
+        with self._lock:
+            return self._generations.get(path) != generation
+
+    def _work(self):
+        '''Background worker consuming the lint_source queue
+        '''
+        while True:
+            path, source, generation = self._queue.get()
+            if path is None:
+                break
+            if self._is_outdated(path, generation):
+                continue
+
+            source_hash = content_hash(source)
+            diagnostics = self._cache_get(source_hash)
+            if diagnostics is None:
+                try:
+                    diagnostics = self._submit(source).result()
+                except Exception:
+                    diagnostics = []
+                self._cache_store(source_hash, diagnostics)
+
+            if self._is_outdated(path, generation):
+                continue
+
+            results = [Diagnostic(path, *d) for d in diagnostics]
+            with self._lock:
+                self._results[path] = results
+            Clock.schedule_once(partial(self.dispatch, 'on_file_linted', path, results))
+
+    def check_project(self, path):
+        '''Check all python files from a project folder in background
+        :param path: project path
+        '''
+        self.check_files(self.find_files(path))
+
+    def check_files(self, paths):
+        '''Check a list of files in background. on_lint_done is dispatched
+        with the diagnostics of all of them.
+        :param paths: list of absolute file paths
+        '''
+        if self.running:
+            return False
+        self.running = True
+        threading.Thread(target=self._run, args=(list(paths), ),
+                         daemon=True).start()
+        return True
+
+    def _run(self, paths):
+        '''Checks the files, runs in a separated thread. _done is always
+        scheduled, so :data:`running` is reset even if the check failed
+        '''
+        results = {}
+        try:
+            results = self._check(paths)
+        finally:
+            Clock.schedule_once(partial(self._done, results))
+
+    def _check(self, paths):
+        '''Computes which files really need a new check, send them to the
+        process pool and collects the results.
+        '''
+        found = {}  # content hash -> diagnostics
+        pending = {}  # content hash -> source
+        hashes = {}
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            diagnostics = None
+            signature = self._signatures.get(path)
+            if signature and signature[:2] == (stat.st_mtime, stat.st_size):
+                source_hash = signature[2]
+                diagnostics = self._cache_get(source_hash)
+            if diagnostics is None:
+                try:
+                    with open(path, 'r', encoding='utf-8') as file:
+                        source = file.read()
+                except (IOError, UnicodeDecodeError):
+                    continue
+                source_hash = content_hash(source)
+                self._signatures[path] = (stat.st_mtime, stat.st_size, source_hash)
+                diagnostics = self._cache_get(source_hash)
+                if diagnostics is None:
+                    pending[source_hash] = source
+            if diagnostics is not None:
+                found[source_hash] = diagnostics
+
+            hashes[path] = source_hash
+
+        if pending:
+            futures = {}
+            for source_hash, source in pending.items():
+                futures[source_hash] = self._submit(source)
+
+            for source_hash, future in futures.items():
+                try:
+                    diagnostics = future.result()
+                except Exception:
+                    diagnostics = []
+                self._cache_store(source_hash, diagnostics)
+                found[source_hash] = diagnostics
+
+        results = {}
+        for path, source_hash in hashes.items():
+            results[path] = [Diagnostic(path, *d) for d in found[source_hash]]
+        with self._lock:
+            self._results.update(results)
+        return results
+
+    def _done(self, results, *args):
+        self.running = False
+        self.dispatch('on_lint_done', results)
+
+    def clear_cache(self):
+        '''Forget all the cached results
+        '''
+        with self._lock:
+            self._cache.clear()
+            self._signatures = {}
+            self._results = {}
+
+    def shutdown(self):
+        '''Stop the worker thread and processes
+        '''
+        if self._worker is not None:
+            self._queue.put((None, None, None))
+            self._worker = None
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def on_lint_done(self, *args):
+        '''Dispatched when a check is finished
+        '''
+        pass
+
+    def on_file_linted(self, *args):
+        '''Dispatched when a queued file is checked
+        '''
+        pass
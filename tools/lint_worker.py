@@ -0,0 +1,59 @@
+'''
+PEP8 checks executed by the worker processes of
+:class:`~designer.tools.lint_service.LintService`.
+
+The workers are spawned, so they import this module instead of forking the
+designer. It must not import kivy or the designer modules, so the children
+don't load the GUI stack.
+'''
+
+__all__ = ['PEP8_IGNORES', 'check_source']
+
+from tools.pep8checker import pep8
+
+import ast
+
+PEP8_IGNORES = (
+    'E125',  # continuation line does not
+             # distinguish itself from next logical line
+    'E126',  # continuation line over-indented for hanging indent
+    'E127',  # continuation line over-indented for visual indent
+    'E128',  # continuation line under-indented for visual indent
+)
+
+
+class _DiagnosticReport(pep8.BaseReport):
+    '''pep8 report that keeps the occurrences instead of printing them
+    '''
+    def __init__(self, options):
+        super(_DiagnosticReport, self).__init__(options)
+        self.diagnostics = []
+
+    def error(self, line_number, offset, text, check):
+        code = super(_DiagnosticReport, self).error(
+            line_number, offset, text, check)
+        if code:
+            self.diagnostics.append((line_number, offset, code, text[5:]))
+        return code
+
+
+def check_source(source):
+    '''Run the pep8 checks over a source string. This is the function executed
+    by the worker processes, so it only deals with picklable values.
+    :param source: python source code
+    :return: list of (line, column, code, text) tuples
+    '''
+    style = pep8.StyleGuide(ignore=PEP8_IGNORES, reporter=_DiagnosticReport)
+    report = style.init_report(_DiagnosticReport)
+    lines = source.splitlines(True)
+    checker = pep8.Checker(None, lines=lines, options=style.options,
+                           report=report)
+    checker.check_all()
+
+    # pep8 only looks at the style, so also report syntax errors
+    try:
+        ast.parse(source)
+    except SyntaxError as e:
+        report.diagnostics.append(
+            (e.lineno or 1, max((e.offset or 1) - 1, 0), 'E999', f'SyntaxError: {e.msg}'))
+    return report.diagnostics
@@ -0,0 +1,185 @@
+__all__ = ['MemoryDiagnostics', ]
+
+from kivy.clock import Clock
+from kivy.lang import Builder
+from kivy.uix.widget import Widget
+
+from collections import Counter
+import tracemalloc
+import time
+import sys
+import gc
+
+PROJECT_MODULE_PREFIX = 'KDImport'
+'''Prefix of the modules created by Project.parse_py
+'''
+MAX_SNAPSHOTS = 10
+
+
+class MemoryDiagnostics(object):
+    '''Reports what the designer keeps alive between kv reloads: widgets by
+       class, Builder rules, project modules and undo operations.
+
+       While tracing, a tracemalloc snapshot is taken after each kv reload,
+       and :meth:`diff` compares the last two snapshots.
+    '''
+
+    def __init__(self, designer):
+        self.designer = designer
+        self.snapshots = []  # list of (label, time, snapshot)
+        self._reloads = 0
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def widget_counts(self):
+        '''Returns a Counter of the live widgets by class name
+        '''
+        gc.collect()
+        return Counter(type(obj).__name__ for obj in gc.get_objects()
+                       if isinstance(obj, Widget))
+
+    def old_roots(self):
+        '''Returns the number of live instances of the playground root class,
+        other than the current root
+        '''
+        playground = self.designer.ui_creator.playground
+        if playground.root is None:
+            return 0
+        root_class = type(playground.root)
+        gc.collect()
+        return sum(1 for obj in gc.get_objects()
+                   if type(obj) is root_class and obj is not playground.root)
+
+    def builder_stats(self):
+        '''Returns the number of Builder rules by kv file, and the totals
+        '''
+        by_file = Counter(
+            getattr(rule.ctx, 'filename', None) or '<string>'
+            for selector, rule in Builder.rules)
+        return {
+            'rules': len(Builder.rules),
+            'files': len(Builder.files),
+            'by_file': by_file,
+        }
+
+    def project_modules(self):
+        '''Returns the names of the modules imported by Project.parse_py
+        '''
+        return sorted(name for name in sys.modules
+                      if name.startswith(PROJECT_MODULE_PREFIX))
+
+    def undo_stats(self):
+        '''Returns the number of undo/redo operations, the kv text they
+        hold and how many detached widgets they keep alive
+        '''
+        undo_manager = self.designer.undo_manager
+        operations = undo_manager._undo_stack_operation + \
+            undo_manager._redo_stack_operation
+        kv_bytes = 0
+        detached = 0
+        for op in operations:
+            kv_bytes += len(getattr(op, 'kv_str', '') or '')
+            widget = getattr(op, 'widget', None)
+            if widget is not None and widget.parent is None:
+                detached += 1
+        return {
+            'undo': len(undo_manager._undo_stack_operation),
+            'redo': len(undo_manager._redo_stack_operation),
+            'kv_bytes': kv_bytes,
+            'detached_widgets': detached,
+        }
+
+    def start_tracing(self, nframes=10):
+        '''Starts tracemalloc and takes a snapshot after each kv reload
+        '''
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(nframes)
+        self.snapshots = []
+        self._reloads = 0
+        self.take_snapshot('start')
+        kv_code_input = self.designer.ui_creator.kv_code_input
+        kv_code_input.unbind(on_reload_kv=self._on_reload_kv)
+        kv_code_input.bind(on_reload_kv=self._on_reload_kv)
+
+    def stop_tracing(self):
+        self.designer.ui_creator.kv_code_input.unbind(
+            on_reload_kv=self._on_reload_kv)
+        tracemalloc.stop()
+        self.snapshots = []
+
+    def _on_reload_kv(self, *args):
+        # the snapshot is taken after the playground finished the reload
+        self._reloads += 1
+        label = f'reload {self._reloads}'
+        Clock.schedule_once(lambda dt: self.take_snapshot(label))
+
+    def take_snapshot(self, label=''):
+        '''Takes a tracemalloc snapshot, ignoring the tracemalloc internals
+        '''
+        if not tracemalloc.is_tracing():
+            return None
+        gc.collect()
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        self.snapshots.append((label, time.time(), snapshot))
+        del self.snapshots[:-MAX_SNAPSHOTS]
+        return snapshot
+
+    def diff(self, limit=15, key_type='lineno'):
+        '''Compares the last two snapshots
+        :return: list of lines, the largest growth first
+        '''
+        if len(self.snapshots) < 2:
+            return ['Not enough snapshots to compare']
+        (old_label, t, old), (new_label, t, new) = self.snapshots[-2:]
+        stats = new.compare_to(old, key_type)
+        growth = sum(stat.size_diff for stat in stats)
+        lines = [f'{old_label} -> {new_label}: {growth / 1024:+.1f} KiB']
+        for stat in stats[:limit]:
+            lines.append(f'  {stat}')
+        return lines
+
+    def report(self):
+        '''Returns the memory report as text
+        '''
+        lines = ['Memory diagnostics', '']
+
+        widgets = self.widget_counts()
+        lines.append(f'Live widgets: {sum(widgets.values())}')
+        for name, count in widgets.most_common(20):
+            lines.append(f'  {count:>6}  {name}')
+        lines.append(f'Old playground roots alive: {self.old_roots()}')
+        lines.append('')
+
+        builder = self.builder_stats()
+        lines.append(f'Builder rules: {builder["rules"]} '
+                     f'from {builder["files"]} files')
+        for name, count in builder['by_file'].most_common(20):
+            lines.append(f'  {count:>6}  {name}')
+        lines.append('')
+
+        modules = self.project_modules()
+        lines.append(f'Project modules: {len(modules)}')
+        lines += [f'  {name}' for name in modules]
+        lines.append('')
+
+        undo = self.undo_stats()
+        lines.append(
+            f'Undo operations: {undo["undo"]} undo, {undo["redo"]} redo, '
+            f'{undo["kv_bytes"]} bytes of kv, '
+            f'{undo["detached_widgets"]} detached widgets')
+        lines.append('')
+
+        if self.tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            lines.append(f'Traced memory: {current / 1024:.1f} KiB, '
+                         f'peak {peak / 1024:.1f} KiB, '
+                         f'{len(self.snapshots)} snapshots')
+            lines += self.diff()
+        else:
+            lines.append('Memory tracing is stopped')
+        return '\n'.join(lines)
@@ -106,6 +106,11 @@ import tokenize
 from configparser import RawConfigParser
 from io import TextIOWrapper
 
+try:
+    from inspect import getfullargspec as getargspec
+except ImportError:
+    from inspect import getargspec
+
 DEFAULT_EXCLUDE = '.svn,CVS,.bzr,.hg,.git'
 DEFAULT_IGNORE = 'E24'
 
@@ -1161,7 +1166,7 @@ def find_checks(argument_name):
         if not inspect.isfunction(function):
             continue
 
-        args = inspect.getargspec(function)[0]
+        args = getargspec(function)[0]
         if args and args[0].startswith(argument_name):
             codes = ERRORCODE_REGEX.findall(function.__doc__ or '')
             yield (name, codes, function, args)
@@ -9,12 +9,12 @@ from kivy.metrics import dp
 from uix.confirmation_dialog import ConfirmationDialog
 from utils.utils import (
     get_current_project, constants,
-    get_kd_data_dir, get_kd_dir,
+    get_kd_data_dir,
     ignore_proj_watcher, show_alert,
-    get_designer,
+    get_designer, show_error_console,
 )
 
-import sys, os, datetime
+import os, datetime
 from textwrap import dedent
 import shutil
 
@@ -149,6 +149,18 @@ class DesignerTools(EventDispatcher):
     '''Instance of Designer
        :data:`designer` is a :class:`~kivy.properties.ObjectProperty`
     '''
+    _memory_diagnostics = None
+
+    @property
+    def memory_diagnostics(self):
+        '''Instance of
+            :class:`~designer.tools.memory_diagnostics.MemoryDiagnostics`
+           created on first use
+        '''
+        if self._memory_diagnostics is None:
+            from tools.memory_diagnostics import MemoryDiagnostics
+            self._memory_diagnostics = MemoryDiagnostics(self.designer)
+        return self._memory_diagnostics
 
     @ignore_proj_watcher
     def export_png(self):
@@ -174,25 +186,61 @@ class DesignerTools(EventDispatcher):
         '''Check the PEP8 from current project
         '''
         proj_dir = get_current_project().path
-        kd_dir = get_kd_dir()
-        pep8_dir = os.path.join(kd_dir, 'tools', 'pep8checker', 'pep8kivy.py')
-        
-        getdefault = self.designer.designer_settings.config_parser.getdefault
-        python_path = getdefault('global', 'python_shell_path', '')
-
-        if python_path == '':
-            msg = "Python Shell Path not specified.\n\nUpdate it on \'File\' -> \'Settings\'"
-            self.profiler.dispatch('on_error', msg)
+        lint_service = self.designer.lint_service
+        if lint_service.running:
+            self.designer.statusbar.show_message('PEP8 check already running', 5, 'info')
             return None
 
-        if sys.platform[0] == 'w':
-            pep8_dir = u'"' + pep8_dir + u'"'
+        lint_service.unbind(on_lint_done=self._show_pep8_results)
+        lint_service.bind(on_lint_done=self._show_pep8_results)
+        self.designer.statusbar.show_message('Checking PEP8...', -1, 'loading')
+        lint_service.check_project(proj_dir)
 
-        cmd = f'{python_path} {pep8_dir} {proj_dir}'
-        switch_to = self.designer.ui_creator.tab_pannel.switch_to
-        
-        switch_to(self.designer.ui_creator.tab_pannel.tab_list[2])
-        self.designer.ui_creator.kivy_console.run_command(cmd)
+    def _show_pep8_results(self, instance, results, *args):
+        '''Display the PEP8 diagnostics on the Error Console
+        :param results: dict of {path: [Diagnostic, ...]}
+        '''
+        instance.unbind(on_lint_done=self._show_pep8_results)
+        proj_dir = get_current_project().path
+
+        lines = []
+        total = 0
+        for path in sorted(results):
+            rel_path = os.path.relpath(path, proj_dir)
+            for diag in results[path]:
+                lines.append(f'{rel_path}:{diag.line}:{diag.column + 1}: {diag.code} {diag.text}')
+                total += 1
+
+        show_error_console('\n'.join(lines))
+        tab_pannel = self.designer.ui_creator.tab_pannel
+        tab_pannel.switch_to(tab_pannel.tab_list[0])
+
+        status = self.designer.statusbar
+        if total:
+            status.show_message(f'PEP8: {total} issue(s) in {len(results)} file(s)', 5, 'error')
+        else:
+            status.show_message('PEP8: no issues found', 5, 'info')
+
+    def memory_report(self):
+        '''Display the memory diagnostics on the Error Console
+        '''
+        show_error_console(self.memory_diagnostics.report())
+        tab_pannel = self.designer.ui_creator.tab_pannel
+        tab_pannel.switch_to(tab_pannel.tab_list[0])
+
+    def toggle_memory_tracing(self):
+        '''Starts or stops the tracemalloc snapshots taken on each kv reload
+        '''
+        memory = self.memory_diagnostics
+        status = self.designer.statusbar
+        if memory.tracing:
+            memory.stop_tracing()
+            status.show_message('Memory tracing stopped', 5, 'info')
+        else:
+            memory.start_tracing()
+            status.show_message(
+                'Memory tracing started, a snapshot is taken on each kv reload',
+                5, 'info')
 
     def create_setup_py(self):
         '''Runs the GUI to create a setup.py file
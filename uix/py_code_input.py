@@ -2,14 +2,16 @@ __all__ = ['PyCodeInput', 'PyScrollView']
 
 from uix.completion_bubble import CompletionBubble
 from uix.code_input import DesignerCodeInput
+from utils.utils import get_designer
 
 from kivy.app import App
+from kivy.clock import Clock
+from kivy.metrics import dp
 from kivy.core.window import Window
 from kivy.lang.builder import Builder
+from kivy.graphics import Color, Rectangle
 from kivy.uix.scrollview import ScrollView
-from kivy.properties import ObjectProperty
-
-import jedi
+from kivy.properties import ListProperty, ObjectProperty
 
 MarkupLabel = None
 
@@ -45,7 +47,18 @@ class PyCodeInput(DesignerCodeInput):
        It's rel_file_path property, gives the file path of the file it is
        currently displaying relative to Project Directory
     '''
-    pass
+    diagnostics = ListProperty([])
+    '''List of :class:`~designer.tools.lint_service.Diagnostic` of the
+       last saved content, displayed as markers on the line numbers.
+       :data:`diagnostics` is a :class:`~kivy.properties.ListProperty`
+    '''
+
+    def on_text(self, *args):
+        '''Listen text changes. A pending lint of this file is outdated
+        '''
+        super(PyCodeInput, self).on_text(*args)
+        if self.focus and self.path:
+            get_designer().lint_service.cancel(self.path)
 
 
 class PyScrollView(ScrollView):
@@ -95,6 +108,10 @@ class PyScrollView(ScrollView):
             self.line_number.parent.remove_widget(self.line_number)
         else:
             self.code_input.bind(_lines=self.on_lines_changed)
+            self._trigger_markers = Clock.create_trigger(self._draw_markers)
+            self.code_input.bind(diagnostics=self._trigger_markers)
+            self.line_number.bind(pos=self._trigger_markers,
+                                  size=self._trigger_markers)
 
     def on_code_input_focus(self, *args):
         '''Focus on CodeInput, to enable/disable keyboard listener
@@ -108,6 +125,9 @@ class PyScrollView(ScrollView):
         if key != 32 and modifier != ['ctrl']:
             return None
             
+        # jedi takes a while to import, so only load it when needed
+        import jedi
+
         code = self.code_input
         src = code.text
         line = code.cursor_row + 1
@@ -161,3 +181,29 @@ class PyScrollView(ScrollView):
         width = self.line_number._label_cached.get_extents(str(self._max_num_of_lines))[0]
         self.line_number.width = width + (self.line_number.padding[0] * 2)
         # not removing lines, as long as extra lines will not be visible
+
+    def _draw_markers(self, *args):
+        '''Draw a gutter marker on the line numbers for each line with
+        diagnostics. Red for errors, yellow for warnings.
+        '''
+        canvas = self.line_number.canvas.after
+        canvas.clear()
+        code = self.code_input
+        if not code.diagnostics:
+            return None
+
+        lines = {}
+        for diag in code.diagnostics:
+            is_error = diag.code.startswith('E')
+            lines[diag.line] = lines.get(diag.line, False) or is_error
+
+        line_height = code.line_height + code.line_spacing
+        top = self.line_number.top - code.padding[1]
+        x = self.line_number.x
+        with canvas:
+            for line, is_error in lines.items():
+                if is_error:
+                    Color(0.9, 0.1, 0.1, 0.8)
+                else:
+                    Color(0.9, 0.8, 0.1, 0.8)
+                Rectangle(pos=(x, top - line * line_height), size=(dp(3), line_height))
@@ -1,11 +1,13 @@
 __all__ = [
     'SettingDict', 'SettingListCheckItem',
     'SettingListContent', 'SettingList',
-    'SettingShortcutContent', 'SettingShortcut']
+    'SettingShortcutContent', 'SettingShortcut', 'LazySettings']
 
 from utils.utils import get_designer
 
-from kivy.uix.settings import SettingItem, SettingSpacer
+from kivy.uix.settings import (
+    Settings, SettingItem,
+    SettingsPanel, SettingSpacer)
 from kivy.core.window import Keyboard, Window
 from kivy.uix.togglebutton import ToggleButton
 from kivy.uix.boxlayout import BoxLayout
@@ -20,6 +22,12 @@ from kivy.properties import (
     StringProperty, DictProperty,
 )
 
+import copy
+import json
+import io
+
+_panel_schemas = {}  # json file path -> parsed panel schema
+
 Builder.load_string("""
 
 #: import theme_atlas utils.utils.theme_atlas
@@ -690,3 +698,110 @@ class SettingShortcut(SettingItem):
         modifier = eval(mod)
         hint = ' + '.join(modifier) + f' + {key}'
         self.hint = hint.title()
+
+
+def load_panel_schema(filename=None, data=None):
+    '''Returns a copy of the parsed json panel definition. The files are
+    only read and parsed once, the result is cached in memory.
+    '''
+    if filename is None and data is None:
+        raise Exception('You must specify either the filename or data')
+
+    if filename is None:
+        schema = json.loads(data)
+    else:
+        schema = _panel_schemas.get(filename)
+        if schema is None:
+            with io.open(filename, 'r', encoding='utf-8') as fd:
+                schema = json.loads(fd.read())
+            _panel_schemas[filename] = schema
+
+    if type(schema) != list:
+        raise ValueError('The first element must be a list')
+    # create_json_panel consumes the setting dicts
+    return copy.deepcopy(schema)
+
+
+class LazySettings(Settings):
+    '''Subclass of :class:`kivy.uix.settings.Settings` that only creates the
+       setting widgets of a json panel when it's selected for the first time.
+       The panel definitions are cached by :func:`load_panel_schema`.
+    '''
+
+    def __init__(self, **kwargs):
+        self._pending_panels = {}  # panel uid -> panel schema
+        super(LazySettings, self).__init__(**kwargs)
+        content = getattr(self.interface, 'content', None)
+        if content is not None:
+            content.bind(current_uid=self._on_panel_selected)
+
+    def create_panel(self, title, config):
+        '''Creates an empty panel. Override it to use a custom
+        :class:`~kivy.uix.settings.SettingsPanel`
+        '''
+        return SettingsPanel(title=title, settings=self, config=config)
+
+    def populate_panel(self, panel, schema):
+        '''Creates the setting widgets of a panel
+        :param schema: list of settings, as loaded from the json file
+        '''
+        for setting in schema:
+            # determine the type and the class to use
+            if not 'type' in setting:
+                raise ValueError('One setting are missing the "type" element')
+            ttype = setting['type']
+            cls = self._types.get(ttype)
+            if cls is None:
+                msg = f"No class registered to handle the <{setting['type']}> type"
+                raise ValueError(msg)
+
+            # create a instance of the class, without the type attribute
+            del setting['type']
+            str_settings = {}
+            for key, item in setting.items():
+                str_settings[str(key)] = item
+
+            instance = cls(panel=panel, **str_settings)
+            # instance created, add to the panel
+            panel.add_widget(instance)
+
+    def create_json_panel(self, title, config, filename=None, data=None):
+        '''Creates a panel with all its settings, using the cached schema
+        '''
+        schema = load_panel_schema(filename, data)
+        panel = self.create_panel(title, config)
+        self.populate_panel(panel, schema)
+        return panel
+
+    def add_json_panel(self, title, config, filename=None, data=None):
+        '''Adds an empty panel to the interface. Its settings are created
+        when the panel is selected.
+        :return: the panel instance
+        '''
+        schema = load_panel_schema(filename, data)
+        panel = self.create_panel(title, config)
+        uid = panel.uid
+        self._pending_panels[uid] = schema
+        if self.interface is not None:
+            self.interface.add_panel(panel, title, uid)
+            if self.interface.content.current_uid == uid:
+                self._on_panel_selected(self.interface.content, uid)
+        return panel
+
+    def _on_panel_selected(self, content, uid, *args):
+        schema = self._pending_panels.pop(uid, None)
+        if schema is not None:
+            self.populate_panel(content.panels[uid], schema)
+
+    def update_values(self):
+        '''Reload the values of the created settings from their config.
+        Used when the config file is modified outside of the panels
+        '''
+        if self.interface is None:
+            return None
+        for panel in self.interface.content.panels.values():
+            for setting in panel.children:
+                if isinstance(setting, SettingItem) and setting.section:
+                    value = panel.get_value(setting.section, setting.key)
+                    if setting.value != value:
+                        setting.value = value
@@ -0,0 +1,500 @@
+"""
+Module browser.py
+=================
+
+This module contains the file browser used by :class:`xpopup.XFilePopup`.
+
+Classes:
+
+* DirectoryCache: listings of the last browsed directories.
+
+* FileBrowser: lists a directory in a
+  :class:`~kivy.uix.recycleview.RecycleView`.
+
+* FileBrowserEntry: view of a file or folder in :class:`FileBrowser`.
+
+
+DirectoryCache class
+====================
+
+Keeps the entries of the last listed directories, with the result of their
+stat. A listing is reused while the modification time of its directory is
+the same, so going back to a folder doesn't read it again.
+:meth:`DirectoryCache.scan` can run in a background thread.
+
+
+FileBrowser class
+=================
+
+Subclass of :class:`~kivy.uix.boxlayout.BoxLayout`.
+It has the same properties as :class:`~kivy.uix.filechooser.FileChooser`
+used by :class:`xpopup.XFilePopup`: path, selection, multiselect, dirselect,
+filters and view_mode.
+
+Directories are listed by a background thread with :func:`os.scandir`. The
+entries are displayed in batches while the directory is read, and sorted
+when the listing is complete. Only the visible entries have widgets, so large
+directories can be browsed without freezing the popup.
+
+Filters are applied by the background thread: callable filters receive the
+folder path and the file path, and must not change widgets.
+
+Usage example::
+
+    browser = FileBrowser(path=expanduser(u'~'), filters=['*.py'])
+    browser.bind(selection=my_callback)
+
+"""
+
+from kivy.metrics import dp
+from kivy.clock import Clock
+from kivy.lang.builder import Builder
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recyclegridlayout import RecycleGridLayout
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+
+from kivy.properties import (
+    StringProperty, NumericProperty,
+    ListProperty, OptionProperty,
+    ObjectProperty,
+)
+
+from collections import OrderedDict
+from functools import partial
+from fnmatch import fnmatch
+import threading
+import os
+
+__all__ = ['DirectoryCache', 'FileBrowser', 'FileBrowserEntry',
+           'directory_cache']
+
+
+Builder.load_string('''
+<FileBrowser>:
+    recycleview: recycleview
+    orientation: 'vertical'
+    RecycleView:
+        id: recycleview
+        scroll_type: ['bars', 'content']
+        bar_width: '10dp'
+    Label:
+        size_hint_y: None
+        height: '20dp'
+        font_size: '11sp'
+        text_size: self.size
+        halign: 'left'
+        valign: 'middle'
+        text: root.status
+
+<FileBrowserListLayout>:
+    viewclass: 'FileBrowserEntry'
+    orientation: 'vertical'
+    default_size: None, dp(26)
+    default_size_hint: 1, None
+    size_hint_y: None
+    height: self.minimum_height
+
+<FileBrowserIconLayout>:
+    viewclass: 'FileBrowserEntry'
+    cols: max(1, int(self.width / dp(100)))
+    default_size: None, dp(90)
+    default_size_hint: 1, None
+    size_hint_y: None
+    height: self.minimum_height
+
+<FileBrowserEntry>:
+    spacing: '4dp'
+    padding: '2dp'
+    canvas.before:
+        Color:
+            rgba: (0.2, 0.45, 0.8, 0.5) if self.selected else (0, 0, 0, 0)
+        Rectangle:
+            pos: self.pos
+            size: self.size
+    Image:
+        source:
+            'atlas://data/images/defaulttheme/filechooser_%s' % \
+            ('folder' if root.is_dir else 'file')
+        size_hint: (None, 1) if root.orientation == 'horizontal' else (1, 1)
+        width: dp(20)
+    Label:
+        text: root.text
+        font_size: '12sp'
+        text_size: self.size
+        halign: 'left' if root.orientation == 'horizontal' else 'center'
+        valign: 'middle' if root.orientation == 'horizontal' else 'top'
+        shorten: True
+        size_hint_y: 1 if root.orientation == 'horizontal' else None
+        height: dp(30)
+    Label:
+        text: root.info
+        font_size: '11sp'
+        size_hint: (None, 1) if root.orientation == 'horizontal' else (1, None)
+        width: dp(80)
+        height: 0
+        opacity: 1 if root.orientation == 'horizontal' else 0
+''')
+
+
+def nice_size(size):
+    """Returns a human readable file size
+    """
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024.0:
+            return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+        size /= 1024.0
+    return f'{size:.1f} TB'
+
+
+class DirectoryEntry(object):
+    """A file or folder found by :meth:`DirectoryCache.scan`
+    """
+    __slots__ = ('name', 'path', 'is_dir', 'size')
+
+    def __init__(self, name, path, is_dir, size):
+        self.name = name
+        self.path = path
+        self.is_dir = is_dir
+        self.size = size
+
+
+class DirectoryCache(object):
+    """DirectoryCache class. See module documentation for more information.
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        # folder path -> (folder mtime, {name: DirectoryEntry})
+        self.listings = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, folder):
+        """Returns the entries of a folder if it didn't change since it was
+        listed, or None
+        """
+        try:
+            mtime = os.stat(folder).st_mtime_ns
+        except OSError:
+            return None
+        with self._lock:
+            listing = self.listings.get(folder)
+            if listing is None or listing[0] != mtime:
+                return None
+            self.listings.move_to_end(folder)
+            return list(listing[1].values())
+
+    def scan(self, folder, on_batch=None, batch_size=1000, cancelled=None):
+        """Lists a folder, calling on_batch(entries) each batch_size entries.
+        Raises OSError if the folder can't be read.
+
+        :param cancelled: function returning True to stop the scan
+        :return: the list of entries, or None if cancelled
+        """
+        mtime = os.stat(folder).st_mtime_ns
+        entries = {}
+        batch = []
+        with os.scandir(folder) as it:
+            for dir_entry in it:
+                try:
+                    is_dir = dir_entry.is_dir()
+                    size = 0 if is_dir else dir_entry.stat().st_size
+                except OSError:
+                    # broken link or removed while listing
+                    is_dir, size = False, 0
+                entry = DirectoryEntry(
+                    dir_entry.name, dir_entry.path, is_dir, size)
+                entries[entry.name] = entry
+                batch.append(entry)
+                if len(batch) >= batch_size:
+                    if cancelled is not None and cancelled():
+                        return None
+                    if on_batch is not None:
+                        on_batch(batch)
+                    batch = []
+
+        with self._lock:
+            self.listings[folder] = (mtime, entries)
+            self.listings.move_to_end(folder)
+            while len(self.listings) > self.max_entries:
+                self.listings.popitem(last=False)
+        return list(entries.values())
+
+    def is_dir(self, file_path):
+        """Returns True if the path is a folder, using the listing of its
+        parent if available
+        """
+        folder, name = os.path.split(file_path.rstrip(os.path.sep))
+        with self._lock:
+            listing = self.listings.get(folder)
+            entry = listing[1].get(name) if listing else None
+        if entry is not None:
+            return entry.is_dir
+        return os.path.isdir(file_path)
+
+    def invalidate(self, folder):
+        """Forgets the listing of a folder
+        """
+        with self._lock:
+            self.listings.pop(folder, None)
+
+
+directory_cache = DirectoryCache()
+'''Listings shared by the file browsers
+'''
+
+
+class FileBrowserListLayout(RecycleBoxLayout):
+    pass
+
+
+class FileBrowserIconLayout(RecycleGridLayout):
+    pass
+
+
+class FileBrowserEntry(RecycleDataViewBehavior, BoxLayout):
+    """FileBrowserEntry class. See module documentation for more information.
+    """
+    text = StringProperty('')
+    '''Displayed name
+    '''
+    path = StringProperty('')
+    '''Full path of the entry
+    '''
+    info = StringProperty('')
+    '''File size
+    '''
+    is_dir = ObjectProperty(False)
+    '''True for folders and for the parent entry
+    '''
+    selected = ObjectProperty(False)
+    '''True if the entry is in the browser selection
+    '''
+
+    def __init__(self, **kwargs):
+        self.browser = None
+        super(FileBrowserEntry, self).__init__(**kwargs)
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.browser = rv.parent
+        self.orientation = 'vertical' \
+            if self.browser.view_mode == FileBrowser.VIEW_ICON else 'horizontal'
+        self.selected = data['path'] in self.browser._selected
+        return super(FileBrowserEntry, self).refresh_view_attrs(
+            rv, index, data)
+
+    def on_touch_down(self, touch):
+        if self.browser is None or not self.collide_point(*touch.pos):
+            return super(FileBrowserEntry, self).on_touch_down(touch)
+        self.browser.entry_touched(self, touch)
+        return True
+
+
+class FileBrowser(BoxLayout):
+    """FileBrowser class. See module documentation for more information.
+    """
+    VIEW_ICON = 'icon'
+    VIEW_LIST = 'list'
+    PARENT_ENTRY = f'..{os.path.sep}'
+
+    recycleview = ObjectProperty(None)
+    '''The :class:`~kivy.uix.recycleview.RecycleView` displaying the entries
+    '''
+    path = StringProperty(u'/')
+    '''Folder being displayed
+    '''
+    selection = ListProperty()
+    '''Selected paths
+    '''
+    multiselect = ObjectProperty(False)
+    '''If True, more than one entry can be selected
+    '''
+    dirselect = ObjectProperty(False)
+    '''If True, folders can be selected by one click, and are opened by a
+    double click
+    '''
+    filters = ListProperty()
+    '''Patterns or callables filtering the files. Folders are not filtered
+    '''
+    show_hidden = ObjectProperty(False)
+    '''If True, displays the entries starting with a dot
+    '''
+    view_mode = OptionProperty(VIEW_LIST, options=(VIEW_ICON, VIEW_LIST))
+    '''Displays the entries as a grid of icons or as a list
+    '''
+    batch_size = NumericProperty(1000)
+    '''Number of entries read between two updates of the view while listing
+    a folder. Only the first :attr:`max_partial` entries are displayed before
+    the listing is complete, larger views are slower to update.
+    '''
+    max_partial = NumericProperty(4000)
+    '''Number of entries displayed while listing a folder
+    '''
+    loading = ObjectProperty(False)
+    '''True while the folder is being listed
+    '''
+    status = StringProperty('')
+    '''Number of entries, or the listing state
+    '''
+    cache = ObjectProperty(directory_cache)
+    '''The :class:`DirectoryCache` used to list the folders
+    '''
+
+    def __init__(self, **kwargs):
+        self._selected = set()
+        self._token = None
+        self._found = 0  # entries found by the current listing
+        self._trigger_load = Clock.create_trigger(self._load)
+        super(FileBrowser, self).__init__(**kwargs)
+        self.on_view_mode()
+        self.bind(path=self._on_path_changed,
+                  filters=self._trigger_load,
+                  show_hidden=self._trigger_load)
+        self._trigger_load()
+
+    def is_dir(self, file_path):
+        """Returns True if the path is a folder, using the cached listings
+        """
+        return self.cache.is_dir(file_path)
+
+    def refresh(self):
+        """Lists the current folder again
+        """
+        self.cache.invalidate(self.path)
+        self._trigger_load()
+
+    def on_view_mode(self, *args):
+        rv = self.recycleview
+        if rv is None:
+            return None
+        rv.clear_widgets()
+        if self.view_mode == self.VIEW_ICON:
+            rv.add_widget(FileBrowserIconLayout())
+        else:
+            rv.add_widget(FileBrowserListLayout())
+
+    def on_selection(self, *args):
+        self._selected = set(self.selection)
+        layout = self.recycleview.layout_manager
+        if layout is None:
+            return None
+        for view in layout.children:
+            view.selected = view.path in self._selected
+
+    def _on_path_changed(self, *args):
+        self.selection = []
+        self._trigger_load()
+
+    def entry_touched(self, entry, touch):
+        """Opens or selects an entry, as the FileChooser
+        """
+        if entry.path == self.PARENT_ENTRY:
+            self.path = os.path.dirname(self.path.rstrip(os.path.sep)) \
+                or os.path.sep
+            return None
+
+        if entry.is_dir and (not self.dirselect or touch.is_double_tap):
+            self.path = entry.path
+            return None
+
+        if self.multiselect:
+            if entry.path in self._selected:
+                self.selection.remove(entry.path)
+            else:
+                self.selection.append(entry.path)
+        else:
+            self.selection = [entry.path]
+
+    def _load(self, *args):
+        """Starts listing :attr:`path` in background
+        """
+        token = self._token = object()
+        self._found = 0
+        self.loading = True
+        self.status = 'Loading...'
+        self.recycleview.data = self._parent_data()
+        threading.Thread(
+            target=self._list,
+            args=(token, self.path, list(self.filters), self.show_hidden,
+                  int(self.batch_size)),
+            daemon=True).start()
+
+    def _is_cancelled(self, token):
+        return token is not self._token
+
+    def _parent_data(self):
+        if os.path.dirname(self.path.rstrip(os.path.sep)) in ('', self.path):
+            return []
+        return [{'text': self.PARENT_ENTRY, 'path': self.PARENT_ENTRY,
+                 'is_dir': True, 'info': ''}]
+
+    def _list(self, token, folder, filters, show_hidden, batch_size):
+        """Lists the folder, runs in a separated thread
+        """
+        def on_batch(entries):
+            data = self._to_data(
+                folder, self._filter(folder, entries, filters, show_hidden))
+            Clock.schedule_once(partial(self._add_batch, token, data))
+
+        entries = self.cache.get(folder)
+        try:
+            if entries is None:
+                entries = self.cache.scan(
+                    folder, on_batch, batch_size,
+                    partial(self._is_cancelled, token))
+        except OSError as e:
+            Clock.schedule_once(partial(self._listed, token, None, str(e)))
+            return None
+        if entries is None:
+            # cancelled
+            return None
+
+        entries = self._filter(folder, entries, filters, show_hidden)
+        entries.sort(key=lambda e: (not e.is_dir, e.name.lower()))
+        data = self._to_data(folder, entries)
+        Clock.schedule_once(partial(self._listed, token, data, None))
+
+    def _filter(self, folder, entries, filters, show_hidden):
+        if not show_hidden:
+            entries = [e for e in entries if not e.name.startswith('.')]
+        if not filters:
+            return list(entries)
+
+        result = []
+        for entry in entries:
+            if entry.is_dir:
+                result.append(entry)
+                continue
+            for filt in filters:
+                if callable(filt):
+                    if filt(folder, entry.path):
+                        result.append(entry)
+                        break
+                elif fnmatch(entry.name, filt):
+                    result.append(entry)
+                    break
+        return result
+
+    def _to_data(self, folder, entries):
+        return [{'text': e.name, 'path': e.path, 'is_dir': e.is_dir,
+                 'info': '' if e.is_dir else nice_size(e.size)}
+                for e in entries]
+
+    def _add_batch(self, token, data, *args):
+        if self._is_cancelled(token):
+            return None
+        self._found += len(data)
+        if len(self.recycleview.data) < self.max_partial:
+            self.recycleview.data.extend(data)
+        self.status = f'Loading... {self._found} entries'
+
+    def _listed(self, token, data, error, *args):
+        if self._is_cancelled(token):
+            return None
+        self._token = None
+        self.loading = False
+        if error is not None:
+            self.status = error
+            return None
+        self.recycleview.data = self._parent_data() + data
+        self.status = f'{len(data)} entries'
@@ -5,12 +5,12 @@ Module file.py
 .. versionadded:: 0.2
 
 This module contains the class which represents
-:class:`~kivy.uix.filechooser.FileChooser` in the popup and some templates
+:class:`~xpopup.browser.FileBrowser` in the popup and some templates
 for this class.
 
 Classes:
 
-* XFilePopup: represents :class:`~kivy.uix.filechooser.FileChooser` in the
+* XFilePopup: represents :class:`~xpopup.browser.FileBrowser` in the
   popup.
 
 * XFolder: :class:`XFilePopup` template for folder selection.
@@ -24,7 +24,7 @@ XFilePopup class
 ================
 
 Subclass of :class:`xpopup.XBase`.
-This class represents :class:`~kivy.uix.filechooser.FileChooser` in the
+This class represents :class:`~xpopup.browser.FileBrowser` in the
 popup with following features:
 
 * label which shows current path
@@ -117,7 +117,6 @@ Following example shows how to use properties::
 
 from kivy.metrics import dp
 from kivy.factory import Factory
-from kivy.lang.builder import Builder
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.textinput import TextInput
 
@@ -132,6 +131,7 @@ from textwrap import dedent
 
 from .tools import gettext_
 from .xbase import XBase
+from .browser import FileBrowser
 from .notification import XError
 from .form import XTextInput
 
@@ -149,46 +149,40 @@ class XFilePopup(XBase):
     '''Default size properties for the popup
     '''
     browser = ObjectProperty(None)
-    '''This property represents the FileChooser object. The property contains
+    '''This property represents the FileBrowser object. The property contains
     an object after creation :class:`xpopup.XFilePopup` object.
     '''
     path = StringProperty(u'/')
     '''Initial path for the browser.
 
-    Binded to :attr:`~kivy.uix.filechooser.FileChooser.path`
+    Binded to :attr:`~xpopup.browser.FileBrowser.path`
     '''
     selection = ListProperty()
     '''Contains the selection in the browser.
 
-    Binded to :attr:`~kivy.uix.filechooser.FileChooser.selection`
+    Binded to :attr:`~xpopup.browser.FileBrowser.selection`
     '''
     multiselect = ObjectProperty(False)
-    '''Binded to :attr:`~kivy.uix.filechooser.FileChooser.multiselect`
+    '''Binded to :attr:`~xpopup.browser.FileBrowser.multiselect`
     '''
     dirselect = ObjectProperty(False)
-    '''Binded to :attr:`~kivy.uix.filechooser.FileChooser.dirselect`
+    '''Binded to :attr:`~xpopup.browser.FileBrowser.dirselect`
     '''
     filters = ListProperty()
-    '''Binded to :attr:`~kivy.uix.filechooser.FileChooser.filters`
+    '''Binded to :attr:`~xpopup.browser.FileBrowser.filters`
     '''
     CTRL_VIEW_ICON = 'icon'
     CTRL_VIEW_LIST = 'list'
     CTRL_NEW_FOLDER = 'new_folder'
 
     view_mode = OptionProperty(CTRL_VIEW_ICON, options=(CTRL_VIEW_ICON, CTRL_VIEW_LIST))
-    '''Binded to :attr:`~kivy.uix.filechooser.FileChooser.view_mode`
+    '''Binded to :attr:`~xpopup.browser.FileBrowser.view_mode`
     '''
     def _get_body(self):
-        self.browser = Builder.load_string("""
-FileChooser:
-    FileChooserIconLayout:
-    FileChooserListLayout:
-        """)
-
-        self.browser.path = self.path
-        self.browser.multiselect = self.multiselect
-        self.browser.dirselect = self.dirselect
-        self.browser.filters = self.filters
+        self.browser = FileBrowser(
+            path=self.path, multiselect=self.multiselect,
+            dirselect=self.dirselect, filters=self.filters,
+            view_mode=self.view_mode)
         self.browser.bind(
             path=self.setter('path'),
             selection=self.setter('selection'))
@@ -247,7 +241,7 @@ FileChooser:
             )
             return True
         makedirs(new_folder)
-        self.browser.property('path').dispatch(self.browser)
+        self.browser.refresh()
 
     def _filter_selection(self, folders=True, files=True):
         """Filter the list of selected objects
@@ -262,9 +256,9 @@ FileChooser:
         for entry in self.selection:
             if entry == f'..{path.sep}':
                 pass
-            elif folders and self.browser.file_system.is_dir(entry):
+            elif folders and self.browser.is_dir(entry):
                 t.append(entry)
-            elif files and not self.browser.file_system.is_dir(entry):
+            elif files and not self.browser.is_dir(entry):
                 t.append(entry)
         self.selection = t
 
@@ -300,7 +294,7 @@ class XFileSave(XFilePopup):
         if len(self.selection) == 0:
             return None
 
-        if not self.browser.file_system.is_dir(self.selection[0]):
+        if not self.browser.is_dir(self.selection[0]):
             self.filename = self.selection[0].split(path.sep)[-1]
 
     def dismiss(self, *largs, **kwargs):
@@ -366,7 +360,7 @@ class XFolder(XFilePopup):
             self.dirselect = True
 
     def _is_dir(self, directory, filename):
-        return self.browser.file_system.is_dir(path.join(directory, filename))
+        return self.browser.is_dir(path.join(directory, filename))
 
     def dismiss(self, *largs, **kwargs):
         """Pre-validation before closing.
@@ -0,0 +1,164 @@
+__all__ = ['Instrumentation', 'instrumentation']
+
+# imported by most of the designer modules, so it doesn't import kivy
+from contextlib import contextmanager
+from functools import wraps
+import threading
+import json
+import time
+
+
+class _TimerStats(object):
+    '''Accumulated durations of a named timer, in seconds
+    '''
+    __slots__ = ('calls', 'total', 'max', 'last')
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, duration):
+        self.calls += 1
+        self.total += duration
+        self.last = duration
+        if duration > self.max:
+            self.max = duration
+
+
+class _NullTimer(object):
+    '''Context manager used by :meth:`Instrumentation.timer` when disabled
+    '''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Instrumentation(object):
+    '''Named timers and counters around the designer hot paths, used to find
+       which part of a slow interaction is to blame.
+
+       Nothing is recorded while :attr:`enabled` is False. The decorated
+       functions only check this attribute before running.
+    '''
+
+    def __init__(self):
+        self.enabled = False
+        self.started = time.time()
+        self.timers = {}  # name -> _TimerStats
+        self.counters = {}  # name -> int
+        self._lock = threading.Lock()
+
+    def timed(self, name):
+        '''Decorator recording each call of the function in the timer `name`
+        '''
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.add_time(name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def timer(self, name):
+        '''Context manager recording the duration of its block in the
+        timer `name`
+        '''
+        if not self.enabled:
+            return _NULL_TIMER
+        return self._timer(name)
+
+    @contextmanager
+    def _timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name, duration):
+        '''Adds a duration in seconds to the timer `name`
+        '''
+        with self._lock:
+            stats = self.timers.get(name)
+            if stats is None:
+                stats = self.timers[name] = _TimerStats()
+            stats.add(duration)
+
+    def count(self, name, value=1):
+        '''Increments the counter `name`. Can be called from any thread
+        '''
+        if not self.enabled:
+            return None
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def reset(self):
+        '''Removes all recorded timers and counters
+        '''
+        with self._lock:
+            self.timers = {}
+            self.counters = {}
+            self.started = time.time()
+
+    def to_dict(self):
+        '''Returns the recorded values as a json serializable dict. Times are
+        in milliseconds
+        '''
+        ms = lambda seconds: round(seconds * 1000, 3)
+        with self._lock:
+            timers = dict((name, {
+                'calls': s.calls, 'total_ms': ms(s.total),
+                'mean_ms': ms(s.total / s.calls), 'max_ms': ms(s.max),
+                'last_ms': ms(s.last),
+            }) for name, s in self.timers.items())
+            counters = dict(self.counters)
+        return {
+            'started': self.started,
+            'elapsed_s': round(time.time() - self.started, 3),
+            'timers': timers,
+            'counters': counters,
+        }
+
+    def report(self):
+        '''Returns the recorded values as text, slowest timers first
+        '''
+        data = self.to_dict()
+        lines = [f'{"timer":<32}{"calls":>7}{"total":>11}{"mean":>10}{"max":>10}']
+        timers = sorted(data['timers'].items(),
+                        key=lambda item: item[1]['total_ms'], reverse=True)
+        for name, t in timers:
+            lines.append(f'{name:<32}{t["calls"]:>7}{t["total_ms"]:>9.1f}ms'
+                         f'{t["mean_ms"]:>8.1f}ms{t["max_ms"]:>8.1f}ms')
+        if data['counters']:
+            lines.append('')
+            lines.append(f'{"counter":<32}{"value":>7}')
+            for name, value in sorted(data['counters'].items()):
+                lines.append(f'{name:<32}{value:>7}')
+        return '\n'.join(lines)
+
+    def dump(self, path):
+        '''Writes the recorded values to a json file
+        :return: the path
+        '''
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, sort_keys=True)
+        return path
+
+
+instrumentation = Instrumentation()
+'''Instrumentation shared by the designer, enabled by the
+   'instrumentation' designer setting
+'''
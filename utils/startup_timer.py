@@ -0,0 +1,291 @@
+__all__ = ['StartupTimer', 'startup_timer', 'PROFILE_STARTUP_ARG']
+
+# this module is imported before kivy, so the kivy imports can be profiled.
+# Kivy modules are only imported inside the functions.
+from contextlib import contextmanager
+import importlib.abc
+import threading
+import platform
+import json
+import time
+import sys
+import os
+
+PROFILE_STARTUP_ARG = '--profile-startup'
+'''Command line switch enabling the startup profiler. An optional path
+   prefix of the report files can be given: --profile-startup=/tmp/startup
+'''
+DEFAULT_PROFILE_PREFIX = 'startup_profile'
+
+
+class _TimedLoader(object):
+    '''Loader wrapper measuring the module execution time
+    '''
+
+    def __init__(self, loader, timer):
+        self._loader = loader
+        self._timer = timer
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # the module keeps the original loader, some libraries check its type
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        with self._timer.measure(f'import {module.__name__}', kind='import'):
+            self._loader.exec_module(module)
+        self._timer._module_loaded(module)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _ImportProfiler(importlib.abc.MetaPathFinder):
+    '''Meta path finder that wraps the loaders found by the other finders,
+       so each module import is recorded as a step of the startup
+    '''
+
+    def __init__(self, timer):
+        self._timer = timer
+        self._finding = set()
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname in self._finding or \
+                threading.current_thread() is not threading.main_thread():
+            return None
+
+        self._finding.add(fullname)
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._finding.discard(fullname)
+
+        if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+            spec.loader = _TimedLoader(spec.loader, self._timer)
+        return spec
+
+
+class StartupTimer(object):
+    '''Collects how long each step of the Kivy Designer startup takes.
+       Steps are recorded with :meth:`measure` and the result is logged
+       by :meth:`report` when the start page is ready.
+
+       When :meth:`start_profiling` is called, module imports and kv
+       loading are also recorded, and the profile is written as JSON and
+       as a flamegraph collapsed-stack file after the first frame.
+    '''
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.steps = []  # list of step dicts, in the order they finished
+        self.marks = {}  # name -> seconds since start
+        self.finished = False
+        self.profile_prefix = None
+        self._stack = []  # running steps: [name, start, children duration]
+
+    @contextmanager
+    def measure(self, name, kind='phase'):
+        '''Context manager recording the duration of a startup step.
+        Nested steps are recorded with the stack of their parents.
+        :param kind: 'phase', 'import' or 'kv'
+        '''
+        if threading.current_thread() is not threading.main_thread():
+            yield
+            return None
+
+        frame = [name, time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            stack = tuple(f[0] for f in self._stack)
+            self._stack.pop()
+            duration = end - frame[1]
+            if self._stack:
+                self._stack[-1][2] += duration
+            self.steps.append({
+                'name': name, 'kind': kind, 'stack': stack,
+                'start': frame[1] - self.start_time, 'duration': duration,
+                'self': max(duration - frame[2], 0.0),
+            })
+
+    def mark(self, name):
+        '''Record the time of an event, like the first frame
+        '''
+        if name not in self.marks:
+            self.marks[name] = self.elapsed()
+
+    def elapsed(self):
+        '''Seconds since the timer was created
+        '''
+        return time.perf_counter() - self.start_time
+
+    def report(self):
+        '''Log the startup timing report. Only the first call is logged.
+        Imports and kv files are only listed by the profile files.
+        :return: the report as a string
+        '''
+        from kivy.logger import Logger
+
+        self.mark('start page')
+        lines = ['Startup finished in %.0f ms' % (self.marks['start page'] * 1000)]
+        phases = [s for s in self.steps if s['kind'] == 'phase']
+        for step in sorted(phases, key=lambda s: s['start']):
+            depth = sum(1 for name in step['stack'][:-1]
+                        if not name.startswith(('import ', 'Builder.')))
+            lines.append('%8.1f ms  (at %7.1f ms)  %s' % (
+                step['duration'] * 1000, step['start'] * 1000,
+                '  ' * depth + step['name']))
+        text = '\n'.join(lines)
+
+        if not self.finished:
+            self.finished = True
+            for line in lines:
+                Logger.info(f'Startup: {line}')
+        return text
+
+    def parse_args(self, argv):
+        '''Removes the profile switch from argv, so kivy doesn't try to parse
+        it, and starts profiling if it was given.
+        :param argv: list of arguments, usually sys.argv
+        :return: True if the profiler was started
+        '''
+        for arg in argv[1:]:
+            if arg == PROFILE_STARTUP_ARG:
+                prefix = DEFAULT_PROFILE_PREFIX
+            elif arg.startswith(PROFILE_STARTUP_ARG + '='):
+                prefix = arg.split('=', 1)[1] or DEFAULT_PROFILE_PREFIX
+            else:
+                continue
+            argv.remove(arg)
+            self.start_profiling(prefix)
+            return True
+        return False
+
+    def start_profiling(self, prefix=DEFAULT_PROFILE_PREFIX):
+        '''Records module imports, Builder.load_string and Builder.load_file
+        calls, and writes the profile files after the first frame.
+        Must be called before kivy is imported.
+        :param prefix: path prefix of the .json and .folded files
+        '''
+        if self.profile_prefix is not None:
+            return None
+        self.profile_prefix = prefix
+        sys.meta_path.insert(0, _ImportProfiler(self))
+
+    def watch_first_frame(self, window):
+        '''Marks the first frame drawn by the window
+        '''
+        window.bind(on_flip=self._on_flip)
+
+    def _module_loaded(self, module):
+        '''Called by the import profiler. The Builder is wrapped as soon as
+        it's created, before any kv is loaded
+        '''
+        if module.__name__ == 'kivy.lang.builder':
+            self._wrap_builder(module.Builder)
+
+    def _wrap_builder(self, builder):
+        load_string = builder.load_string
+        load_file = builder.load_file
+
+        def timed_load_string(string, **kwargs):
+            source = kwargs.get('filename')
+            if not source:
+                source = sys._getframe(1).f_globals.get('__name__', '?')
+            with self.measure(f'Builder.load_string {source}', kind='kv'):
+                return load_string(string, **kwargs)
+
+        def timed_load_file(filename, **kwargs):
+            name = os.path.relpath(filename) if os.path.isabs(filename) else filename
+            with self.measure(f'Builder.load_file {name}', kind='kv'):
+                return load_file(filename, **kwargs)
+
+        builder.load_string = timed_load_string
+        builder.load_file = timed_load_file
+
+    def _on_flip(self, window, *args):
+        '''Marks the first frame. The profile is written on the first frame
+        displaying the start page
+        '''
+        self.mark('first frame')
+        if not self.finished:
+            return None
+        self.mark('first start page frame')
+        window.unbind(on_flip=self._on_flip)
+        if self.profile_prefix is not None:
+            self.write_profile(self.profile_prefix)
+
+    def to_dict(self):
+        '''Returns the profile as a json serializable dict. Times are
+        in milliseconds
+        '''
+        ms = lambda seconds: round(seconds * 1000, 3)
+        imports = {}
+        for step in self.steps:
+            if step['kind'] == 'import':
+                imports[step['name'][len('import '):]] = ms(step['duration'])
+
+        try:
+            import kivy
+            kivy_version = kivy.__version__
+        except ImportError:
+            kivy_version = None
+
+        return {
+            'python': platform.python_version(),
+            'kivy': kivy_version,
+            'platform': platform.platform(),
+            'marks': dict((name, ms(t)) for name, t in self.marks.items()),
+            'steps': [{
+                'name': step['name'], 'kind': step['kind'],
+                'stack': list(step['stack']),
+                'start_ms': ms(step['start']),
+                'duration_ms': ms(step['duration']),
+                'self_ms': ms(step['self']),
+            } for step in sorted(self.steps, key=lambda s: s['start'])],
+            'imports': imports,
+        }
+
+    def collapsed_stacks(self):
+        '''Returns the steps in the collapsed-stack format used by
+        flamegraph.pl and speedscope: "parent;child self_time" per line,
+        with the self time in microseconds
+        '''
+        totals = {}
+        for step in self.steps:
+            stack = ';'.join(name.replace(';', ':') for name in step['stack'])
+            totals[stack] = totals.get(stack, 0) + int(step['self'] * 1000000)
+        return '\n'.join(f'{stack} {value}'
+                         for stack, value in sorted(totals.items())) + '\n'
+
+    def write_profile(self, prefix=DEFAULT_PROFILE_PREFIX):
+        '''Writes the profile to <prefix>.json and <prefix>.folded
+        :return: tuple with both paths
+        '''
+        from kivy.logger import Logger
+
+        json_path = prefix + '.json'
+        folded_path = prefix + '.folded'
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        with open(folded_path, 'w', encoding='utf-8') as f:
+            f.write(self.collapsed_stacks())
+
+        Logger.info(f'Startup: profile written to {json_path} and {folded_path}')
+        return json_path, folded_path
+
+
+startup_timer = StartupTimer()
+'''Timer created when Kivy Designer starts to be imported
+'''
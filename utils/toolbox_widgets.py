@@ -49,3 +49,51 @@ toolbox_widgets = [
     ('StencilView', 'behavior'),
 ]
 
+
+
+class ToolboxIndex(object):
+    '''Index of :data:`toolbox_widgets` by category and by name.
+       :meth:`refresh` must be called after toolbox_widgets is modified.
+    '''
+
+    def __init__(self, widgets):
+        self.widgets = widgets
+        self.refresh()
+
+    def refresh(self):
+        '''Indexes the widgets list again
+        '''
+        self.by_name = {}  # name -> first entry with this name
+        self.by_category = {}  # category -> sorted list of names
+        self._search_keys = {}  # name -> lower case name
+        for entry in self.widgets:
+            name, category = entry[0], entry[1]
+            self.by_name.setdefault(name, entry)
+            self.by_category.setdefault(category, []).append(name)
+            self._search_keys[name] = name.lower()
+        for names in self.by_category.values():
+            names.sort()
+
+    def categories(self):
+        return sorted(self.by_category)
+
+    def get(self, name):
+        '''Returns the toolbox_widgets entry of a widget, or None
+        '''
+        return self.by_name.get(name)
+
+    def names(self, category, search=''):
+        '''Returns the sorted names of a category containing the search
+        text, ignoring the case
+        '''
+        names = self.by_category.get(category, [])
+        if not search:
+            return names
+        search = search.lower()
+        keys = self._search_keys
+        return [name for name in names if search in keys[name]]
+
+
+toolbox_index = ToolboxIndex(toolbox_widgets)
+'''Index of the toolbox widgets, shared by the toolbox and the drag and drop
+'''
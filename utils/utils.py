@@ -8,13 +8,24 @@ from kivy.event import EventDispatcher
 from kivy.uix.widget import Widget
 from kivy.uix.label import Label
 from kivy.uix.popup import Popup
+from kivy.logger import Logger
 from kivy.app import App
 
+from core.import_manager import import_manager
 from __init__ import __init_file__
 import functools
+import tempfile
 import inspect
+import shutil
 import os, sys
 
+ATOMIC_WRITE_EXT = '.kdtmp'
+'''Extension of the temporary files created by :func:`write_file_atomic`
+'''
+# read once, os.umask can only be read by changing it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
 def theme_atlas(theme):
     return f'atlas://data/images/defaulttheme/{theme}'
 
@@ -250,15 +261,51 @@ def ignore_proj_watcher(f):
     return wrapper
 
 
+_app_widget_classes = {}
+'''Classes resolved by :func:`get_app_widget`, by (widget name, module name).
+Emptied when the import_manager generation changes
+'''
+_app_widget_generation = None
+
+
+def get_app_widget_class(target):
+    '''Returns the class of a python AppWidget, or None if its module has no
+    widget class. The result is cached until a project module is imported
+    again
+    :param target: instance of designer.project_manager.AppWidget
+    '''
+    global _app_widget_generation
+    if _app_widget_generation != import_manager.generation:
+        _app_widget_classes.clear()
+        _app_widget_generation = import_manager.generation
+
+    key = (target.name, target.module_name)
+    if key in _app_widget_classes:
+        return _app_widget_classes[key]
+
+    klass = None
+    module = sys.modules.get(target.module_name)
+    if module is not None:
+        classes = inspect.getmembers(module, inspect.isclass)
+        for klass_name, _klass in classes:
+            if klass_name == target.name:
+                klass = _klass
+                break
+        else:
+            # no class with the widget name, use the first widget class
+            for klass_name, _klass in classes:
+                if issubclass(_klass, Widget):
+                    klass = _klass
+                    break
+    _app_widget_classes[key] = klass
+    return klass
+
+
 def get_app_widget(target, **default_args):
     '''Creates a widget instance by it's name and module
     :param target: instance of designer.project_manager.AppWidget
     '''
     d = get_designer()
-    print(
-        f'''def get_app_widget ->
-        [ target={target}, default_args={default_args}, target.name={target.name} ]''')
-    
     if target.is_dynamic:
         name = target.name.split('@')[0]
         with d.ui_creator.playground.sandbox:
@@ -266,19 +313,16 @@ def get_app_widget(target, **default_args):
     elif target.is_root:
         return target.instance
     
-    classes = inspect.getmembers(sys.modules[target.module_name], inspect.isclass)
-    for klass_name, klass in classes:
-        if not issubclass(klass, Widget) and klass_name != target.name:
-            continue
-
-        with d.ui_creator.playground.sandbox:
-            try:
-                return klass(**default_args)
-            except FactoryException as err:
-                print(f'[ERRO ] Não foi possivel encontrar widget: {klass_name}')
-                
-                print(f"ERROR: {repr(err)}")
-                return None
+    klass = get_app_widget_class(target)
+    if klass is None:
+        return None
+
+    with d.ui_creator.playground.sandbox:
+        try:
+            return klass(**default_args)
+        except FactoryException as err:
+            Logger.error(f'Designer: cannot create widget {klass.__name__}: {err!r}')
+            return None
     return None
 
 
@@ -302,3 +346,39 @@ def get_fs_encoding():
     if not encoding:
         encoding = sys.getdefaultencoding()
     return encoding
+
+
+def write_file_atomic(path, content, encoding='utf-8', commit=None):
+    '''Writes a file through a temporary file in the same folder, that
+    replaces the file with os.replace. A crash while writing leaves the
+    previous content instead of a truncated file
+    :param path: file path
+    :param content: text to write
+    :param commit: function called with (temporary path, path) instead of
+        os.replace, returning False to cancel the write
+    :return: False if the write was cancelled by commit
+    '''
+    dirname, basename = os.path.split(path)
+    fd, temp_path = tempfile.mkstemp(
+        prefix=f'.{basename}.', suffix=ATOMIC_WRITE_EXT, dir=dirname or None)
+    try:
+        with open(fd, 'w', encoding=encoding) as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        else:
+            os.chmod(temp_path, 0o666 & ~_UMASK)
+        if commit is None:
+            os.replace(temp_path, path)
+        elif commit(temp_path, path) is False:
+            os.remove(temp_path)
+            return False
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return True